@@ -1,21 +1,94 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, render_template, stream_with_context, request, jsonify, redirect, url_for, flash, abort
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import hmac
+import logging
 import os
+import re
+import threading
+import time
+import click
 from PIL import Image
-import pytesseract
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge, UnsupportedMediaType
+from utils.ocr_jobs import OCRJobQueue, QueueFullError
+from utils.upload_guard import ImageUploadRequest, upload_stats
+from utils.places_client import PlacesClient, PlacesAPIError
+from utils.cache import TTLCache
+from utils import geohash
+from utils.gazetteer import geocode
+from utils.metrics import metrics
+from utils.sqlite_storage import GroupCommitWriter, enable_sqlite_pragmas, is_file_sqlite_url, sqlite_engine_options
+from utils.visit_events import VisitEventBroker, format_event
+from utils.export import EXPORT_MIMETYPES, EXPORT_WRITERS
+
+# LOG_LEVEL=DEBUG 일 때만 OCR 텍스트 등 상세 내용 출력
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.request_class = ImageUploadRequest  # 업로드 이미지 헤더를 받는 도중 검사
 app.config['SECRET_KEY'] = 'your-secret-key'  # 실제 배포 시에는 환경 변수로 관리
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///cafe_diary.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///cafe_diary.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_IMAGE_PIXELS'] = int(os.getenv('MAX_IMAGE_PIXELS', 40 * 1000 * 1000))  # 업로드 이미지 최대 픽셀 수
+app.config['UPLOAD_LENIENT_ENDPOINTS'] = {'upload_receipts_batch'}  # 거부된 파일만 오류로 처리하는 엔드포인트
+app.config['OCR_WORKERS'] = int(os.getenv('OCR_WORKERS', 2))  # OCR 워커 수
+app.config['OCR_QUEUE_SIZE'] = int(os.getenv('OCR_QUEUE_SIZE', 100))  # OCR 대기열 최대 크기
+app.config['BATCH_MAX_FILES'] = int(os.getenv('BATCH_MAX_FILES', 50))  # 일괄 업로드 최대 파일 수
+app.config['BATCH_OCR_WORKERS'] = int(os.getenv('BATCH_OCR_WORKERS', app.config['OCR_WORKERS']))  # 모든 일괄 업로드를 합친 OCR 동시 실행 수
+app.config['VISITS_PAGE_SIZE'] = 20  # 방문 기록 한 페이지 크기
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 500))  # 내보내기에서 한 번에 읽는 행 수
+app.config['SKIP_DUPLICATE_RECEIPTS'] = os.getenv('SKIP_DUPLICATE_RECEIPTS', '0') == '1'  # 같은 영수증 재업로드 시 저장 생략
+app.config['METRICS_LOCAL_ONLY'] = os.getenv('METRICS_LOCAL_ONLY', '1') == '1'  # /metrics 를 로컬 요청에만 허용
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # 설정하면 /metrics 에 "Authorization: Bearer <토큰>" 필요
+app.config['AUTO_INIT_DB'] = os.getenv('AUTO_INIT_DB', '1') == '1'  # create_app 에서 스키마 준비
+app.config['PRELOAD_OCR'] = os.getenv('PRELOAD_OCR', '0') == '1'  # create_app 에서 OCR 엔진 미리 로드
+app.config['SQLITE_TUNING'] = os.getenv('SQLITE_TUNING', '1') == '1'  # WAL/busy_timeout 등 SQLite 설정과 연결 풀 사용
+app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))  # 워커 프로세스당 DB 연결 수
+app.config['GROUP_COMMIT'] = os.getenv('GROUP_COMMIT', '0') == '1'  # 동시 영수증 저장을 묶어서 커밋
+app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 300))  # 로그인 사용자 캐시 유지 시간 (초, 0 이면 요청마다 DB 조회)
+app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', 10000))  # 캐시할 최대 사용자 수
+app.config['PASSWORD_HASH_ITERATIONS'] = int(os.getenv('PASSWORD_HASH_ITERATIONS', 260000))  # PBKDF2 반복 횟수
+app.config['SSE_KEEPALIVE'] = int(os.getenv('SSE_KEEPALIVE', 15))  # 방문 기록 이벤트 스트림 keepalive 간격 (초)
+app.config['SSE_MAX_SECONDS'] = int(os.getenv('SSE_MAX_SECONDS', 300))  # 스트림 연결 최대 유지 시간 (초, 이후 브라우저가 재연결)
+
+# 압축 해제 폭탄 방지
+Image.MAX_IMAGE_PIXELS = app.config['MAX_IMAGE_PIXELS']
+
+# 파일 SQLite 는 WAL 과 연결 풀을 사용하여 동시 업로드가 잠금 오류로 실패하지 않도록 함 (pragma 는 create_app 에서 등록)
+SQLITE_TUNED = app.config['SQLITE_TUNING'] and is_file_sqlite_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if SQLITE_TUNED:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(pool_size=app.config['DB_POOL_SIZE'])
+
+# 방문 좌표 geohash 정밀도 (약 150m x 150m 셀)
+GEOHASH_PRECISION = 7
+# 카카오맵 레벨별 클러스터 geohash 정밀도 (레벨이 높을수록 넓은 영역)
+CLUSTER_PRECISION_BY_LEVEL = {6: 6, 7: 5, 8: 5, 9: 4, 10: 4, 11: 3, 12: 3, 13: 2, 14: 2}
+# 개별 마커로 응답하는 최대 개수
+MAX_VIEWPORT_MARKERS = 500
+# 이벤트 스트림이 끊겼을 때 브라우저의 재연결 대기 시간 (ms)
+SSE_RETRY_MS = 3000
+# 예전 업로드가 모든 방문에 넣던 기본 좌표 (서울 시청)
+PLACEHOLDER_COORDINATES = (37.5665, 126.9780)
 
 # Google Maps API 설정
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', 'your-api-key-here')  # 실제 키로 교체 필요
+# 연결 재사용 + 응답 캐시를 하는 공용 Places 클라이언트
+places_client = PlacesClient(
+    GOOGLE_MAPS_API_KEY,
+    base_url=os.getenv('PLACES_API_BASE_URL', 'https://maps.googleapis.com/maps/api'),
+    cache_size=int(os.getenv('PLACES_CACHE_SIZE', 1024))
+)
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
@@ -36,13 +109,28 @@ class CafeVisit(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     cafe_name = db.Column(db.String(100), nullable=False)
     visit_date = db.Column(db.DateTime, nullable=False)
-    menu_items = db.Column(db.Text)
+    receipt_id = db.Column(db.Integer, db.ForeignKey('receipt.id'), index=True)  # 메뉴 항목은 영수증에서 조회
     total_price = db.Column(db.Float)
     location = db.Column(db.String(200))
     rating = db.Column(db.Float)
     comment = db.Column(db.Text)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(GEOHASH_PRECISION))  # 지도 영역 검색용 공간 인덱스
+    
+    __table_args__ = (
+        db.Index('ix_cafe_visit_user_id_visit_date', 'user_id', 'visit_date'),
+        db.Index('ix_cafe_visit_user_id_geohash', 'user_id', 'geohash'),
+    )
+
+@event.listens_for(CafeVisit, 'before_insert')
+@event.listens_for(CafeVisit, 'before_update')
+def update_visit_geohash(mapper, connection, visit):
+    # 좌표가 바뀔 때마다 geohash 갱신
+    if visit.latitude is None or visit.longitude is None:
+        visit.geohash = None
+    else:
+        visit.geohash = geohash.encode(visit.latitude, visit.longitude, GEOHASH_PRECISION)
 
 class Receipt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -50,36 +138,620 @@ class Receipt(db.Model):
     store_name = db.Column(db.String(100), nullable=False)
     visit_date = db.Column(db.DateTime, nullable=False)
     total_amount = db.Column(db.Float)
+    image_hash = db.Column(db.String(64), index=True)  # 영수증 이미지 해시 (중복 업로드 확인용)
+    menu_note = db.Column(db.Text)  # 메뉴로 해석하지 못한 줄이 있는 직접 입력 메뉴 텍스트 (입력 그대로 표시)
     menu_items = db.relationship('MenuItem', backref='receipt', lazy=True, cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        db.Index('ix_receipt_user_id_visit_date', 'user_id', 'visit_date'),
+    )
+
+# 메뉴 이름 카탈로그 (같은 이름은 한 번만 저장)
+class MenuItemName(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
 
 class MenuItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    receipt_id = db.Column(db.Integer, db.ForeignKey('receipt.id'), nullable=False)
-    name = db.Column(db.String(100), nullable=False)
+    receipt_id = db.Column(db.Integer, db.ForeignKey('receipt.id'), nullable=False, index=True)
+    name_id = db.Column(db.Integer, db.ForeignKey('menu_item_name.id'), nullable=False, index=True)
     price = db.Column(db.Float)
+    menu_name = db.relationship('MenuItemName', lazy='joined')
+    
+    @property
+    def name(self):
+        return self.menu_name.name
+
+def menu_item_name_ids(names):
+    """
+    메뉴 이름을 카탈로그에 등록하고 {이름: id} 반환 (이미 있는 이름은 그대로 사용)
+    """
+    names = {name[:100] for name in names}
+    if not names:
+        return {}
+    table = MenuItemName.__table__
+    db.session.execute(sqlite_insert(table).values([{'name': name} for name in names])
+                       .on_conflict_do_nothing(index_elements=['name']))
+    rows = db.session.execute(db.select(table.c.name, table.c.id).where(table.c.name.in_(list(names))))
+    return dict(rows.all())
+
+# 사용자별 요약 통계 (CafeVisit 이 저장될 때마다 증분 갱신)
+class UserMonthlySpend(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    total_spent = db.Column(db.Float, nullable=False, default=0)
+    visit_count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserCafeStat(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    cafe_name = db.Column(db.String(100), primary_key=True)
+    visit_count = db.Column(db.Integer, nullable=False, default=0)
+    total_spent = db.Column(db.Float, nullable=False, default=0)
+    last_visit = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_user_cafe_stat_user_id_visit_count', 'user_id', 'visit_count'),
+    )
+
+class UserMenuStat(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    menu_name = db.Column(db.String(100), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    total_spent = db.Column(db.Float, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.Index('ix_user_menu_stat_user_id_order_count', 'user_id', 'order_count'),
+    )
+
+# 메뉴 텍스트 한 줄 형식 ("메뉴: 4500원")
+MENU_LINE_RE = re.compile(r'^(.+?)\s*:\s*([\d,]+(?:\.\d+)?)\s*원?$')
+# 통계에 영향을 주는 CafeVisit 필드
+VISIT_STATS_FIELDS = ('user_id', 'cafe_name', 'visit_date', 'total_price', 'receipt_id')
+
+def parse_visit_menu_items(text):
+    """
+    "메뉴: 4500원" 줄 단위 메뉴 텍스트를 (메뉴명, 가격) 목록과 메모로 변환
+
+    형식에 맞지 않는 줄이 있으면 가격을 지어내지 않고 원래 텍스트 전체를 메모로 돌려준다
+    (형식에 맞는 줄만 메뉴 항목과 통계에 들어감).
+    """
+    items = []
+    unparsed = False
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = MENU_LINE_RE.match(line)
+        if match:
+            items.append((match.group(1)[:100], float(match.group(2).replace(',', ''))))
+        else:
+            unparsed = True
+    return items, (text.strip() if unparsed else None)
+
+def apply_visit_stats(connection, values, sign):
+    """
+    방문 기록 하나의 기여분을 요약 테이블에 더하거나(sign=1) 뺀다(sign=-1)
+    """
+    user_id = values['user_id']
+    total = (values['total_price'] or 0) * sign
+    
+    table = UserMonthlySpend.__table__
+    stmt = sqlite_insert(table).values(user_id=user_id, month=values['visit_date'].strftime('%Y-%m'),
+                                       total_spent=total, visit_count=sign)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=['user_id', 'month'],
+        set_={'total_spent': table.c.total_spent + stmt.excluded.total_spent,
+              'visit_count': table.c.visit_count + stmt.excluded.visit_count}
+    ))
+    
+    # 통계 키는 앞 100자 (rebuild_user_stats 와 같은 기준)
+    cafe_key = values['cafe_name'][:100]
+    table = UserCafeStat.__table__
+    stmt = sqlite_insert(table).values(user_id=user_id, cafe_name=cafe_key, visit_count=sign,
+                                       total_spent=total, last_visit=values['visit_date'])
+    updates = {'visit_count': table.c.visit_count + stmt.excluded.visit_count,
+               'total_spent': table.c.total_spent + stmt.excluded.total_spent}
+    if sign > 0:
+        updates['last_visit'] = db.func.max(table.c.last_visit, stmt.excluded.last_visit)
+    connection.execute(stmt.on_conflict_do_update(index_elements=['user_id', 'cafe_name'], set_=updates))
+    if sign < 0:
+        # 수정/삭제는 드물기 때문에 마지막 방문일은 남은 방문 기록에서 다시 구함
+        last_visit = db.select(db.func.max(CafeVisit.visit_date)).where(
+            CafeVisit.user_id == user_id, db.func.substr(CafeVisit.cafe_name, 1, 100) == cafe_key).scalar_subquery()
+        connection.execute(table.update().where(
+            table.c.user_id == user_id, table.c.cafe_name == cafe_key
+        ).values(last_visit=last_visit))
+    
+    menu_totals = {}
+    if values['receipt_id'] is not None:
+        rows = connection.execute(
+            db.select(MenuItemName.name, MenuItem.price)
+            .join(MenuItemName, MenuItem.name_id == MenuItemName.id)
+            .where(MenuItem.receipt_id == values['receipt_id']))
+        for name, price in rows:
+            count, spent = menu_totals.get(name, (0, 0.0))
+            menu_totals[name] = (count + sign, spent + (price or 0) * sign)
+    if menu_totals:
+        table = UserMenuStat.__table__
+        stmt = sqlite_insert(table).values([
+            {'user_id': user_id, 'menu_name': name, 'order_count': count, 'total_spent': spent}
+            for name, (count, spent) in menu_totals.items()
+        ])
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['user_id', 'menu_name'],
+            set_={'order_count': table.c.order_count + stmt.excluded.order_count,
+                  'total_spent': table.c.total_spent + stmt.excluded.total_spent}
+        ))
+    
+    if sign < 0:
+        # 기여분이 모두 빠진 행 정리
+        connection.execute(UserMonthlySpend.__table__.delete().where(
+            UserMonthlySpend.user_id == user_id, UserMonthlySpend.visit_count <= 0))
+        connection.execute(UserCafeStat.__table__.delete().where(
+            UserCafeStat.user_id == user_id, UserCafeStat.visit_count <= 0))
+        connection.execute(UserMenuStat.__table__.delete().where(
+            UserMenuStat.user_id == user_id, UserMenuStat.order_count <= 0))
+
+def _previous_value(attr):
+    history = attr.history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else attr.value
+
+@event.listens_for(CafeVisit, 'after_insert')
+def add_visit_stats(mapper, connection, visit):
+    apply_visit_stats(connection, {name: getattr(visit, name) for name in VISIT_STATS_FIELDS}, 1)
+
+@event.listens_for(CafeVisit, 'after_update')
+def update_visit_stats(mapper, connection, visit):
+    attrs = db.inspect(visit).attrs
+    if not any(attrs[name].history.has_changes() for name in VISIT_STATS_FIELDS):
+        return
+    apply_visit_stats(connection, {name: _previous_value(attrs[name]) for name in VISIT_STATS_FIELDS}, -1)
+    apply_visit_stats(connection, {name: getattr(visit, name) for name in VISIT_STATS_FIELDS}, 1)
+
+@event.listens_for(CafeVisit, 'after_delete')
+def remove_visit_stats(mapper, connection, visit):
+    apply_visit_stats(connection, {name: getattr(visit, name) for name in VISIT_STATS_FIELDS}, -1)
+
+# 대시보드 목록과 지도에 보이는 CafeVisit 필드 (바뀔 때만 이벤트 전송)
+VISIT_EVENT_FIELDS = ('cafe_name', 'visit_date', 'receipt_id', 'total_price', 'location', 'rating',
+                      'latitude', 'longitude')
+
+# 방문 기록 변경을 사용자별 스트림(/api/visits/events)으로 전달
+visit_event_broker = VisitEventBroker()
+
+def queue_visit_event(visit, op):
+    # 메뉴 텍스트는 flush 가 끝난 뒤 한 번에 조회
+    object_session(visit).info.setdefault('visit_events_pending', []).append((op, {
+        'id': visit.id,
+        'user_id': visit.user_id,
+        'cafe_name': visit.cafe_name,
+        'visit_date': visit.visit_date.strftime('%Y-%m-%d %H:%M'),
+        'receipt_id': visit.receipt_id,
+        'total_price': visit.total_price,
+        'location': visit.location,
+        'rating': visit.rating,
+        'latitude': visit.latitude,
+        'longitude': visit.longitude
+    }))
+
+@event.listens_for(CafeVisit, 'after_insert')
+def queue_created_visit_event(mapper, connection, visit):
+    queue_visit_event(visit, 'created')
+
+@event.listens_for(CafeVisit, 'after_update')
+def queue_updated_visit_event(mapper, connection, visit):
+    attrs = db.inspect(visit).attrs
+    if any(attrs[name].history.has_changes() for name in VISIT_EVENT_FIELDS):
+        queue_visit_event(visit, 'updated')
+
+@event.listens_for(Session, 'after_flush')
+def format_visit_events(session, flush_context):
+    pending = session.info.pop('visit_events_pending', None)
+    if not pending:
+        return
+    menu_items = format_menu_items({visit['receipt_id'] for _, visit in pending}, session)
+    events = session.info.setdefault('visit_events', [])
+    for op, visit in pending:
+        user_id = visit.pop('user_id')
+        visit['menu_items'] = menu_items.get(visit.pop('receipt_id'), '')
+        events.append((user_id, {'op': op, 'visit': visit}))
+
+@event.listens_for(Session, 'after_commit')
+def publish_visit_events(session):
+    # 커밋된 변경만 전달
+    for user_id, data in session.info.pop('visit_events', ()):
+        visit_event_broker.publish(user_id, data)
+        metrics.increment('visit_event_published')
+
+@event.listens_for(Session, 'after_rollback')
+def discard_visit_events(session):
+    session.info.pop('visit_events_pending', None)
+    session.info.pop('visit_events', None)
+
+class AuthUser(UserMixin):
+    """
+    요청마다 DB 를 조회하지 않도록 캐시하는 로그인 사용자 정보 (세션에 묶이지 않은 일반 객체)
+    """
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    def __repr__(self):
+        return f"AuthUser(id={self.id!r}, username={self.username!r})"
+
+# 프로세스 안의 로그인 사용자 캐시 (User 가 바뀌거나 삭제되면 무효화)
+user_cache = TTLCache(app.config['USER_CACHE_SIZE'])
+
+def invalidate_user(user_id):
+    user_cache.pop(user_id)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, user):
+    invalidate_user(user.id)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# 데이터베이스 초기화
-with app.app_context():
-    # 테이블이 없을 때만 생성
-    db.create_all()
-    
-    # 테스트 사용자 생성 (없는 경우에만)
-    test_user = User.query.filter_by(username='test').first()
-    if not test_user:
-        test_user = User(
-            username='test',
-            email='test@example.com',
-            password_hash=generate_password_hash('test123')
-        )
-        db.session.add(test_user)
+    user_id = int(user_id)
+    ttl = app.config['USER_CACHE_TTL']
+    if ttl > 0:
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            metrics.increment('user_cache_hit')
+            return cached
+        metrics.increment('user_cache_miss')
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    auth_user = AuthUser(user.id, user.username, user.email)
+    if ttl > 0:
+        user_cache.put(user_id, auth_user, ttl)
+    return auth_user
+
+def password_hash_method():
+    return f"pbkdf2:sha256:{app.config['PASSWORD_HASH_ITERATIONS']}"
+
+def hash_password(password):
+    """
+    설정된 반복 횟수(PASSWORD_HASH_ITERATIONS)로 비밀번호 해시 생성
+    """
+    return generate_password_hash(password, method=password_hash_method())
+
+def password_needs_rehash(password_hash):
+    # 해시 앞부분 'pbkdf2:sha256:반복횟수' 가 현재 설정과 다르면 다시 해시
+    return password_hash.split('$', 1)[0] != password_hash_method()
+
+def upgrade_schema():
+    """
+    기존 테이블에 없는 컬럼과 인덱스 추가 (create_all은 기존 테이블을 변경하지 않음)
+    """
+    inspector = db.inspect(db.engine)
+    for table in db.Model.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(db.engine.dialect)
+                db.session.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info("Added column %s.%s", table.name, column.name)
         db.session.commit()
-        print("Test user created successfully")
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def backfill_visit_geohash(batch_size=1000):
+    """
+    geohash 가 비어 있는 방문 기록을 일괄 갱신
+    """
+    while True:
+        visits = CafeVisit.query.filter(
+            CafeVisit.geohash.is_(None),
+            CafeVisit.latitude.isnot(None),
+            CafeVisit.longitude.isnot(None)
+        ).limit(batch_size).all()
+        if not visits:
+            break
+        for visit in visits:
+            update_visit_geohash(None, None, visit)
+        db.session.commit()
+        logger.info("Backfilled geohash for %d visits", len(visits))
+
+def migrate_menu_item_names():
+    """
+    이름을 직접 저장하던 기존 menu_item 테이블을 메뉴 이름 카탈로그를 참조하도록 변환
+
+    SQLite 는 NOT NULL 컬럼을 제거할 수 없으므로 테이블을 새로 만들어 옮긴다.
+    upgrade_schema 보다 먼저 실행해야 인덱스 이름이 기존 테이블과 겹치지 않는다.
+    """
+    inspector = db.inspect(db.engine)
+    if 'name' not in {column['name'] for column in inspector.get_columns('menu_item')}:
+        return
+    with db.engine.begin() as connection:
+        connection.execute(db.text('ALTER TABLE menu_item RENAME TO menu_item_old'))
+        MenuItem.__table__.create(connection)
+        connection.execute(db.text(
+            'INSERT OR IGNORE INTO menu_item_name (name) SELECT DISTINCT name FROM menu_item_old'))
+        moved = connection.execute(db.text(
+            'INSERT INTO menu_item (id, receipt_id, name_id, price) '
+            'SELECT m.id, m.receipt_id, n.id, m.price FROM menu_item_old m '
+            'JOIN menu_item_name n ON n.name = m.name')).rowcount
+        connection.execute(db.text('DROP TABLE menu_item_old'))
+    logger.info("Moved %d menu items to the name catalog", moved)
+
+def link_visit_receipts():
+    """
+    메뉴 텍스트를 복사해 두던 기존 방문 기록을 영수증과 연결하고 cafe_visit.menu_items 컬럼 제거
+
+    영수증 업로드로 생긴 방문은 같은 사용자, 가게, 날짜, 금액의 영수증과 연결하고,
+    직접 추가한 방문은 메뉴 텍스트로 영수증을 새로 만든다.
+    """
+    inspector = db.inspect(db.engine)
+    if 'menu_items' not in {column['name'] for column in inspector.get_columns('cafe_visit')}:
+        return
+    
+    # 아직 방문과 연결되지 않은 영수증
+    unlinked = {}
+    linked_ids = db.session.query(CafeVisit.receipt_id).filter(CafeVisit.receipt_id.isnot(None))
+    receipts = db.session.query(Receipt.id, Receipt.user_id, Receipt.store_name, Receipt.visit_date,
+                                Receipt.total_amount).filter(Receipt.id.notin_(linked_ids)).order_by(Receipt.id)
+    for row in receipts:
+        unlinked.setdefault((row.user_id, row.store_name, row.visit_date, row.total_amount), []).append(row.id)
+    
+    visits = db.session.execute(db.select(
+        CafeVisit.id, CafeVisit.user_id, CafeVisit.cafe_name, CafeVisit.visit_date, CafeVisit.total_price,
+        db.literal_column('menu_items')
+    ).where(CafeVisit.receipt_id.is_(None)).order_by(CafeVisit.id)).all()
+    links, created = [], 0
+    for visit in visits:
+        candidates = unlinked.get((visit.user_id, visit.cafe_name, visit.visit_date, visit.total_price))
+        if candidates:
+            links.append({'visit_id': visit.id, 'receipt_id': candidates.pop(0)})
+            continue
+        items, menu_note = parse_visit_menu_items(visit.menu_items)
+        if not items and not menu_note:
+            continue
+        receipt = Receipt(user_id=visit.user_id, store_name=visit.cafe_name, visit_date=visit.visit_date,
+                          total_amount=visit.total_price, menu_note=menu_note)
+        db.session.add(receipt)
+        db.session.flush()
+        if items:
+            name_ids = menu_item_name_ids(name for name, _ in items)
+            db.session.execute(MenuItem.__table__.insert(), [
+                {'receipt_id': receipt.id, 'name_id': name_ids[name[:100]], 'price': price}
+                for name, price in items])
+        links.append({'visit_id': visit.id, 'receipt_id': receipt.id})
+        created += 1
+    if links:
+        table = CafeVisit.__table__
+        db.session.execute(table.update().where(table.c.id == db.bindparam('visit_id'))
+                           .values(receipt_id=db.bindparam('receipt_id')), links)
+    db.session.commit()
+    
+    try:
+        db.session.execute(db.text('ALTER TABLE cafe_visit DROP COLUMN menu_items'))
+    except OperationalError:
+        # DROP COLUMN 을 지원하지 않는 SQLite (3.35 미만) 에서는 내용만 비움
+        db.session.rollback()
+        db.session.execute(db.text('UPDATE cafe_visit SET menu_items = NULL'))
+    db.session.commit()
+    logger.info("Linked %d visits to receipts (%d receipts created from menu text)", len(links), created)
+    if links:
+        # 메뉴 통계를 카탈로그 이름 기준으로 다시 맞춤
+        rebuild_user_stats()
+
+def backfill_visit_locations(batch_size=1000, keep_unresolved=False):
+    """
+    기본 좌표(서울 시청)로 저장된 방문 기록의 좌표를 지명 사전으로 다시 계산
+
+    location 주소나 매장명으로 찾지 못하면 좌표를 비운다 (keep_unresolved 이면 그대로 둠).
+    """
+    last_id = 0
+    resolved = cleared = 0
+    while True:
+        visits = CafeVisit.query.filter(
+            CafeVisit.id > last_id,
+            CafeVisit.latitude == PLACEHOLDER_COORDINATES[0],
+            CafeVisit.longitude == PLACEHOLDER_COORDINATES[1]
+        ).order_by(CafeVisit.id).limit(batch_size).all()
+        if not visits:
+            break
+        last_id = visits[-1].id
+        for visit in visits:
+            location = geocode(visit.location, visit.cafe_name)
+            if location is not None:
+                visit.latitude, visit.longitude = location.latitude, location.longitude
+                resolved += 1
+            elif not keep_unresolved:
+                visit.latitude = visit.longitude = None
+                cleared += 1
+        db.session.commit()
+    logger.info("Backfilled visit locations: %d resolved, %d placeholder coordinates cleared", resolved, cleared)
+    return resolved, cleared
+
+def rebuild_user_stats(user_id=None, batch_size=1000):
+    """
+    요약 통계 테이블을 CafeVisit 전체에서 다시 계산 (user_id 가 있으면 해당 사용자만)
+    """
+    monthly, cafes = {}, {}
+    query = db.session.query(*[getattr(CafeVisit, name) for name in VISIT_STATS_FIELDS])
+    if user_id is not None:
+        query = query.filter(CafeVisit.user_id == user_id)
+    for row in query.yield_per(batch_size):
+        total = row.total_price or 0
+        key = (row.user_id, row.visit_date.strftime('%Y-%m'))
+        spent, count = monthly.get(key, (0.0, 0))
+        monthly[key] = (spent + total, count + 1)
+        
+        key = (row.user_id, row.cafe_name[:100])
+        count, spent, last_visit = cafes.get(key, (0, 0.0, row.visit_date))
+        cafes[key] = (count + 1, spent + total, max(last_visit, row.visit_date))
+    
+    # 메뉴 통계는 (receipt_id), (name_id) 인덱스를 타는 집계 쿼리로 계산
+    menu_query = db.session.query(
+        CafeVisit.user_id, MenuItemName.name, db.func.count(MenuItem.id), db.func.sum(db.func.coalesce(MenuItem.price, 0))
+    ).join(MenuItem, MenuItem.receipt_id == CafeVisit.receipt_id) \
+        .join(MenuItemName, MenuItem.name_id == MenuItemName.id) \
+        .group_by(CafeVisit.user_id, MenuItemName.name)
+    if user_id is not None:
+        menu_query = menu_query.filter(CafeVisit.user_id == user_id)
+    menus = {(uid, name): (count, spent) for uid, name, count, spent in menu_query}
+    
+    for model in (UserMonthlySpend, UserCafeStat, UserMenuStat):
+        delete = model.query
+        if user_id is not None:
+            delete = delete.filter(model.user_id == user_id)
+        delete.delete(synchronize_session=False)
+    if monthly:
+        db.session.execute(UserMonthlySpend.__table__.insert(), [
+            {'user_id': uid, 'month': month, 'total_spent': spent, 'visit_count': count}
+            for (uid, month), (spent, count) in monthly.items()])
+    if cafes:
+        db.session.execute(UserCafeStat.__table__.insert(), [
+            {'user_id': uid, 'cafe_name': name, 'visit_count': count, 'total_spent': spent, 'last_visit': last_visit}
+            for (uid, name), (count, spent, last_visit) in cafes.items()])
+    if menus:
+        db.session.execute(UserMenuStat.__table__.insert(), [
+            {'user_id': uid, 'menu_name': name, 'order_count': count, 'total_spent': spent}
+            for (uid, name), (count, spent) in menus.items()])
+    db.session.commit()
+    logger.info("Rebuilt stats: %d months, %d cafes, %d menu items", len(monthly), len(cafes), len(menus))
+
+def init_db():
+    """
+    테이블 생성, 스키마 업그레이드, 테스트 사용자 준비 (배포 시 한 번 실행)
+    """
+    with app.app_context():
+        # 테이블이 없을 때만 생성
+        db.create_all()
+        migrate_menu_item_names()
+        upgrade_schema()
+        
+        # 메뉴 텍스트를 복사해 두던 방문 기록을 영수증과 연결
+        link_visit_receipts()
+        
+        # geohash 컬럼이 새로 추가된 경우 기존 방문 기록 채우기
+        backfill_visit_geohash()
+        
+        # 요약 통계 테이블이 새로 생긴 경우 기존 방문 기록으로 채우기
+        if UserMonthlySpend.query.first() is None and CafeVisit.query.first() is not None:
+            rebuild_user_stats()
+        
+        # 테스트 사용자 생성 (없는 경우에만)
+        test_user = User.query.filter_by(username='test').first()
+        if not test_user:
+            test_user = User(
+                username='test',
+                email='test@example.com',
+                password_hash=hash_password('test123')
+            )
+            db.session.add(test_user)
+            db.session.commit()
+            logger.info("Test user created successfully")
+        
+        logger.info("Database initialized successfully")
+
+# create_app 에서 이미 끝낸 시작 단계
+_startup_done = set()
+
+@app.cli.command('rebuild-stats')
+@click.option('--user-id', type=int, default=None, help='이 사용자만 다시 계산')
+def rebuild_stats_command(user_id):
+    """요약 통계 테이블 다시 계산"""
+    with app.app_context():
+        rebuild_user_stats(user_id)
+
+@app.cli.command('backfill-locations')
+@click.option('--keep-unresolved', is_flag=True, help='찾지 못한 방문은 기본 좌표를 그대로 둠')
+def backfill_locations_command(keep_unresolved):
+    """기본 좌표로 저장된 방문 기록의 위치 다시 계산"""
+    with app.app_context():
+        backfill_visit_locations(keep_unresolved=keep_unresolved)
+
+@app.cli.command('import-receipts')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--user', 'username', default='test', show_default=True, help='영수증을 저장할 사용자')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='결과를 덧붙일 JSONL 파일')
+@click.option('--no-db', is_flag=True, help='DB 에 저장하지 않음 (--output 과 함께 사용)')
+@click.option('--state', 'state_path', default='receipt_import_state.db', show_default=True,
+              help='처리한 이미지 기록 (중단 후 이어서 실행)')
+@click.option('--workers', type=int, default=None, help='OCR 프로세스 수 (기본: CPU 수)')
+@click.option('--batch-size', type=int, default=50, show_default=True, help='한 번에 커밋할 영수증 수')
+@click.option('--retry-failed', is_flag=True, help='이전에 실패한 이미지도 다시 처리')
+def import_receipts_command(directory, username, output, no_db, state_path, workers, batch_size, retry_failed):
+    """디렉터리의 영수증 이미지를 일괄 OCR 하여 저장"""
+    from utils.bulk_import import import_receipts
+    if no_db and not output:
+        raise click.UsageError('--no-db 는 --output 과 함께 사용해야 합니다.')
+    save_batch = None
+    if not no_db:
+        if 'db' not in _startup_done:
+            init_db()
+            _startup_done.add('db')
+        with app.app_context():
+            user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.BadParameter(f'사용자 {username} 가 없습니다.', param_hint='--user')
+        user_id = user.id
+        
+        def save_batch(items):
+            with app.app_context():
+                try:
+                    save_receipt_infos(user_id, [receipt_info for _, receipt_info in items])
+                    commit_receipts()
+                except Exception:
+                    db.session.rollback()
+                    raise
     
-    print("Database initialized successfully")
+    progress = import_receipts(os.path.abspath(directory), state_path, output=output, save_batch=save_batch,
+                               workers=workers, batch_size=batch_size, retry_failed=retry_failed)
+    click.echo(f"Imported {progress.saved} receipts ({progress.failed} failed, {progress.skipped} already done)")
+
+@app.cli.command('init-db')
+def init_db_command():
+    """데이터베이스 초기화"""
+    # FLASK_APP=app:create_app() 이면 팩토리에서 이미 실행되었을 수 있음
+    if 'db' not in _startup_done:
+        init_db()
+        _startup_done.add('db')
+
+def create_app(init_database=None, preload_ocr=None):
+    """
+    애플리케이션 시작 준비 후 app 반환
+
+    모듈 import 는 DB나 OCR에 손대지 않는다. 스키마 준비(AUTO_INIT_DB)와
+    OCR 엔진 미리 로드(PRELOAD_OCR)는 여기서 프로세스당 한 번만 실행되며,
+    gunicorn --preload 'app:create_app()' 로 실행하면 fork 전에 한 번만 수행된다.
+    """
+    if init_database is None:
+        init_database = app.config['AUTO_INIT_DB']
+    if preload_ocr is None:
+        preload_ocr = app.config['PRELOAD_OCR']
+    
+    # 이 앱의 엔진 연결에만 SQLite 설정 적용
+    if SQLITE_TUNED and 'sqlite' not in _startup_done:
+        with app.app_context():
+            enable_sqlite_pragmas(db.engine)
+        _startup_done.add('sqlite')
+    
+    if init_database and 'db' not in _startup_done:
+        started = time.perf_counter()
+        init_db()
+        _startup_done.add('db')
+        logger.info("Database ready in %.1fms", (time.perf_counter() - started) * 1000)
+    
+    if preload_ocr and 'ocr' not in _startup_done:
+        started = time.perf_counter()
+        from utils import ocr_helper
+        ocr_helper.preload()
+        _startup_done.add('ocr')
+        logger.info("OCR preloaded in %.1fms", (time.perf_counter() - started) * 1000)
+    
+    # fork 전에 열린 연결을 워커들이 공유하지 않도록 풀 비우기 (메모리 SQLite 는 닫으면 데이터가 사라지므로 제외)
+    with app.app_context():
+        if db.engine.url.get_backend_name() != 'sqlite' or is_file_sqlite_url(db.engine.url):
+            db.engine.dispose()
+    return app
 
 @app.route('/')
 def index():
@@ -98,7 +770,7 @@ def register():
             
         user = User(username=username, 
                    email=email,
-                   password_hash=generate_password_hash(password))
+                   password_hash=hash_password(password))
         db.session.add(user)
         db.session.commit()
         return redirect(url_for('login'))
@@ -113,6 +785,10 @@ def login():
         user = User.query.filter_by(username=username).first()
         
         if user and check_password_hash(user.password_hash, password):
+            if password_needs_rehash(user.password_hash):
+                # 반복 횟수 설정이 바뀌었으면 로그인할 때 새 설정으로 다시 저장
+                user.password_hash = hash_password(password)
+                db.session.commit()
             login_user(user)
             return redirect(url_for('dashboard'))
             
@@ -125,112 +801,708 @@ def logout():
     logout_user()
     return redirect(url_for('index'))
 
+# 방문 목록에 필요한 컬럼만 조회
+VISIT_LIST_COLUMNS = (
+    CafeVisit.id, CafeVisit.cafe_name, CafeVisit.visit_date, CafeVisit.receipt_id,
+    CafeVisit.total_price, CafeVisit.latitude, CafeVisit.longitude
+)
+
+def format_price(price):
+    # 정수 금액은 "4500" 처럼 소수점 없이
+    return int(price) if price is not None and float(price).is_integer() else price
+
+def query_menu_items(receipt_ids, session=None):
+    """
+    여러 영수증의 메뉴를 한 번에 조회 ({receipt_id: [{'name': ..., 'price': ...}, ...]})
+    """
+    receipt_ids = [receipt_id for receipt_id in receipt_ids if receipt_id is not None]
+    if not receipt_ids:
+        return {}
+    rows = (session or db.session).execute(
+        db.select(MenuItem.receipt_id, MenuItemName.name, MenuItem.price)
+        .join(MenuItemName, MenuItem.name_id == MenuItemName.id)
+        .where(MenuItem.receipt_id.in_(receipt_ids)).order_by(MenuItem.id))
+    items = {}
+    for receipt_id, name, price in rows:
+        items.setdefault(receipt_id, []).append({'name': name, 'price': format_price(price)})
+    return items
+
+def query_menu_notes(receipt_ids, session=None):
+    """
+    메뉴 메모가 있는 영수증의 {receipt_id: 메모}
+    """
+    receipt_ids = [receipt_id for receipt_id in receipt_ids if receipt_id is not None]
+    if not receipt_ids:
+        return {}
+    rows = (session or db.session).execute(
+        db.select(Receipt.id, Receipt.menu_note)
+        .where(Receipt.id.in_(receipt_ids), Receipt.menu_note.isnot(None)))
+    return dict(rows.all())
+
+def format_menu_items(receipt_ids, session=None):
+    """
+    영수증별 메뉴를 "메뉴: 4500원" 줄 단위 텍스트로 변환 ({receipt_id: 텍스트})
+
+    메뉴 메모가 있는 영수증은 입력한 텍스트를 그대로 쓴다.
+    """
+    receipt_ids = list(receipt_ids)
+    texts = {receipt_id: '\n'.join(f"{item['name']}: {item['price']}원" for item in items)
+             for receipt_id, items in query_menu_items(receipt_ids, session).items()}
+    texts.update(query_menu_notes(receipt_ids, session))
+    return texts
+
+def encode_visit_cursor(visit_date, visit_id):
+    raw = f"{visit_date.isoformat()}|{visit_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_visit_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    visit_date, visit_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(visit_date), int(visit_id)
+
+def query_visit_page(user_id, cursor=None, limit=20):
+    """
+    (visit_date, id) 내림차순 키셋 페이지네이션으로 방문 기록 조회
+
+    (user_id, visit_date) 인덱스를 타며, 다음 페이지 커서를 함께 반환한다.
+    """
+    query = db.session.query(*VISIT_LIST_COLUMNS).filter(CafeVisit.user_id == user_id)
+    if cursor:
+        visit_date, visit_id = decode_visit_cursor(cursor)
+        query = query.filter(db.or_(
+            CafeVisit.visit_date < visit_date,
+            db.and_(CafeVisit.visit_date == visit_date, CafeVisit.id < visit_id)
+        ))
+    rows = query.order_by(CafeVisit.visit_date.desc(), CafeVisit.id.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_visit_cursor(rows[-1].visit_date, rows[-1].id)
+    menu_items = format_menu_items(row.receipt_id for row in rows)
+    visits = [{
+        'id': row.id,
+        'cafe_name': row.cafe_name,
+        'visit_date': row.visit_date.strftime('%Y-%m-%d %H:%M'),
+        'menu_items': menu_items.get(row.receipt_id, ''),
+        'total_price': row.total_price,
+        'latitude': row.latitude,
+        'longitude': row.longitude
+    } for row in rows]
+    return visits, next_cursor
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    visits = CafeVisit.query.filter_by(user_id=current_user.id).all()
+    # 목록을 읽기 전의 이벤트 id 부터 스트림을 이어 받아 그 사이의 변경도 놓치지 않음
+    last_event_id = visit_event_broker.last_id
+    visits, next_cursor = query_visit_page(current_user.id, limit=app.config['VISITS_PAGE_SIZE'])
     return render_template('dashboard.html', 
                          visits=visits,
+                         next_cursor=next_cursor,
+                         last_event_id=last_event_id,
                          google_maps_api_key=GOOGLE_MAPS_API_KEY,
                          kakao_map_api_key=os.getenv('KAKAO_MAP_API_KEY', 'your-kakao-api-key'))
 
+def serialize_receipt(receipt):
+    """
+    저장된 Receipt 를 업로드 응답 형식으로 변환
+    """
+    return {
+        'store_name': receipt.store_name,
+        'datetime': receipt.visit_date.strftime('%Y-%m-%d %H:%M'),
+        'menu_items': [{'name': item.name, 'price': item.price} for item in receipt.menu_items],
+        'total_price': receipt.total_amount
+    }
+
+def save_receipt_infos(user_id, receipt_infos):
+    """
+    여러 OCR 결과를 Receipt, MenuItem, CafeVisit 테이블에 한 번에 저장
+
+    Receipt ID는 flush 한 번으로 할당하고 MenuItem은 bulk insert 한다.
+    커밋은 호출하는 쪽에서 한다.
+    """
+    results = [None] * len(receipt_infos)
+    
+    # 이미 저장된 같은 영수증이면 새로 저장하지 않음
+    existing = {}
+    if app.config['SKIP_DUPLICATE_RECEIPTS']:
+        hashes = {info.get('image_hash') for info in receipt_infos} - {None}
+        if hashes:
+            duplicates = Receipt.query.filter(Receipt.user_id == user_id, Receipt.image_hash.in_(hashes))
+            for receipt in duplicates:
+                existing.setdefault(receipt.image_hash, receipt)
+    
+    # Receipt 테이블에 저장
+    new_receipts = []
+    for index, receipt_info in enumerate(receipt_infos):
+        duplicate = existing.get(receipt_info.get('image_hash'))
+        if duplicate is not None:
+            logger.debug("Duplicate receipt, skipping insert: %s", duplicate.id)
+            metrics.increment('duplicate_receipt')
+            results[index] = dict(serialize_receipt(duplicate), duplicate=True)
+            continue
+        receipt = Receipt(
+            user_id=user_id,
+            store_name=receipt_info['store_name'],
+            visit_date=receipt_info['datetime'],
+            total_amount=receipt_info['total_price'],
+            image_hash=receipt_info.get('image_hash')
+        )
+        new_receipts.append((index, receipt_info, receipt))
+    
+    if not new_receipts:
+        return results
+    db.session.add_all([receipt for _, _, receipt in new_receipts])
+    flush_started = time.perf_counter()
+    db.session.flush()
+    flush_time = time.perf_counter() - flush_started
+    
+    # 메뉴 이름은 카탈로그 id 로 저장
+    name_ids = menu_item_name_ids(item['name'] for _, receipt_info, _ in new_receipts
+                                  for item in receipt_info['menu_items'])
+    menu_items = []
+    cafe_visits = []
+    geocode_started = time.perf_counter()
+    locations = [geocode(receipt_info.get('address'), receipt_info['store_name'], receipt_info.get('branch'))
+                 for _, receipt_info, _ in new_receipts]
+    metrics.observe('geocode', time.perf_counter() - geocode_started)
+    for (index, receipt_info, receipt), location in zip(new_receipts, locations):
+        # 메뉴 항목 저장
+        for item in receipt_info['menu_items']:
+            menu_items.append(MenuItem(
+                receipt_id=receipt.id,
+                name_id=name_ids[item['name'][:100]],
+                price=item['price']
+            ))
+        
+        # CafeVisit 테이블에도 저장 (메뉴는 영수증에서 조회)
+        cafe_visits.append(CafeVisit(
+            user_id=user_id,
+            cafe_name=receipt_info['store_name'],
+            visit_date=receipt_info['datetime'],
+            receipt_id=receipt.id,
+            total_price=receipt_info['total_price'],
+            location=(receipt_info.get('address') or '')[:200] or None,
+            # 지명 사전에서 찾지 못하면 좌표 없이 저장 (지도에 표시하지 않음)
+            latitude=location.latitude if location else None,
+            longitude=location.longitude if location else None
+        ))
+        
+        results[index] = {
+            'store_name': receipt_info['store_name'],
+            'datetime': receipt_info['datetime'].strftime('%Y-%m-%d %H:%M'),
+            'menu_items': receipt_info['menu_items'],
+            'total_price': receipt_info['total_price']
+        }
+    
+    flush_started = time.perf_counter()
+    db.session.bulk_save_objects(menu_items)
+    db.session.add_all(cafe_visits)
+    db.session.flush()
+    metrics.observe('db_flush', flush_time + time.perf_counter() - flush_started)
+    logger.debug("Added %d receipts, %d menu items and %d cafe visit records",
+                 len(new_receipts), len(menu_items), len(cafe_visits))
+    return results
+
+def commit_receipts():
+    """
+    저장한 영수증 커밋 (소요 시간 기록)
+    """
+    with metrics.timer('db_commit'):
+        db.session.commit()
+
+def save_receipt_info(user_id, receipt_info):
+    """
+    OCR 결과를 Receipt, MenuItem, CafeVisit 테이블에 저장
+    """
+    return save_receipt_infos(user_id, [receipt_info])[0]
+
+def open_uploaded_image(stream):
+    """
+    업로드 스트림에서 축소 해상도로 이미지 디코딩
+    """
+    from utils.ocr_helper import open_receipt_image
+    with metrics.timer('decode'):
+        image = open_receipt_image(stream)
+        image.load()
+    logger.debug("Opened image: mode=%s, size=%s", image.mode, image.size)
+    return image
+
+def recognize_receipt_image(image):
+    """
+    OCR 실행 (인식에 실패하면 저장하지 않도록 예외 발생)
+    """
+    from utils.ocr_helper import extract_receipt_info
+    receipt_info = extract_receipt_info(image)
+    if receipt_info.pop('is_fallback', False):
+        raise ValueError('영수증을 인식하지 못했습니다.')
+    return receipt_info
+
+def ocr_uploaded_image(stream):
+    """
+    업로드 스트림의 이미지를 열어 OCR 실행
+    """
+    return recognize_receipt_image(open_uploaded_image(stream))
+
+# 동시에 들어온 일괄 업로드 요청들이 함께 쓰는 OCR 실행 슬롯
+batch_ocr_slots = threading.BoundedSemaphore(max(1, app.config['BATCH_OCR_WORKERS']))
+
+def upload_digest(stream, chunk_size=1024 * 1024):
+    """
+    업로드 파일 내용의 SHA-256 (읽은 뒤 스트림은 처음으로 되돌림)
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def ocr_batch_image(stream):
+    """
+    일괄 업로드 파일 하나의 OCR (전체 동시 실행 수는 BATCH_OCR_WORKERS 로 제한)
+    """
+    with batch_ocr_slots:
+        return ocr_uploaded_image(stream)
+
+def process_receipt_job(payload):
+    """
+    OCR 워커에서 실행되는 영수증 처리 작업
+    """
+    receipt_info = recognize_receipt_image(payload['image'])
+    
+    # 작업이 끝난 시점에 DB에 저장
+    saved = store_receipt(payload['user_id'], receipt_info)
+    logger.info("Saved receipt from %s", payload['filename'])
+    return saved
+
+def write_receipt_batch(items):
+    """
+    (user_id, receipt_info) 목록을 한 트랜잭션으로 저장하고 항목별 결과 반환
+    """
+    with app.app_context():
+        try:
+            results = [save_receipt_info(user_id, receipt_info) for user_id, receipt_info in items]
+            commit_receipts()
+            return results
+        except Exception:
+            db.session.rollback()
+            raise
+
+receipt_writer = GroupCommitWriter(write_receipt_batch)
+
+def store_receipt(user_id, receipt_info):
+    """
+    영수증 하나 저장 (GROUP_COMMIT 이면 동시에 들어온 저장과 묶어서 커밋)
+    """
+    if app.config['GROUP_COMMIT']:
+        return receipt_writer.submit((user_id, receipt_info)).result()
+    return write_receipt_batch([(user_id, receipt_info)])[0]
+
+ocr_job_queue = OCRJobQueue(
+    process_receipt_job,
+    num_workers=app.config['OCR_WORKERS'],
+    max_queue_size=app.config['OCR_QUEUE_SIZE']
+)
+
 @app.route('/upload_receipt', methods=['POST'])
 @login_required
 def upload_receipt():
     try:
-        print("\n=== Receipt Upload Started ===")
-        print(f"Request Files: {request.files}")
-        print(f"Request Form: {request.form}")
-        
         if 'receipt' not in request.files:
-            print("No file in request")
             return jsonify({'error': '파일이 업로드되지 않았습니다.'}), 400
             
         file = request.files['receipt']
-        print(f"Received file: {file.filename}, Content Type: {file.content_type}")
+        logger.debug("Received file: %s, content type: %s", file.filename, file.content_type)
         
         if file.filename == '':
-            print("Empty filename")
             return jsonify({'error': '선택된 파일이 없습니다.'}), 400
         
+        # 축소 해상도로 바로 디코딩하여 원본 바이트 복사본을 큐에 넘기지 않음
         try:
-            # 이미지 파일 열기
-            image = Image.open(file.stream)
-            print(f"Opened image: {file.filename}, Mode: {image.mode}, Size: {image.size}")
-            
-            # OCR 처리
-            from utils.ocr_helper import extract_receipt_info
-            receipt_info = extract_receipt_info(image)
-            print("Receipt info extracted successfully")
-            print(f"Extracted Receipt Info: {receipt_info}")
-            
-            # 영수증 정보 저장
-            try:
-                # Receipt 테이블에 저장
-                receipt = Receipt(
-                    user_id=current_user.id,
-                    store_name=receipt_info['store_name'],
-                    visit_date=receipt_info['datetime'],
-                    total_amount=receipt_info['total_price']
-                )
-                db.session.add(receipt)
-                db.session.flush()
-                print(f"Created receipt record: {receipt.id}")
-                
-                # 메뉴 항목 저장
-                menu_items_text = []
-                for item in receipt_info['menu_items']:
-                    menu_item = MenuItem(
-                        receipt_id=receipt.id,
-                        name=item['name'],
-                        price=item['price']
-                    )
-                    db.session.add(menu_item)
-                    menu_items_text.append(f"{item['name']}: {item['price']}원")
-                    print(f"Added menu item: {item['name']} - {item['price']}원")
-                
-                # CafeVisit 테이블에도 저장
-                cafe_visit = CafeVisit(
-                    user_id=current_user.id,
-                    cafe_name=receipt_info['store_name'],
-                    visit_date=receipt_info['datetime'],
-                    menu_items='\n'.join(menu_items_text),
-                    total_price=receipt_info['total_price'],
-                    latitude=37.5665,  # 기본값으로 서울 시청 좌표 사용
-                    longitude=126.9780
-                )
-                db.session.add(cafe_visit)
-                print("Added cafe visit record")
-                
-                db.session.commit()
-                print("Receipt, menu items, and cafe visit saved to database successfully")
-                
-                return jsonify({
-                    'success': True,
-                    'message': '영수증이 성공적으로 처리되었습니다.',
-                    'receipt_info': {
-                        'store_name': receipt_info['store_name'],
-                        'datetime': receipt_info['datetime'].strftime('%Y-%m-%d %H:%M'),
-                        'menu_items': receipt_info['menu_items'],
-                        'total_price': receipt_info['total_price']
-                    }
-                })
-                
-            except Exception as e:
-                print(f"Database error: {str(e)}")
-                db.session.rollback()
-                return jsonify({'error': f'데이터베이스 저장 중 오류가 발생했습니다: {str(e)}'}), 500
-            
+            image = open_uploaded_image(file.stream)
         except Exception as e:
-            print(f"OCR processing error: {str(e)}")
-            return jsonify({'error': f'영수증 처리 중 오류가 발생했습니다: {str(e)}'}), 500
+            logger.warning("Image decode error (%s): %s", file.filename, e)
+            return jsonify({'error': '이미지 파일을 읽을 수 없습니다.'}), 400
+        
+        # OCR은 작업 큐에서 처리하고 작업 ID를 바로 반환
+        try:
+            job = ocr_job_queue.submit(current_user.id, {
+                'user_id': current_user.id,
+                'filename': file.filename,
+                'image': image
+            })
+        except QueueFullError as e:
+            return jsonify({'error': str(e)}), 503
+        logger.debug("Queued OCR job: %s", job.id)
+        
+        return jsonify({
+            'success': True,
+            'message': '영수증이 처리 대기열에 추가되었습니다.',
+            'job_id': job.id,
+            'status_url': url_for('receipt_job_status', job_id=job.id)
+        }), 202
             
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in upload_receipt")
         return jsonify({'error': f'서버 오류가 발생했습니다: {str(e)}'}), 500
 
+@app.route('/upload_receipts/batch', methods=['POST'])
+@login_required
+def upload_receipts_batch():
+    files = [file for file in request.files.getlist('receipts') if file.filename]
+    if not files:
+        return jsonify({'error': '파일이 업로드되지 않았습니다.'}), 400
+    if len(files) > app.config['BATCH_MAX_FILES']:
+        return jsonify({'error': f"한 번에 최대 {app.config['BATCH_MAX_FILES']}개까지 업로드할 수 있습니다."}), 400
+    
+    logger.info("Batch receipt upload: %d files", len(files))
+    results = [{'filename': file.filename} for file in files]
+    
+    # 헤더 검사에서 거부된 파일은 OCR 하지 않음
+    for index, file in enumerate(files):
+        rejection = getattr(file.stream, 'rejection', None)
+        if rejection is not None:
+            results[index].update(success=False, error=rejection.description)
+    
+    # 내용이 같은 파일은 처음 것만 OCR 하고 저장
+    first_index = {}
+    duplicates = {}
+    for index, file in enumerate(files):
+        if 'error' in results[index]:
+            continue
+        duplicates[index] = first_index.setdefault(upload_digest(file.stream), index)
+    unique = [index for index, first in duplicates.items() if index == first]
+    
+    # OCR 병렬 실행
+    futures = {}
+    if unique:
+        with ThreadPoolExecutor(max_workers=min(len(unique), app.config['BATCH_OCR_WORKERS'])) as executor:
+            futures = {index: executor.submit(ocr_batch_image, files[index].stream) for index in unique}
+    
+    succeeded = []
+    for index, future in futures.items():
+        try:
+            succeeded.append((index, future.result()))
+        except Exception as e:
+            logger.warning("OCR processing error (%s): %s", results[index]['filename'], e)
+            results[index].update(success=False, error=f'영수증 처리 중 오류가 발생했습니다: {str(e)}')
+    
+    # 성공한 영수증은 한 트랜잭션으로 저장
+    if succeeded:
+        try:
+            saved = save_receipt_infos(current_user.id, [receipt_info for _, receipt_info in succeeded])
+            commit_receipts()
+            for (index, _), receipt_info in zip(succeeded, saved):
+                results[index].update(success=True, receipt_info=receipt_info)
+        except Exception as e:
+            logger.exception("Database error while saving batch")
+            db.session.rollback()
+            for index, _ in succeeded:
+                results[index].update(success=False, error=f'데이터베이스 저장 중 오류가 발생했습니다: {str(e)}')
+    
+    for index, first in duplicates.items():
+        if index != first:
+            results[index].update({key: value for key, value in results[first].items() if key != 'filename'},
+                                  duplicate_of=files[first].filename)
+    
+    saved_count = sum(1 for result in results if result.get('success') and 'duplicate_of' not in result)
+    failed_count = sum(1 for result in results if not result.get('success'))
+    return jsonify({
+        'success': saved_count > 0,
+        'saved': saved_count,
+        'failed': failed_count,
+        'duplicates': len(results) - saved_count - failed_count,
+        'results': results
+    })
+
+@app.route('/uploads/stats')
+@login_required
+def upload_stats_view():
+    return jsonify(upload_stats.to_dict())
+
+@app.route('/metrics')
+def metrics_view():
+    """
+    영수증 처리 단계별 히스토그램 (기본 Prometheus 텍스트, ?format=json 이면 JSON)
+    """
+    # 리버스 프록시 뒤에서는 remote_addr 가 항상 프록시 주소이므로 METRICS_TOKEN 으로 보호해야 함
+    token = app.config['METRICS_TOKEN']
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(403)
+    elif app.config['METRICS_LOCAL_ONLY'] and request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return app.response_class(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.errorhandler(RequestEntityTooLarge)
+@app.errorhandler(UnsupportedMediaType)
+def upload_rejected(e):
+    return jsonify({'error': e.description}), e.code
+
+@app.route('/receipts/jobs/<job_id>')
+@login_required
+def receipt_job_status(job_id):
+    job = ocr_job_queue.get(job_id)
+    if job is None or job.owner_id != current_user.id:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/receipts/jobs/stats')
+@login_required
+def receipt_job_stats():
+    stats = ocr_job_queue.stats()
+    if app.config['GROUP_COMMIT']:
+        stats['group_commit'] = receipt_writer.stats()
+    return jsonify(stats)
+
+@app.route('/receipts/cache/stats')
+@login_required
+def receipt_cache_stats():
+    from utils.ocr_cache import get_ocr_cache
+    cache = get_ocr_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.stats(), enabled=True))
+
+@app.route('/api/visits')
+@login_required
+def list_visits():
+    limit = min(request.args.get('limit', app.config['VISITS_PAGE_SIZE'], type=int), 100)
+    try:
+        visits, next_cursor = query_visit_page(current_user.id, request.args.get('cursor'), max(limit, 1))
+    except ValueError:
+        return jsonify({'error': '잘못된 커서입니다.'}), 400
+    return jsonify({'visits': visits, 'next_cursor': next_cursor})
+
+@app.route('/api/visits/events')
+@login_required
+def visit_events():
+    """
+    새로 저장되거나 수정된 방문 기록을 server-sent events 로 전달
+
+    브라우저가 재연결하면서 보내는 Last-Event-ID (첫 연결은 last_event_id 파라미터) 이후의 이벤트를
+    이어서 보내며, 놓친 이벤트를 알 수 없으면 resync 이벤트를 보낸다.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    user_id = current_user.id
+    keepalive = app.config['SSE_KEEPALIVE']
+    deadline = time.monotonic() + app.config['SSE_MAX_SECONDS']
+    
+    # 스트림은 요청 컨텍스트 밖에서 실행되므로 DB 연결을 붙잡고 있지 않음
+    def stream():
+        subscription = visit_event_broker.subscribe(user_id, last_event_id)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while (remaining := deadline - time.monotonic()) > 0:
+                event = subscription.get(timeout=min(keepalive, remaining))
+                yield format_event(event) if event is not None else ': keepalive\n\n'
+        finally:
+            visit_event_broker.unsubscribe(subscription)
+    
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 끄기
+    return response
+
+def parse_bbox(value):
+    """
+    'minLng,minLat,maxLng,maxLat' 형식의 영역 파싱
+    """
+    min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    if min_lat > max_lat or min_lng > max_lng:
+        raise ValueError('invalid bbox')
+    return max(min_lat, -90.0), max(min_lng, -180.0), min(max_lat, 90.0), min(max_lng, 180.0)
+
+@app.route('/api/visits/markers')
+@login_required
+def visit_markers():
+    try:
+        min_lat, min_lng, max_lat, max_lng = parse_bbox(request.args.get('bbox', ''))
+        level = request.args.get('zoom', 3, type=int)
+    except ValueError:
+        return jsonify({'error': 'bbox=minLng,minLat,maxLng,maxLat 형식이 필요합니다.'}), 400
+    
+    # geohash 접두사 범위로 인덱스를 타고, 좌표로 정확히 거름
+    cluster_precision = CLUSTER_PRECISION_BY_LEVEL.get(min(level, 14)) if level >= 6 else None
+    prefixes = geohash.covering_prefixes(min_lat, min_lng, max_lat, max_lng, cluster_precision or GEOHASH_PRECISION)
+    in_view = [
+        CafeVisit.user_id == current_user.id,
+        db.or_(*[db.and_(CafeVisit.geohash >= prefix, CafeVisit.geohash < prefix + geohash.PREFIX_UPPER_BOUND)
+                 for prefix in prefixes]),
+        CafeVisit.latitude.between(min_lat, max_lat),
+        CafeVisit.longitude.between(min_lng, max_lng)
+    ]
+    
+    # 낮은 확대 수준에서는 geohash 셀 단위로 묶어서 개수만 반환
+    if cluster_precision:
+        cell = db.func.substr(CafeVisit.geohash, 1, cluster_precision)
+        rows = db.session.query(
+            cell.label('cell'),
+            db.func.count(CafeVisit.id),
+            db.func.avg(CafeVisit.latitude),
+            db.func.avg(CafeVisit.longitude)
+        ).filter(*in_view).group_by(cell).all()
+        return jsonify({
+            'clustered': True,
+            'clusters': [{'cell': cell, 'count': count, 'latitude': latitude, 'longitude': longitude}
+                         for cell, count, latitude, longitude in rows]
+        })
+    
+    rows = db.session.query(
+        CafeVisit.id, CafeVisit.cafe_name, CafeVisit.location, CafeVisit.rating,
+        CafeVisit.latitude, CafeVisit.longitude
+    ).filter(*in_view).limit(MAX_VIEWPORT_MARKERS + 1).all()
+    return jsonify({
+        'clustered': False,
+        'truncated': len(rows) > MAX_VIEWPORT_MARKERS,
+        'markers': [{
+            'id': row.id,
+            'cafe_name': row.cafe_name,
+            'location': row.location,
+            'rating': row.rating,
+            'latitude': row.latitude,
+            'longitude': row.longitude
+        } for row in rows[:MAX_VIEWPORT_MARKERS]]
+    })
+
+@app.route('/api/stats/monthly')
+@login_required
+def monthly_spend_stats():
+    months = min(request.args.get('months', 12, type=int), 120)
+    rows = UserMonthlySpend.query.filter_by(user_id=current_user.id) \
+        .order_by(UserMonthlySpend.month.desc()).limit(months).all()
+    return jsonify({'months': [{
+        'month': row.month,
+        'total_spent': row.total_spent,
+        'visit_count': row.visit_count
+    } for row in rows]})
+
+@app.route('/api/stats/cafes')
+@login_required
+def cafe_visit_stats():
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    rows = UserCafeStat.query.filter_by(user_id=current_user.id) \
+        .order_by(UserCafeStat.visit_count.desc()).limit(limit).all()
+    return jsonify({'cafes': [{
+        'cafe_name': row.cafe_name,
+        'visit_count': row.visit_count,
+        'total_spent': row.total_spent,
+        'last_visit': row.last_visit.strftime('%Y-%m-%d %H:%M') if row.last_visit else None
+    } for row in rows]})
+
+@app.route('/api/stats/menu')
+@login_required
+def menu_item_stats():
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    rows = UserMenuStat.query.filter_by(user_id=current_user.id) \
+        .order_by(UserMenuStat.order_count.desc()).limit(limit).all()
+    return jsonify({'menu_items': [{
+        'name': row.menu_name,
+        'order_count': row.order_count,
+        'total_spent': row.total_spent
+    } for row in rows]})
+
+# 내보내기 항목 (menu_items 는 영수증의 메뉴 목록)
+VISIT_EXPORT_FIELDS = ('id', 'cafe_name', 'visit_date', 'total_price', 'location', 'rating', 'comment',
+                       'latitude', 'longitude', 'menu_items', 'menu_note')
+RECEIPT_EXPORT_FIELDS = ('id', 'store_name', 'visit_date', 'total_amount', 'menu_items', 'menu_note')
+
+def parse_export_range(args):
+    """
+    from, to (YYYY-MM-DD, to 는 그날 포함) 파라미터를 [시작, 끝) 범위로 변환
+    """
+    start = datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from') else None
+    end = datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1) if args.get('to') else None
+    return start, end
+
+def iter_export_batches(query, batch_size):
+    """
+    서버 측 커서에서 batch_size 행씩 읽고, 묶음마다 메뉴를 한 번에 조회하여 dict 목록으로 반환
+
+    묶음 하나만 메모리에 두므로 전체 행 수와 관계없이 메모리 사용량이 일정하다.
+    """
+    batch = []
+    for row in query.yield_per(batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield export_rows(batch)
+            batch = []
+    if batch:
+        yield export_rows(batch)
+
+def export_rows(rows):
+    receipt_ids = {row.receipt_id for row in rows}
+    menu_items = query_menu_items(receipt_ids)
+    menu_notes = query_menu_notes(receipt_ids)
+    exported = []
+    for row in rows:
+        data = row._asdict()
+        receipt_id = data.pop('receipt_id')
+        data['menu_items'] = menu_items.get(receipt_id, [])
+        data['menu_note'] = menu_notes.get(receipt_id)
+        exported.append(data)
+    metrics.increment('export_rows', len(exported))
+    return exported
+
+def export_response(query, fields, name):
+    """
+    조회 결과를 CSV 또는 NDJSON 으로 스트리밍하는 응답 (?format=csv|ndjson)
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_WRITERS:
+        return jsonify({'error': 'format 은 csv 또는 ndjson 이어야 합니다.'}), 400
+    batches = iter_export_batches(query, app.config['EXPORT_BATCH_SIZE'])
+    # 스트리밍하는 동안 세션(커서)을 유지하도록 요청 컨텍스트를 함께 넘김
+    response = Response(stream_with_context(EXPORT_WRITERS[export_format](batches, fields)),
+                        mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{export_format}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/export/visits')
+@login_required
+def export_visits():
+    try:
+        start, end = parse_export_range(request.args)
+    except ValueError:
+        return jsonify({'error': 'from, to 는 YYYY-MM-DD 형식이어야 합니다.'}), 400
+    # (user_id, visit_date) 인덱스 순서대로 읽음
+    query = db.session.query(
+        CafeVisit.id, CafeVisit.cafe_name, CafeVisit.visit_date, CafeVisit.total_price, CafeVisit.location,
+        CafeVisit.rating, CafeVisit.comment, CafeVisit.latitude, CafeVisit.longitude, CafeVisit.receipt_id
+    ).filter(CafeVisit.user_id == current_user.id)
+    if start is not None:
+        query = query.filter(CafeVisit.visit_date >= start)
+    if end is not None:
+        query = query.filter(CafeVisit.visit_date < end)
+    return export_response(query.order_by(CafeVisit.visit_date, CafeVisit.id), VISIT_EXPORT_FIELDS, 'visits')
+
+@app.route('/export/receipts')
+@login_required
+def export_receipts():
+    try:
+        start, end = parse_export_range(request.args)
+    except ValueError:
+        return jsonify({'error': 'from, to 는 YYYY-MM-DD 형식이어야 합니다.'}), 400
+    # (user_id, visit_date) 인덱스 순서대로 읽음
+    query = db.session.query(
+        Receipt.id, Receipt.store_name, Receipt.visit_date, Receipt.total_amount, Receipt.id.label('receipt_id')
+    ).filter(Receipt.user_id == current_user.id)
+    if start is not None:
+        query = query.filter(Receipt.visit_date >= start)
+    if end is not None:
+        query = query.filter(Receipt.visit_date < end)
+    return export_response(query.order_by(Receipt.visit_date, Receipt.id), RECEIPT_EXPORT_FIELDS, 'receipts')
+
 @app.route('/update_visit/<int:visit_id>', methods=['POST'])
 @login_required
 def update_visit(visit_id):
@@ -241,10 +1513,14 @@ def update_visit(visit_id):
     data = request.json
     visit.cafe_name = data.get('cafe_name', visit.cafe_name)
     visit.location = data.get('location', visit.location)
-    visit.rating = float(data.get('rating', visit.rating))
     visit.comment = data.get('comment', visit.comment)
-    visit.latitude = float(data.get('latitude', visit.latitude))
-    visit.longitude = float(data.get('longitude', visit.longitude))
+    # 보낸 값만 숫자로 변환 (좌표가 없는 방문 기록은 None 그대로 유지)
+    try:
+        for name in ('rating', 'latitude', 'longitude'):
+            if data.get(name) is not None:
+                setattr(visit, name, float(data[name]))
+    except (TypeError, ValueError):
+        return jsonify({'error': f'{name} 은 숫자여야 합니다.'}), 400
     
     db.session.commit()
     return jsonify({'success': True})
@@ -253,12 +1529,26 @@ def update_visit(visit_id):
 @login_required
 def add_visit():
     data = request.json
+    visit_date = datetime.strptime(data['visit_date'], '%Y-%m-%d %H:%M')
+    total_price = float(data['total_price'])
+    
+    # 직접 입력한 메뉴도 영수증 + 메뉴 항목으로 저장
+    receipt = Receipt(user_id=current_user.id, store_name=data['cafe_name'], visit_date=visit_date,
+                      total_amount=total_price)
+    db.session.add(receipt)
+    db.session.flush()
+    items, receipt.menu_note = parse_visit_menu_items(data.get('menu_items'))
+    if items:
+        name_ids = menu_item_name_ids(name for name, _ in items)
+        db.session.bulk_save_objects([MenuItem(receipt_id=receipt.id, name_id=name_ids[name], price=price)
+                                      for name, price in items])
+    
     visit = CafeVisit(
         user_id=current_user.id,
         cafe_name=data['cafe_name'],
-        visit_date=datetime.strptime(data['visit_date'], '%Y-%m-%d %H:%M'),
-        menu_items=data['menu_items'],
-        total_price=float(data['total_price']),
+        visit_date=visit_date,
+        receipt_id=receipt.id,
+        total_price=total_price,
         location=data['location'],
         rating=float(data['rating']),
         comment=data['comment'],
@@ -272,35 +1562,38 @@ def add_visit():
 @app.route('/search_places', methods=['POST'])
 def search_places():
     query = request.form.get('query')
+    if not query:
+        return jsonify({'error': '검색어를 입력해주세요.'}), 400
     try:
         # Places API를 사용하여 장소 검색
-        url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?query={query}&key={GOOGLE_MAPS_API_KEY}"
-        response = requests.get(url)
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify(places_client.text_search(query))
+    except PlacesAPIError as e:
+        return jsonify({'error': str(e)}), 502
 
 @app.route('/get_place_details/<place_id>')
 def get_place_details(place_id):
     try:
         # Places API를 사용하여 장소 상세 정보 가져오기
-        url = f"https://maps.googleapis.com/maps/api/place/details/json?place_id={place_id}&key={GOOGLE_MAPS_API_KEY}"
-        response = requests.get(url)
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify(places_client.place_details(place_id))
+    except PlacesAPIError as e:
+        return jsonify({'error': str(e)}), 502
 
 @app.route('/calculate_distance', methods=['POST'])
 def calculate_distance():
     origin = request.form.get('origin')
     destination = request.form.get('destination')
+    if not origin or not destination:
+        return jsonify({'error': '출발지와 도착지를 입력해주세요.'}), 400
     try:
         # Distance Matrix API를 사용하여 거리 계산
-        url = f"https://maps.googleapis.com/maps/api/distancematrix/json?origins={origin}&destinations={destination}&key={GOOGLE_MAPS_API_KEY}"
-        response = requests.get(url)
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify(places_client.distance_matrix(origin, destination))
+    except PlacesAPIError as e:
+        return jsonify({'error': str(e)}), 502
+
+@app.route('/places/stats')
+@login_required
+def places_stats():
+    return jsonify(places_client.stats())
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080, debug=True)
+    create_app().run(host='0.0.0.0', port=8080, debug=True)
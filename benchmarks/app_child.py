@@ -0,0 +1,25 @@
+"""
+벤치마크 공용 실행기
+
+측정마다 임시 디렉터리의 새 SQLite DB 를 쓰는 새 프로세스에서 앱 코드(CHILD)를 실행하고,
+마지막 줄에 출력한 JSON 결과를 읽는다.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_app_child(code, args=(), **settings):
+    """
+    code 를 ROOT 에서 python -c 로 실행하고 출력 마지막 줄의 JSON 을 반환 (settings 는 환경 변수)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", LOG_LEVEL='WARNING')
+        env.update(settings)
+        output = subprocess.run([sys.executable, '-c', code, *map(str, args)],
+                                cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,124 @@
+"""
+로그인 / 인증된 요청 처리량 비교
+
+각 모드를 새 프로세스로 실행하여 여러 스레드가 각자의 테스트 클라이언트로
+POST /login 을 반복할 때와, 로그인한 상태에서 /api/stats/monthly 를 반복 요청할 때의
+처리량과 지연 시간을 측정한다. 요청이 실패하거나, before 와 함께 측정했을 때 캐시를 쓰는 모드의
+인증된 요청 처리량이 before 의 --min-speedup 배보다 낮으면 실패로 종료한다.
+
+    before   : 사용자 캐시 없음 (요청마다 User 조회), PBKDF2 260000회
+    cached   : 사용자 캐시 사용, PBKDF2 260000회
+    fast     : 사용자 캐시 사용, PBKDF2 --iterations 회
+
+    python benchmarks/bench_auth.py [--threads 8] [--logins 20] [--requests 500] [--iterations 100000]
+"""
+import argparse
+import sys
+
+from app_child import run_app_child
+
+CHILD = r'''
+import json, sys, threading, time
+threads, logins, requests_per_thread = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+import app as cafe_app
+from utils.metrics import summarize_samples
+cafe_app.create_app()
+form = {'username': 'test', 'password': 'test123'}
+
+def run(target, count):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        client = cafe_app.app.test_client()
+        if target != '/login':
+            client.post('/login', data=form)
+        for _ in range(count):
+            started = time.perf_counter()
+            if target == '/login':
+                response = client.post('/login', data=form)
+                ok = response.status_code == 302 and '/dashboard' in response.headers.get('Location', '')
+            else:
+                response = client.get(target)
+                ok = response.status_code == 200
+            elapsed = time.perf_counter() - started
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    seconds = time.perf_counter() - started
+    summary = summarize_samples(latencies)
+    return {
+        'seconds': seconds,
+        'ok': len(latencies),
+        'errors': len(errors),
+        'p50': summary['p50'],
+        'p95': summary['p95'],
+    }
+
+# 첫 로그인에서 설정된 반복 횟수로 다시 해시되므로 측정 전에 한 번 로그인
+cafe_app.app.test_client().post('/login', data=form)
+cafe_app.metrics.reset()
+result = {'login': run('/login', logins), 'request': run('/api/stats/monthly', requests_per_thread)}
+counters = cafe_app.metrics.snapshot()['counters']
+result['user_cache'] = {key: counters.get(key, 0) for key in ('user_cache_hit', 'user_cache_miss')}
+print(json.dumps(result))
+'''
+
+
+def modes(iterations):
+    return {
+        'before': {'USER_CACHE_TTL': '0', 'PASSWORD_HASH_ITERATIONS': '260000'},
+        'cached': {'USER_CACHE_TTL': '300', 'PASSWORD_HASH_ITERATIONS': '260000'},
+        'fast': {'USER_CACHE_TTL': '300', 'PASSWORD_HASH_ITERATIONS': str(iterations)},
+    }
+
+
+def run_mode(settings, threads, logins, requests_per_thread):
+    return run_app_child(CHILD, (threads, logins, requests_per_thread), DB_POOL_SIZE=str(threads), **settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로그인 / 인증된 요청 처리량 비교')
+    parser.add_argument('--threads', type=int, default=8, help='동시에 요청하는 스레드 수')
+    parser.add_argument('--logins', type=int, default=20, help='스레드당 로그인 횟수')
+    parser.add_argument('--requests', type=int, default=500, help='스레드당 인증된 요청 수')
+    parser.add_argument('--iterations', type=int, default=100000, help='fast 모드의 PBKDF2 반복 횟수')
+    parser.add_argument('--modes', default='before,cached,fast', help='측정할 모드 (쉼표 구분)')
+    parser.add_argument('--min-speedup', type=float, default=1.0,
+                        help='cached/fast 모드의 인증된 요청 처리량이 before 대비 최소 이 배수여야 함')
+    args = parser.parse_args()
+
+    all_modes = modes(args.iterations)
+    results = {}
+    for name in args.modes.split(','):
+        result = results[name] = run_mode(all_modes[name], args.threads, args.logins, args.requests)
+        for kind in ('login', 'request'):
+            stats = result[kind]
+            print(f"{name:<7} {kind:<8} {stats['ok'] / stats['seconds']:9.1f} /s  ok={stats['ok']} "
+                  f"errors={stats['errors']}  p50={stats['p50'] * 1000:7.2f}ms p95={stats['p95'] * 1000:7.2f}ms")
+        print(f"        user cache: {result['user_cache']}")
+
+    failures = [f"{name} {kind}: {result[kind]['errors']} errors"
+                for name, result in results.items() for kind in ('login', 'request') if result[kind]['errors']]
+    if 'before' in results:
+        for kind in ('login', 'request'):
+            base = results['before'][kind]['ok'] / results['before'][kind]['seconds']
+            for name, result in results.items():
+                if name != 'before':
+                    speedup = result[kind]['ok'] / result[kind]['seconds'] / base
+                    print(f"{name} vs before ({kind}): {speedup:.2f}x")
+                    if kind == 'request' and speedup < args.min_speedup:
+                        failures.append(f"{name} request throughput {speedup:.2f}x < {args.min_speedup}x before")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+방문 기록 / 영수증 내보내기 메모리 사용량과 처리량 측정
+
+행 수마다 새 프로세스에서 영수증(메뉴 3개)과 방문 기록을 만든 뒤
+/export/visits, /export/receipts 응답을 끝까지 읽으면서 처리량과 파이썬 힙 최대 사용량(tracemalloc)을 측정한다.
+스트리밍 내보내기는 행 수가 늘어도 최대 메모리가 거의 같아야 하므로, 가장 큰 행 수의 최대 메모리가
+가장 작은 행 수의 --max-peak-growth 배를 넘거나 응답이 비어 있으면 실패로 종료한다.
+
+    python benchmarks/bench_export.py [--rows 1000,100000] [--format csv]
+"""
+import argparse
+import sys
+
+from app_child import run_app_child
+
+CHILD = r'''
+import json, sys, time, tracemalloc
+from datetime import datetime, timedelta
+rows, export_format = int(sys.argv[1]), sys.argv[2]
+import app as cafe_app
+cafe_app.create_app()
+form = {'username': 'test', 'password': 'test123'}
+
+with cafe_app.app.app_context():
+    db = cafe_app.db
+    user_id = cafe_app.User.query.filter_by(username='test').first().id
+    name_ids = cafe_app.menu_item_name_ids(['아메리카노', '카페라떼', '치즈케이크'])
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, 10000):
+        count = min(10000, rows - offset)
+        dates = [start + timedelta(minutes=30 * (offset + i)) for i in range(count)]
+        db.session.execute(cafe_app.Receipt.__table__.insert(), [
+            {'id': offset + i + 1, 'user_id': user_id, 'store_name': f'Bench Cafe {i % 50}',
+             'visit_date': dates[i], 'total_amount': 16000} for i in range(count)])
+        db.session.execute(cafe_app.MenuItem.__table__.insert(), [
+            {'receipt_id': offset + i + 1, 'name_id': name_id, 'price': price}
+            for i in range(count) for name_id, price in zip(name_ids.values(), (4500, 5000, 6500))])
+        db.session.execute(cafe_app.CafeVisit.__table__.insert(), [
+            {'user_id': user_id, 'cafe_name': f'Bench Cafe {i % 50}', 'visit_date': dates[i],
+             'receipt_id': offset + i + 1, 'total_price': 16000, 'location': '서울',
+             'latitude': 37.5, 'longitude': 127.0} for i in range(count)])
+    db.session.commit()
+
+client = cafe_app.app.test_client()
+client.post('/login', data=form)
+result = {}
+for path in ('/export/visits', '/export/receipts'):
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(f'{path}?format={export_format}', buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result[path] = {'seconds': seconds, 'bytes': size, 'peak': peak}
+print(json.dumps(result))
+'''
+
+
+def run(rows, export_format):
+    return run_app_child(CHILD, (rows, export_format))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='방문 기록 / 영수증 내보내기 메모리 사용량과 처리량 측정')
+    parser.add_argument('--rows', default='1000,100000', help='만들 방문 기록 수 (쉼표 구분)')
+    parser.add_argument('--format', default='csv', choices=('csv', 'ndjson'), help='내보내기 형식')
+    parser.add_argument('--max-peak-growth', type=float, default=2.0,
+                        help='가장 큰 행 수의 최대 메모리가 가장 작은 행 수 대비 넘으면 안 되는 배수')
+    args = parser.parse_args()
+
+    results = {}
+    for rows in sorted(int(value) for value in args.rows.split(',')):
+        result = results[rows] = run(rows, args.format)
+        for path, stats in result.items():
+            print(f"{rows:>8} rows {path:<17} {rows / stats['seconds']:9.0f} rows/s  "
+                  f"{stats['bytes'] / 1024 / 1024:7.1f}MB out  peak heap {stats['peak'] / 1024 / 1024:6.2f}MB")
+
+    failures = [f"{path} returned no data for {rows} rows"
+                for rows, result in results.items() for path, stats in result.items() if not stats['bytes']]
+    smallest, largest = results[min(results)], results[max(results)]
+    for path, stats in largest.items():
+        growth = stats['peak'] / smallest[path]['peak']
+        if growth > args.max_peak_growth:
+            failures.append(f"{path} peak heap grew {growth:.1f}x from {min(results)} to {max(results)} rows")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+영수증 OCR 파이프라인 벤치마크
+
+샘플 영수증 이미지(와 축소/확대, 회전한 변형)를 open_receipt_image → extract_receipt_info
+로 처리하여 단계별 지연 시간 분위수, 워커 수별 처리량, 최대 메모리,
+매장명/날짜/총액 정확도를 측정한다. 결과를 JSON 으로 저장하고 이전 결과와 비교할 수 있다.
+
+    python benchmarks/bench_ocr.py [--images 'test*.png' ...] [--workers 4] [--repeat 3]
+                                   [--scales 0.5,1.5] [--rotations -3,3]
+                                   [--save baseline.json] [--compare baseline.json] [--no-layout]
+
+기대값은 benchmarks/ocr_expected.json 에 원본 파일 이름을 키로 저장한다.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PIL import Image  # noqa: E402
+
+from utils.image_preprocess import open_receipt_image  # noqa: E402
+from utils.metrics import MetricsRegistry  # noqa: E402
+from utils import ocr_helper  # noqa: E402
+
+DEFAULT_IMAGES = ['test1.png', 'test_2.jpeg', '스크린샷 2024-12-03 17.20.13.png']
+DEFAULT_EXPECTED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_expected.json')
+FIELDS = ('store_name', 'date', 'total_price')
+
+
+def parse_floats(value):
+    return [float(item) for item in value.split(',') if item.strip()]
+
+
+def encode_image(image, format):
+    buffer = io.BytesIO()
+    if format in ('JPEG', 'MPO'):
+        image.convert('RGB').save(buffer, 'JPEG', quality=90)
+    else:
+        image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def build_corpus(paths, scales, rotations):
+    """
+    원본 이미지 바이트와 축소/확대, 회전 변형 목록 [(이름, 원본 파일 이름, 바이트)]
+    """
+    corpus = []
+    for path in paths:
+        base = os.path.basename(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        corpus.append((base, base, data))
+
+        original = Image.open(io.BytesIO(data))
+        format = original.format
+        original = original.convert('RGB')
+        for scale in scales:
+            size = (max(1, int(original.width * scale)), max(1, int(original.height * scale)))
+            variant = original.resize(size, Image.LANCZOS)
+            corpus.append((f'{base}@x{scale:g}', base, encode_image(variant, format)))
+        for angle in rotations:
+            variant = original.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=(255, 255, 255))
+            corpus.append((f'{base}@rot{angle:g}', base, encode_image(variant, format)))
+    return corpus
+
+
+def run_pipeline(data, registry):
+    with registry.timer('decode'):
+        image = open_receipt_image(io.BytesIO(data))
+        image.load()
+    with registry.timer('total'):
+        return ocr_helper.extract_receipt_info(image, use_cache=False)
+
+
+def field_matches(result, expected):
+    """
+    필드별 정답 여부 (매장명은 공백/대소문자 무시 포함 여부로 비교)
+    """
+    matches = {}
+    if 'store_name' in expected:
+        actual = ''.join((result.get('store_name') or '').split()).upper()
+        matches['store_name'] = ''.join(expected['store_name'].split()).upper() in actual
+    if 'date' in expected:
+        value = result.get('datetime')
+        matches['date'] = value is not None and value.strftime('%Y-%m-%d') == expected['date']
+    if 'total_price' in expected:
+        matches['total_price'] = result.get('total_price') == expected['total_price']
+    return matches
+
+
+def measure_accuracy(corpus, expected):
+    """
+    한 장씩 순서대로 처리하며 정확도와 Python 힙 최대 사용량 측정
+    """
+    registry = MetricsRegistry()
+    per_image = {}
+    totals = {field: [0, 0] for field in FIELDS}
+    tracemalloc.start()
+    for name, base, data in corpus:
+        result = run_pipeline(data, registry)
+        matches = field_matches(result, expected.get(base, {}))
+        per_image[name] = {
+            'store_name': result.get('store_name'),
+            'date': result['datetime'].strftime('%Y-%m-%d') if result.get('datetime') else None,
+            'total_price': result.get('total_price'),
+            'tier': result.get('ocr_tier'),
+            'matches': matches,
+        }
+        for field, ok in matches.items():
+            totals[field][0] += int(ok)
+            totals[field][1] += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    accuracy = {field: round(correct / count, 4) if count else None
+                for field, (correct, count) in totals.items()}
+    return accuracy, per_image, peak
+
+
+def measure_throughput(corpus, workers, repeat):
+    """
+    워커 수별 처리량과 단계별 지연 시간 (OCR 스레드 풀은 앱의 작업 큐와 같은 방식)
+    """
+    ocr_helper.metrics.reset()
+    registry = MetricsRegistry()
+    items = [data for _, _, data in corpus] * repeat
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda data: run_pipeline(data, registry), items))
+    elapsed = time.perf_counter() - started
+    # 파이프라인 내부 단계(preprocess, ocr, parse ...) 는 전역 레지스트리에 기록됨
+    stages = ocr_helper.metrics.snapshot()['stages']
+    stages.update(registry.snapshot()['stages'])
+    return {
+        'workers': workers,
+        'images': len(items),
+        'seconds': round(elapsed, 4),
+        'images_per_second': round(len(items) / elapsed, 3),
+        'stages': {stage: {key: snapshot[key] for key in ('count', 'avg', 'p50', 'p95', 'p99', 'max')}
+                   for stage, snapshot in sorted(stages.items())},
+    }
+
+
+def max_rss_mb(who):
+    # 자식 프로세스(tesseract) 값은 fork 시점의 부모 RSS 가 섞이므로 자기 프로세스만 측정
+    usage = resource.getrusage(who).ru_maxrss
+    # macOS 는 바이트, Linux 는 KB 단위
+    return round(usage / (1024 * 1024) if platform.system() == 'Darwin' else usage / 1024, 1)
+
+
+def compare(current, baseline, threshold):
+    """
+    이전 결과 대비 처리량/지연 시간/정확도 악화 항목 목록
+    """
+    regressions = []
+    for field, value in baseline.get('accuracy', {}).items():
+        now = current['accuracy'].get(field)
+        if value is not None and now is not None and now < value:
+            regressions.append(f"accuracy.{field}: {value} -> {now}")
+
+    old_runs = {run['workers']: run for run in baseline.get('throughput', [])}
+    for run in current['throughput']:
+        old = old_runs.get(run['workers'])
+        if old is None:
+            continue
+        if run['images_per_second'] < old['images_per_second'] * (1 - threshold):
+            regressions.append(f"workers={run['workers']} images/s: "
+                               f"{old['images_per_second']} -> {run['images_per_second']}")
+        for stage, stats in run['stages'].items():
+            old_stats = old['stages'].get(stage)
+            if old_stats and old_stats['p95'] and stats['p95'] > old_stats['p95'] * (1 + threshold):
+                regressions.append(f"workers={run['workers']} {stage}.p95: "
+                                   f"{old_stats['p95'] * 1000:.1f}ms -> {stats['p95'] * 1000:.1f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='영수증 OCR 파이프라인 벤치마크')
+    parser.add_argument('--images', nargs='*', default=None, help='이미지 경로 또는 glob (기본: 저장소 샘플 영수증)')
+    parser.add_argument('--expected', default=DEFAULT_EXPECTED, help='필드 기대값 JSON')
+    parser.add_argument('--scales', type=parse_floats, default=[0.5, 1.5], help='축소/확대 배율 (쉼표 구분)')
+    parser.add_argument('--rotations', type=parse_floats, default=[-3.0, 3.0], help='회전 각도 (쉼표 구분)')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='최대 워커 수 (1..N 측정)')
+    parser.add_argument('--repeat', type=int, default=2, help='처리량 측정 시 코퍼스 반복 횟수')
+    parser.add_argument('--engine', choices=['auto', 'tesserocr', 'pytesseract'], help='OCR 엔진')
+    parser.add_argument('--no-layout', action='store_true', help='영역 분할 없이 한 번에 인식 (OCR_LAYOUT=0)')
+    parser.add_argument('--save', help='결과를 저장할 JSON 경로')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 경로')
+    parser.add_argument('--threshold', type=float, default=0.10, help='악화로 판단할 비율')
+    args = parser.parse_args()
+
+    patterns = args.images or [os.path.join(ROOT, name) for name in DEFAULT_IMAGES]
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        print(f"No images found: {patterns}")
+        return 1
+    with open(args.expected, encoding='utf-8') as f:
+        expected = json.load(f)
+    if args.no_layout:
+        os.environ['OCR_LAYOUT'] = '0'
+    if args.engine:
+        ocr_helper.set_ocr_engine(ocr_helper.create_ocr_engine(args.engine))
+
+    corpus = build_corpus(paths, args.scales, args.rotations)
+    engine = ocr_helper.get_ocr_engine()
+    print(f"{len(corpus)} images ({len(paths)} originals), engine={engine.name}, "
+          f"layout={'on' if ocr_helper.layout_enabled() else 'off'}")
+
+    accuracy, per_image, heap_peak = measure_accuracy(corpus, expected)
+    for name, info in per_image.items():
+        marks = ' '.join(f"{field}={'ok' if ok else 'X'}" for field, ok in info['matches'].items())
+        print(f"  {name:<48} {marks} tier={info['tier']}")
+    print("accuracy: " + ', '.join(f"{field}={value}" for field, value in accuracy.items()))
+    tiers = Counter(info['tier'] for info in per_image.values())
+    print("tiers used: " + ', '.join(f"{tier}={count}" for tier, count in sorted(tiers.items(), key=str)))
+
+    throughput = []
+    for workers in range(1, args.workers + 1):
+        run = measure_throughput(corpus, workers, args.repeat)
+        throughput.append(run)
+        print(f"\nworkers={workers}: {run['images']} images in {run['seconds']:.2f}s "
+              f"({run['images_per_second']:.2f} images/s)")
+        for stage, stats in run['stages'].items():
+            print(f"  {stage:<22} p50={stats['p50'] * 1000:8.1f}ms  p95={stats['p95'] * 1000:8.1f}ms  "
+                  f"p99={stats['p99'] * 1000:8.1f}ms")
+
+    memory = {
+        'python_heap_peak_mb': round(heap_peak / (1024 * 1024), 1),
+        'max_rss_mb': max_rss_mb(resource.RUSAGE_SELF),
+    }
+    print("\nmemory: " + ', '.join(f"{key}={value}" for key, value in memory.items()))
+
+    result = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'engine': engine.name,
+        'layout': ocr_helper.layout_enabled(),
+        'platform': platform.platform(),
+        'images': [name for name, _, _ in corpus],
+        'accuracy': accuracy,
+        'tiers': dict(tiers),
+        'per_image': per_image,
+        'throughput': throughput,
+        'memory': memory,
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        print(f"\ncompared with {args.compare} ({baseline.get('created_at')})")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if regressions:
+            return 1
+        print("  no regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
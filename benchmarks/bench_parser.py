@@ -0,0 +1,62 @@
+"""
+영수증 텍스트 파서 마이크로 벤치마크
+
+benchmarks/ocr_texts/*.txt 의 OCR 텍스트 덤프를 반복 파싱하여 처리량을 측정한다.
+
+    python benchmarks/bench_parser.py [--repeat 2000] [--corpus DIR]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.receipt_parser import parse_receipt_text  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_texts')
+
+
+def load_corpus(directory):
+    texts = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        with open(path, encoding='utf-8') as f:
+            texts.append((os.path.basename(path), f.read()))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='영수증 파서 처리량 측정')
+    parser.add_argument('--repeat', type=int, default=2000, help='코퍼스 반복 횟수')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='OCR 텍스트 덤프 디렉터리')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"No .txt files found in {args.corpus}")
+        return 1
+
+    for name, text in corpus:
+        print(f"{name}: {parse_receipt_text(text)!r}")
+
+    texts = [text for _, text in corpus]
+    total_lines = sum(len([line for line in text.split('\n') if line.strip()]) for text in texts)
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            parse_receipt_text(text)
+    elapsed = time.perf_counter() - started
+
+    receipts = args.repeat * len(texts)
+    print(f"\n{receipts} receipts in {elapsed:.3f}s")
+    print(f"  {receipts / elapsed:,.0f} receipts/s")
+    print(f"  {args.repeat * total_lines / elapsed:,.0f} lines/s")
+    print(f"  {elapsed / receipts * 1e6:.1f} us/receipt")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
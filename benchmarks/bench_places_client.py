@@ -0,0 +1,131 @@
+"""
+PlacesClient 벤치마크 (로컬 스텁 서버 사용)
+
+Google API 대신 지연 시간을 흉내 내는 로컬 HTTP 서버를 띄우고,
+requests.get 을 매번 호출하는 기존 방식과 PlacesClient 를 비교한다.
+동시에 같은 요청을 보냈을 때 업스트림 호출이 한 번만 일어나는지도 확인한다.
+
+    python benchmarks/bench_places_client.py [--requests 200] [--threads 16] [--latency 0.02]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.places_client import PlacesClient  # noqa: E402
+
+
+class StubState:
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = set()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.connections = set()
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                state.connections.add(self.client_address)
+            time.sleep(state.latency)
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.endswith('/place/textsearch/json'):
+                body = {'status': 'OK', 'results': [{'name': params.get('query'), 'place_id': 'stub-1'}]}
+            elif url.path.endswith('/place/details/json'):
+                body = {'status': 'OK', 'result': {'place_id': params.get('place_id'), 'name': 'Stub Cafe'}}
+            elif url.path.endswith('/distancematrix/json'):
+                body = {'status': 'OK', 'rows': [{'elements': [{'distance': {'value': 1234}}]}]}
+            else:
+                body = {'status': 'NOT_FOUND'}
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def run(label, func, items, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(func, items))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {len(items):>5} calls  {elapsed:7.3f}s  {len(items) / elapsed:9.1f} calls/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PlacesClient 연결 재사용/캐시/요청 병합 측정')
+    parser.add_argument('--requests', type=int, default=200, help='시나리오별 호출 수')
+    parser.add_argument('--threads', type=int, default=16, help='동시 호출 스레드 수')
+    parser.add_argument('--latency', type=float, default=0.02, help='스텁 서버 응답 지연 (초)')
+    parser.add_argument('--distinct', type=int, default=20, help='서로 다른 검색어 수')
+    args = parser.parse_args()
+
+    state = StubState(args.latency)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/maps/api'
+    queries = [f'cafe {i % args.distinct}' for i in range(args.requests)]
+
+    # 1) 기존 방식: 매 호출마다 새 연결
+    def bare_get(query):
+        return requests.get(f'{base_url}/place/textsearch/json', params={'query': query, 'key': 'stub'}).json()
+
+    state.reset()
+    run('requests.get (no session)', bare_get, queries, args.threads)
+    print(f"  upstream requests={state.requests} connections={len(state.connections)}")
+
+    # 2) 캐시 없이 연결 재사용만
+    client = PlacesClient('stub', base_url=base_url, pool_size=args.threads, cache_size=0)
+    state.reset()
+    run('PlacesClient (pool only)', lambda q: client._fetch('place/textsearch/json', {'query': q}),
+        queries, args.threads)
+    print(f"  upstream requests={state.requests} connections={len(state.connections)}")
+    client.close()
+
+    # 3) 연결 재사용 + 캐시 + 요청 병합
+    client = PlacesClient('stub', base_url=base_url, pool_size=args.threads)
+    state.reset()
+    run('PlacesClient (pool + cache)', client.text_search, queries, args.threads)
+    print(f"  upstream requests={state.requests} connections={len(state.connections)}")
+
+    # 4) 같은 요청 동시 호출 -> 업스트림 1회
+    state.reset()
+    run('PlacesClient (same place_id)', client.place_details, ['same-place'] * args.threads, args.threads)
+    print(f"  upstream requests={state.requests} (expected 1)")
+
+    print(json.dumps(client.stats(), indent=2))
+    client.close()
+    server.shutdown()
+    return 0 if state.requests == 1 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
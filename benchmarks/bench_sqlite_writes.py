@@ -0,0 +1,123 @@
+"""
+동시 영수증 저장 처리량 비교
+
+각 모드를 새 프로세스로 실행하여 여러 스레드가 동시에 store_receipt() 로
+Receipt + MenuItem + CafeVisit 를 저장할 때의 처리량, 지연 시간, 잠금 오류 수를 측정한다.
+어느 모드든 오류가 있거나 저장에 성공한 영수증 수 또는 DB 의 영수증 행 수가 threads × receipts 가 아니면
+실패로 종료한다.
+
+    default  : SQLite 기본 설정 (rollback journal, 세션마다 새 연결)
+    tuned    : WAL + busy_timeout + synchronous=NORMAL + 연결 풀
+    group    : tuned + 그룹 커밋 작성기
+
+    python benchmarks/bench_sqlite_writes.py [--threads 16] [--receipts 50]
+"""
+import argparse
+import sys
+
+from app_child import run_app_child
+
+MODES = {
+    'default': {'SQLITE_TUNING': '0', 'GROUP_COMMIT': '0'},
+    'tuned': {'SQLITE_TUNING': '1', 'GROUP_COMMIT': '0'},
+    'group': {'SQLITE_TUNING': '1', 'GROUP_COMMIT': '1'},
+}
+
+CHILD = r'''
+import json, sys, threading, time
+from datetime import datetime
+threads, per_thread = int(sys.argv[1]), int(sys.argv[2])
+import app as cafe_app
+from utils.metrics import summarize_samples
+cafe_app.create_app()
+with cafe_app.app.app_context():
+    user_id = cafe_app.User.query.filter_by(username='test').first().id
+
+latencies = []
+errors = []
+lock = threading.Lock()
+
+def worker(index):
+    for i in range(per_thread):
+        receipt_info = {
+            'store_name': f'Bench Cafe {index}',
+            'datetime': datetime(2024, 12, 1, 12, i % 60),
+            'menu_items': [{'name': '아메리카노', 'price': 4500}, {'name': '카페라떼', 'price': 5000},
+                           {'name': '치즈케이크', 'price': 6500}],
+            'total_price': 16000,
+        }
+        started = time.perf_counter()
+        try:
+            cafe_app.store_receipt(user_id, receipt_info)
+        except Exception as e:
+            with lock:
+                errors.append(type(e).__name__ + ': ' + str(e).splitlines()[0])
+            continue
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+started = time.perf_counter()
+workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+for t in workers:
+    t.start()
+for t in workers:
+    t.join()
+elapsed = time.perf_counter() - started
+summary = summarize_samples(latencies)
+with cafe_app.app.app_context():
+    stored = cafe_app.Receipt.query.count()
+result = {
+    'seconds': elapsed,
+    'saved': len(latencies),
+    'stored': stored,
+    'errors': len(errors),
+    'error_samples': sorted(set(errors))[:3],
+    'p50': summary['p50'],
+    'p95': summary['p95'],
+}
+if cafe_app.app.config['GROUP_COMMIT']:
+    result['group_commit'] = cafe_app.receipt_writer.stats()
+print(json.dumps(result))
+'''
+
+
+def run_mode(name, threads, per_thread):
+    return run_app_child(CHILD, (threads, per_thread), DB_POOL_SIZE=str(threads), **MODES[name])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='동시 영수증 저장 처리량 비교')
+    parser.add_argument('--threads', type=int, default=16, help='동시에 저장하는 스레드 수')
+    parser.add_argument('--receipts', type=int, default=50, help='스레드당 저장할 영수증 수')
+    parser.add_argument('--modes', default=','.join(MODES), help='측정할 모드 (쉼표 구분)')
+    args = parser.parse_args()
+
+    expected = args.threads * args.receipts
+    results = {}
+    for name in args.modes.split(','):
+        result = results[name] = run_mode(name, args.threads, args.receipts)
+        print(f"{name:<8} {result['saved'] / result['seconds']:9.1f} receipts/s  "
+              f"saved={result['saved']} errors={result['errors']}  "
+              f"p50={result['p50'] * 1000:7.1f}ms p95={result['p95'] * 1000:7.1f}ms")
+        for sample in result['error_samples']:
+            print(f"         {sample}")
+        if 'group_commit' in result:
+            print(f"         group commit: {result['group_commit']}")
+
+    if 'default' in results:
+        base = results['default']['saved'] / results['default']['seconds']
+        for name, result in results.items():
+            if name != 'default':
+                print(f"{name} vs default: {result['saved'] / result['seconds'] / base:.2f}x")
+
+    failures = [f"{name}: saved={result['saved']} stored={result['stored']} (expected {expected}) "
+                f"errors={result['errors']}"
+                for name, result in results.items()
+                if result['errors'] or result['saved'] != expected or result['stored'] != expected]
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
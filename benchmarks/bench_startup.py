@@ -0,0 +1,95 @@
+"""
+애플리케이션 시작 시간 측정
+
+새 프로세스에서 `import app`, create_app() (스키마 준비 / OCR 미리 로드),
+첫 영수증 OCR 까지의 시간을 단계별로 측정하고 예산을 넘으면 실패로 종료한다.
+import 만으로 DB 파일이 만들어지지 않는지도 확인한다.
+
+    python benchmarks/bench_startup.py [--runs 5] [--import-budget 1.5] [--startup-budget 2.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_IMAGE = os.path.join(ROOT, 'test1.png')
+
+CHILD = r'''
+import json, os, sys, time
+db_path, preload, image_path = sys.argv[1], sys.argv[2] == '1', sys.argv[3]
+started = time.perf_counter()
+import app as cafe_app
+imported = time.perf_counter()
+side_effect = os.path.exists(db_path)
+cafe_app.create_app(init_database=True, preload_ocr=preload)
+ready = time.perf_counter()
+# 업로드 경로와 같이 지연 import 부터 포함하여 측정
+with open(image_path, 'rb') as f:
+    image = cafe_app.open_uploaded_image(f)
+from utils import ocr_helper
+ocr_helper.extract_receipt_info(image, use_cache=False)
+done = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': ready - imported,
+    'first_ocr': done - ready,
+    'import_created_db': side_effect,
+}))
+'''
+
+
+def run_child(db_path, preload, image):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', LOG_LEVEL='WARNING', OCR_CACHE_ENABLED='0')
+    output = subprocess.run([sys.executable, '-c', CHILD, db_path, '1' if preload else '0', image],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(label, samples):
+    line = f"{label:<26}"
+    for key in ('import', 'create_app', 'first_ocr'):
+        values = [sample[key] for sample in samples]
+        line += f"  {key}={statistics.median(values) * 1000:8.1f}ms"
+    print(line)
+    return {key: statistics.median(sample[key] for sample in samples) for key in ('import', 'create_app', 'first_ocr')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='애플리케이션 시작 시간 측정')
+    parser.add_argument('--runs', type=int, default=5, help='시나리오별 실행 횟수 (중앙값 사용)')
+    parser.add_argument('--image', default=DEFAULT_IMAGE, help='첫 OCR 에 사용할 이미지')
+    parser.add_argument('--import-budget', type=float, default=1.0, help='import app 허용 시간 (초)')
+    parser.add_argument('--startup-budget', type=float, default=2.0, help='import + create_app 허용 시간 (초)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        fresh = run_child(db_path, False, args.image)
+        if fresh['import_created_db']:
+            print("FAIL: importing app created the database")
+            return 1
+        summarize('fresh database', [fresh])
+
+        results = {}
+        for preload in (False, True):
+            samples = [run_child(db_path, preload, args.image) for _ in range(args.runs)]
+            results[preload] = summarize('existing db, preload=' + str(preload).lower(), samples)
+
+    failures = []
+    for preload, result in results.items():
+        if result['import'] > args.import_budget:
+            failures.append(f"import {result['import']:.3f}s > {args.import_budget}s (preload={preload})")
+        if result['import'] + result['create_app'] > args.startup_budget:
+            failures.append(f"startup {result['import'] + result['create_app']:.3f}s > "
+                            f"{args.startup_budget}s (preload={preload})")
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+매장명 색인 조회 벤치마크
+
+사전 별칭에 OCR 잡음(문자 치환/삭제, 지점명, 기호)을 섞은 줄과 사전에 없는 줄을
+색인으로 조회하여 초당 조회 수, 정확도, 오탐률을 측정한다. --synthetic 으로 가짜 매장을
+추가하면 사전 크기에 따른 조회 시간 변화를, --linear 로 전체 별칭을 훑는 방식과 비교할 수 있다.
+초당 조회 수가 --min-rate 보다 낮으면 실패로 종료한다.
+
+    python benchmarks/bench_store_resolver.py [--lookups 20000] [--synthetic 5000] [--error-rate 0.1] [--linear] [--min-rate 5000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.store_resolver import DEFAULT_DICTIONARY_PATH, StoreResolver, _bigrams, normalize  # noqa: E402
+
+NOISE_CHARS = 'lI1|.,:-_ '
+BRANCHES = ['강남역점', '판교점', 'R 수내역점', '정자역점', 'Pangyo', '시청점']
+NON_STORE_LINES = ['전자영수증', '현금(소득공제)', '경기도 성남시 분당구 판교역로 17', '2024-12-01 16:49',
+                   'POS:02 BILL:123', '사이렌오더', '메뉴 단가 수량 금액', '감사합니다',
+                   # 매장명의 흔한 부분(COFFEE, 커피)만 겹치는 메뉴 줄
+                   'ICED COFFEE 4,500', 'Hot Coffee', 'COFFEE', 'Cold Brew Coffee', '아이스 커피 4,000',
+                   '오늘의 커피', '카페라떼 5,000원', '아메리카노 4,500']
+# 가짜 매장명에 쓰는 음절 (자주 쓰이는 한글 음절 범위에서 추출)
+SYLLABLES = [chr(code) for code in range(ord('가'), ord('힣') + 1, 37)]
+
+
+def add_noise(rng, text, error_rate):
+    # 문자마다 error_rate 확률로 잡음 문자로 치환하거나 삭제
+    chars = []
+    for char in text:
+        if rng.random() >= error_rate:
+            chars.append(char)
+        elif rng.random() < 0.5:
+            chars.append(rng.choice(NOISE_CHARS))
+    line = ''.join(chars) or text
+    if rng.random() < 0.5:
+        line += ' ' + rng.choice(BRANCHES)
+    if rng.random() < 0.3:
+        line = '| ' + line
+    return line
+
+
+def synthetic_stores(rng, count):
+    return [{'name': '카페 ' + ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))} for _ in range(count)]
+
+
+def linear_resolve(entries, line, min_confidence):
+    grams = set(_bigrams(normalize(line)))
+    best = None
+    for name, alias_grams in entries:
+        confidence = len(alias_grams & grams) / len(alias_grams)
+        if confidence >= min_confidence and (best is None or confidence > best[1]):
+            best = (name, confidence)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='매장명 색인 조회 처리량 측정')
+    parser.add_argument('--dictionary', default=DEFAULT_DICTIONARY_PATH, help='매장명 사전 JSON')
+    parser.add_argument('--lookups', type=int, default=20000, help='조회할 줄 수')
+    parser.add_argument('--synthetic', type=int, default=0, help='사전에 추가할 가짜 매장 수')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='문자별 OCR 오류 확률')
+    parser.add_argument('--linear', action='store_true', help='전체 별칭을 훑는 방식과 비교')
+    parser.add_argument('--min-rate', type=float, default=5000, help='최소 초당 조회 수')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(args.dictionary, encoding='utf-8') as f:
+        stores = json.load(f)['stores']
+    stores = stores + synthetic_stores(rng, args.synthetic)
+
+    started = time.perf_counter()
+    resolver = StoreResolver(stores)
+    build_time = time.perf_counter() - started
+    print(f"Index: {resolver.store_count} stores, {len(resolver)} aliases, built in {build_time * 1000:.1f}ms")
+
+    aliases = [(store['name'], alias) for store in stores for alias in [store['name'], *store.get('aliases', ())]]
+    cases = []
+    for _ in range(args.lookups):
+        if rng.random() < 0.2:
+            cases.append((rng.choice(NON_STORE_LINES), None))
+        else:
+            name, alias = rng.choice(aliases)
+            cases.append((add_noise(rng, alias, args.error_rate), name))
+
+    started = time.perf_counter()
+    matches = [resolver.resolve(line) for line, _ in cases]
+    elapsed = time.perf_counter() - started
+
+    stores_cases = [(match, name) for match, (_, name) in zip(matches, cases) if name is not None]
+    correct = sum(1 for match, name in stores_cases if match is not None and match.name == name)
+    missed = sum(1 for match, _ in stores_cases if match is None)
+    false_positives = sum(1 for match, (_, name) in zip(matches, cases) if name is None and match is not None)
+    rate = len(cases) / elapsed
+    print(f"{len(cases)} lookups in {elapsed:.3f}s")
+    print(f"  {rate:,.0f} lookups/s ({elapsed / len(cases) * 1e6:.1f} us/lookup)")
+    print(f"  accuracy {correct / len(stores_cases):.1%}, missed {missed / len(stores_cases):.1%}, "
+          f"false positives {false_positives}/{len(cases) - len(stores_cases)}")
+
+    if args.linear:
+        entries = [(name, set(_bigrams(normalize(alias)))) for name, alias in aliases if normalize(alias)]
+        sample = cases[:min(len(cases), 2000)]
+        started = time.perf_counter()
+        for line, _ in sample:
+            linear_resolve(entries, line, resolver.min_confidence)
+        linear_elapsed = time.perf_counter() - started
+        print(f"  linear scan: {len(sample) / linear_elapsed:,.0f} lookups/s")
+
+    if rate < args.min_rate:
+        print(f"FAIL: {rate:,.0f} lookups/s is below {args.min_rate:,.0f}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,19 @@
-import cv2
+import argparse
 import pytesseract
 import re
 import pandas as pd
 from datetime import datetime, timedelta
 from PIL import Image
+from utils.live_capture import MIN_SHARPNESS, FrameGate, capture_receipt_text, to_gray
 
 # Tesseract 경로 설정 (윈도우의 경우 필요시 수정)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-# OCR로 텍스트 추출 함수
+# OCR로 텍스트 추출 함수 (카메라 프레임은 흑백으로 변환해서 인식)
 def extract_text_from_image(image):
     # OCR을 이용해 텍스트 추출
+    if hasattr(image, 'ndim'):
+        image = to_gray(image)
     extracted_text = pytesseract.image_to_string(image, lang='eng')
     return extracted_text
 
@@ -58,62 +61,70 @@ def calculate_parking_fee(entry_time_str, total_amount, is_today):
     
     return total_fee
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='카메라로 영수증 인식')
+    parser.add_argument('--source', default='0',
+                        help='카메라 번호, 동영상 파일, 또는 이미지 디렉터리/glob (기본: 0)')
+    parser.add_argument('--manual', action='store_true', help="자동 인식 대신 Enter 를 눌렀을 때 인식")
+    parser.add_argument('--no-window', action='store_true', help='미리보기 창 없이 실행 (녹화 파일 확인용)')
+    parser.add_argument('--min-sharpness', type=float, default=MIN_SHARPNESS,
+                        help='인식할 프레임의 최소 선명도 (라플라시안 분산)')
+    args = parser.parse_args()
+    if args.manual and args.no_window:
+        parser.error('--manual 은 Enter 입력을 받을 미리보기 창이 필요하므로 --no-window 와 함께 쓸 수 없습니다')
+    return args
+
 # 메인 함수
 def main():
-    cam = cv2.VideoCapture(0)
-    print("Press 'Enter' to capture the receipt image or 'q' to quit.")
+    args = parse_args()
+    if args.manual:
+        print("Press 'Enter' to capture the receipt image or 'q' to quit.")
+    else:
+        print("Hold the receipt steady in front of the camera, or press 'q' to quit.")
+    
+    # OCR 은 백그라운드에서 실행하고 미리보기는 카메라 속도로 유지
+    extracted_text = capture_receipt_text(
+        args.source,
+        extract_text_from_image,
+        auto=not args.manual,
+        show=not args.no_window,
+        gate=FrameGate(min_sharpness=args.min_sharpness)
+    )
+    if extracted_text is None:
+        return
     
-    while True:
-        ret, frame = cam.read()
-        if not ret:
-            print("Failed to grab frame")
-            break
-        
-        cv2.imshow("Live Camera - Show Receipt", frame)
-        
-        key = cv2.waitKey(1)
-        if key == 13:  # Enter key
-            # 텍스트 추출
-            extracted_text = extract_text_from_image(frame)
-            print("Extracted Text:\n", extracted_text)
-            
-            # 영수증 정보 파싱
-            receipt_data, date = parse_receipt_text(extracted_text)
-            print("\nParsed Receipt Data:\n", receipt_data)
-            is_today = False
-            if date:
-                print("\nExtracted Date:", date)
-                # 오늘 날짜와 비교
-                today = datetime.now().strftime('%Y-%m-%d')
-                try:
-                    receipt_date = datetime.strptime(date, '%Y-%m-%d') if '-' in date else datetime.strptime(date, '%d/%m/%Y')
-                    today_date = datetime.now()
-                    date_diff = (today_date - receipt_date).days
-                    if date_diff == 0:
-                        print("\nThe receipt date is today.")
-                        is_today = True
-                    else:
-                        print("\nThe receipt date is not today. No discount will be applied.")
-                except ValueError:
-                    print("\nUnable to compare dates due to incorrect format.")
-                    return receipt_data, date
-            
-            # 주차비 계산
-            entry_time_str = input("Enter entry time (YYYY-MM-DD HH:MM): ")
-            total_amount = receipt_data['Price'].astype(float).sum() if not receipt_data.empty else 0
-            total_fee = calculate_parking_fee(entry_time_str, total_amount, is_today)
-            print(f"\nTotal Parking Fee: {total_fee:.2f} KRW")
+    print("Extracted Text:\n", extracted_text)
 
-            # 데이터 파일로 저장
-            receipt_data.to_csv('receipt_data.csv', index=False)
-            print("\nReceipt data has been saved to 'receipt_data.csv'")
+    # 영수증 정보 파싱
+    receipt_data, date = parse_receipt_text(extracted_text)
+    print("\nParsed Receipt Data:\n", receipt_data)
+    is_today = False
+    if date:
+        print("\nExtracted Date:", date)
+        # 오늘 날짜와 비교
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            receipt_date = datetime.strptime(date, '%Y-%m-%d') if '-' in date else datetime.strptime(date, '%d/%m/%Y')
+            today_date = datetime.now()
+            date_diff = (today_date - receipt_date).days
+            if date_diff == 0:
+                print("\nThe receipt date is today.")
+                is_today = True
+            else:
+                print("\nThe receipt date is not today. No discount will be applied.")
+        except ValueError:
+            print("\nUnable to compare dates due to incorrect format.")
+            return receipt_data, date
 
-            break
-        elif key == ord('q'):  # 'q' key to quit
-            break
+    # 주차비 계산
+    entry_time_str = input("Enter entry time (YYYY-MM-DD HH:MM): ")
+    total_amount = receipt_data['Price'].astype(float).sum() if not receipt_data.empty else 0
+    total_fee = calculate_parking_fee(entry_time_str, total_amount, is_today)
+    print(f"\nTotal Parking Fee: {total_fee:.2f} KRW")
 
-    cam.release()
-    cv2.destroyAllWindows()
+    # 데이터 파일로 저장
+    receipt_data.to_csv('receipt_data.csv', index=False)
+    print("\nReceipt data has been saved to 'receipt_data.csv'")
 
 # 실행 부분
 if __name__ == "__main__":
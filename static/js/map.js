@@ -3,6 +3,13 @@ class CafeMap {
         this.map = null;
         this.markers = [];
         this.geocoder = new kakao.maps.services.Geocoder();
+        // 영역 기반 마커 로딩 상태
+        this.markerUrl = null;
+        this.visitMarkers = new Map();
+        this.clusterOverlays = [];
+        this.viewportRequestId = 0;
+        this.clustered = false;
+        this.truncatedHint = null;
     }
 
     init(containerId, initialLat = 37.566826, initialLng = 126.978656) {
@@ -17,6 +24,13 @@ class CafeMap {
         // 지도 컨트롤 추가
         const zoomControl = new kakao.maps.ZoomControl();
         this.map.addControl(zoomControl, kakao.maps.ControlPosition.RIGHT);
+
+        // 보이는 영역의 마커가 일부만 표시될 때 띄우는 안내
+        this.truncatedHint = document.createElement('div');
+        this.truncatedHint.className = 'map-truncated-hint';
+        this.truncatedHint.textContent = '일부 방문 기록만 표시됩니다. 모두 보려면 지도를 확대하세요.';
+        this.truncatedHint.style.display = 'none';
+        container.appendChild(this.truncatedHint);
     }
 
     addMarker(lat, lng, cafeInfo) {
@@ -26,14 +40,17 @@ class CafeMap {
             map: this.map
         });
 
-        // 인포윈도우 내용
-        const content = `
-            <div class="info-window">
-                <h5>${cafeInfo.name}</h5>
-                <p>${cafeInfo.address}</p>
-                <p>평점: ${cafeInfo.rating}점</p>
-            </div>
+        // 인포윈도우 내용 (사용자가 입력한 값은 textContent 로 넣음)
+        const content = document.createElement('div');
+        content.className = 'info-window';
+        content.innerHTML = `
+            <h5></h5>
+            <p class="info-address"></p>
+            <p class="info-rating"></p>
         `;
+        content.querySelector('h5').textContent = cafeInfo.name;
+        content.querySelector('.info-address').textContent = cafeInfo.address;
+        content.querySelector('.info-rating').textContent = `평점: ${cafeInfo.rating}점`;
 
         const infowindow = new kakao.maps.InfoWindow({
             content: content,
@@ -49,6 +66,110 @@ class CafeMap {
         return marker;
     }
 
+    enableViewportMarkers(url) {
+        // 지도가 멈출 때마다 보이는 영역의 마커만 요청
+        this.markerUrl = url;
+        kakao.maps.event.addListener(this.map, 'idle', () => this.refreshViewport());
+        this.refreshViewport();
+    }
+
+    refreshViewport() {
+        if (!this.markerUrl) return;
+        const bounds = this.map.getBounds();
+        const sw = bounds.getSouthWest();
+        const ne = bounds.getNorthEast();
+        const bbox = [sw.getLng(), sw.getLat(), ne.getLng(), ne.getLat()].join(',');
+        const requestId = ++this.viewportRequestId;
+
+        fetch(`${this.markerUrl}?bbox=${bbox}&zoom=${this.map.getLevel()}`)
+            .then(response => response.json())
+            .then(data => {
+                // 더 최근 요청이 있으면 무시
+                if (requestId !== this.viewportRequestId) return;
+                this.clearClusters();
+                this.clustered = data.clustered;
+                this.truncatedHint.style.display = !data.clustered && data.truncated ? 'block' : 'none';
+                if (data.clustered) {
+                    this.visitMarkers.forEach(marker => marker.setMap(null));
+                    data.clusters.forEach(cluster => this.addCluster(cluster));
+                } else {
+                    this.showVisitMarkers(data.markers);
+                }
+            })
+            .catch(error => console.error('Error loading markers:', error));
+    }
+
+    showVisitMarkers(visits) {
+        // 이미 만든 마커는 재사용하고 새 방문 기록만 마커 생성
+        const visibleIds = new Set();
+        visits.forEach(visit => {
+            visibleIds.add(visit.id);
+            const marker = this.visitMarkers.get(visit.id);
+            if (marker) {
+                marker.setMap(this.map);
+            } else {
+                this.visitMarkers.set(visit.id, this.addMarker(visit.latitude, visit.longitude, {
+                    name: visit.cafe_name,
+                    address: visit.location || '',
+                    rating: visit.rating || 0
+                }));
+            }
+        });
+        this.visitMarkers.forEach((marker, id) => {
+            if (!visibleIds.has(id)) {
+                marker.setMap(null);
+            }
+        });
+    }
+
+    upsertVisitMarker(visit) {
+        // 클러스터로 보이는 중이면 개수가 바뀌므로 영역을 다시 요청
+        if (this.clustered) {
+            this.refreshViewport();
+            return;
+        }
+        const existing = this.visitMarkers.get(visit.id);
+        if (existing) {
+            existing.setMap(null);
+            this.markers = this.markers.filter(marker => marker !== existing);
+            this.visitMarkers.delete(visit.id);
+        }
+        if (visit.latitude == null || visit.longitude == null) return;
+        const marker = this.addMarker(visit.latitude, visit.longitude, {
+            name: visit.cafe_name,
+            address: visit.location || '',
+            rating: visit.rating || 0
+        });
+        this.visitMarkers.set(visit.id, marker);
+        // 보이는 영역 밖이면 지도를 옮길 때 표시
+        if (this.markerUrl && !this.map.getBounds().contain(marker.getPosition())) {
+            marker.setMap(null);
+        }
+    }
+
+    addCluster(cluster) {
+        const position = new kakao.maps.LatLng(cluster.latitude, cluster.longitude);
+        const content = document.createElement('div');
+        content.className = 'marker-cluster';
+        content.textContent = cluster.count;
+        // 클러스터 클릭 시 해당 위치로 확대
+        content.addEventListener('click', () => {
+            this.map.setLevel(Math.max(this.map.getLevel() - 2, 1), { anchor: position });
+        });
+
+        const overlay = new kakao.maps.CustomOverlay({
+            position: position,
+            content: content,
+            map: this.map
+        });
+        this.clusterOverlays.push(overlay);
+    }
+
+    clearClusters() {
+        this.clusterOverlays.forEach(overlay => overlay.setMap(null));
+        this.clusterOverlays = [];
+    }
+
     searchAddress(address) {
         return new Promise((resolve, reject) => {
             this.geocoder.addressSearch(address, (result, status) => {
@@ -68,6 +189,8 @@ class CafeMap {
     clearMarkers() {
         this.markers.forEach(marker => marker.setMap(null));
         this.markers = [];
+        this.visitMarkers.clear();
+        this.clearClusters();
     }
 
     panTo(lat, lng) {
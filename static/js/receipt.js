@@ -45,25 +45,16 @@ class ReceiptHandler {
             console.log('Response data:', data);
             
             if (data.success) {
+                // OCR 작업 완료까지 대기
+                const job = await this.waitForJob(data.status_url);
+                if (job.status !== 'done') {
+                    throw new Error(job.error || '영수증 처리 중 오류가 발생했습니다.');
+                }
                 console.log('OCR successful, populating form...');
-                this.populateForm(data.data);
+                this.populateForm(job.result);
                 
-                // 성공 메시지 표시
+                // 성공 메시지 표시 (저장된 방문 기록은 대시보드의 이벤트 스트림으로 반영되므로 새로고침하지 않음)
                 this.showMessage('영수증이 성공적으로 처리되었습니다.', 'success');
-                
-                // 지도에 마커 추가
-                if (window.cafeMap) {
-                    window.cafeMap.addMarker(data.data.latitude, data.data.longitude, {
-                        name: data.data.store_name,
-                        address: data.data.location,
-                        rating: 0
-                    });
-                }
-                
-                // 페이지 새로고침
-                setTimeout(() => {
-                    window.location.reload();
-                }, 1500);
             } else {
                 throw new Error(data.error || '영수증 처리 중 오류가 발생했습니다.');
             }
@@ -77,14 +68,29 @@ class ReceiptHandler {
         }
     }
 
+    async waitForJob(statusUrl, interval = 1000) {
+        // 작업이 완료되거나 실패할 때까지 상태 조회
+        while (true) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (job.status === 'done' || job.status === 'failed') {
+                return job;
+            }
+            if (job.error) {
+                throw new Error(job.error);
+            }
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    }
+
     populateForm(data) {
         // OCR 결과 표시 섹션 보이기
         document.getElementById('ocr-results').style.display = 'block';
         
         const fields = {
             'cafe-name': data.store_name,
-            'visit-date': data.visit_date,
-            'menu-items': data.menu_items,
+            'visit-date': data.datetime,
+            'menu-items': data.menu_items.map(item => `${item.name}: ${item.price}원`).join('\n'),
             'total-price': data.total_price ? `${data.total_price}원` : '',
         };
 
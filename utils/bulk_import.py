@@ -0,0 +1,198 @@
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+# 진행 상황 출력 간격 (초)
+PROGRESS_INTERVAL = 2.0
+
+
+def iter_image_paths(directory):
+    """
+    디렉터리 아래 이미지 경로를 정렬된 순서로 하나씩 내보냄 (목록을 메모리에 만들지 않음)
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def _init_worker():
+    # 일괄 처리 워커마다 tesserocr 풀을 여러 개 띄우지 않도록 엔진 워커는 하나씩
+    os.environ.setdefault('OCR_ENGINE_WORKERS', '1')
+
+
+def process_image(path):
+    """
+    워커 프로세스에서 이미지 하나를 웹 업로드와 같은 OCR 경로로 처리
+    """
+    from utils.image_preprocess import open_receipt_image
+    from utils.ocr_helper import extract_receipt_info
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            image = open_receipt_image(f)
+            image.load()
+        receipt_info = extract_receipt_info(image)
+        if receipt_info.pop('is_fallback', False):
+            # OCR 이 실패해서 기본값으로 채운 결과는 가져오지 않음
+            return path, None, 'OCR failed', time.perf_counter() - started
+        return path, receipt_info, None, time.perf_counter() - started
+    except Exception as e:
+        return path, None, f'{type(e).__name__}: {e}', time.perf_counter() - started
+
+
+class ImportState:
+    """
+    처리가 끝난 이미지 경로를 기록하는 SQLite 파일 (중단 후 이어서 실행용)
+    """
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS imported ('
+            ' path TEXT PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' error TEXT,'
+            ' finished_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def is_done(self, path, retry_failed=False):
+        row = self._conn.execute('SELECT status FROM imported WHERE path = ?', (path,)).fetchone()
+        return row is not None and not (retry_failed and row[0] == 'failed')
+
+    def mark(self, records):
+        now = time.time()
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO imported (path, status, error, finished_at) VALUES (?, ?, ?, ?)',
+            [(path, 'failed' if error else 'done', error, now) for path, error in records]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class ImportProgress:
+    """
+    처리 개수, 처리량, 남은 시간 출력
+    """
+    def __init__(self, total, stream=sys.stderr, interval=PROGRESS_INTERVAL):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last_report = 0.0
+        self.saved = 0
+        self.failed = 0
+        self.skipped = 0
+        self.ocr_seconds = 0.0
+
+    @property
+    def processed(self):
+        return self.saved + self.failed
+
+    def report(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = now - self.started
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.processed - self.skipped
+        eta = f'{remaining / rate:.0f}s' if rate > 0 else '-'
+        print(f"[{self.processed + self.skipped}/{self.total}] saved {self.saved}, failed {self.failed}, "
+              f"skipped {self.skipped} | {rate:.2f} images/s | ETA {eta}", file=self.stream, flush=True)
+
+
+def import_receipts(directory, state_path, output=None, save_batch=None, workers=None, batch_size=50,
+                    retry_failed=False, progress_stream=sys.stderr):
+    """
+    디렉터리의 영수증 이미지를 프로세스 풀에서 OCR 하여 JSONL 파일(output)에 추가하거나
+    save_batch([(path, receipt_info), ...]) 로 batch_size 개씩 저장
+
+    작업 중인 이미지는 워커 수의 두 배까지만 제출하므로 메모리 사용량은 이미지 개수와 무관하다.
+    저장(또는 파일 기록)이 끝난 이미지만 state_path 에 기록하므로 중단 후 다시 실행하면
+    남은 이미지부터 이어서 처리한다.
+    """
+    workers = workers or os.cpu_count() or 1
+    state = ImportState(state_path)
+    progress = ImportProgress(sum(1 for _ in iter_image_paths(directory)), stream=progress_stream)
+    out = open(output, 'a', encoding='utf-8') if output else None
+    pending = []
+
+    def flush():
+        # DB 저장 -> 파일 기록 -> 완료 표시 순서 (저장이 실패하면 파일에도 남기지 않고 다음 실행에서 다시 처리)
+        if not pending:
+            return
+        saves = [(path, receipt_info) for path, receipt_info, error in pending if error is None]
+        if saves and save_batch is not None:
+            save_batch(saves)
+        if out is not None:
+            for path, receipt_info, error in pending:
+                record = {'path': path, 'status': 'failed' if error else 'done', 'error': error}
+                if receipt_info is not None:
+                    record.update(receipt_info)
+                out.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+            out.flush()
+        state.mark([(path, error) for path, _, error in pending])
+        progress.saved += len(saves)
+        progress.failed += len(pending) - len(saves)
+        pending.clear()
+
+    def handle(result):
+        path, receipt_info, error, seconds = result
+        progress.ocr_seconds += seconds
+        if error:
+            logger.warning("Failed to import %s: %s", path, error)
+        pending.append((path, receipt_info, error))
+        if len(pending) >= batch_size:
+            flush()
+        progress.report()
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker)
+    in_flight = set()
+    try:
+        for path in iter_image_paths(directory):
+            if state.is_done(path, retry_failed):
+                progress.skipped += 1
+                continue
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future.result())
+            in_flight.add(executor.submit(process_image, path))
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                handle(future.result())
+    finally:
+        try:
+            # 중단되면 실행 중인 이미지만 마치고, 이미 끝난 결과는 저장하고 기록
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in in_flight:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    handle(future.result())
+            flush()
+        finally:
+            if out is not None:
+                out.close()
+            state.close()
+            progress.report(force=True)
+    return progress
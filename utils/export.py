@@ -0,0 +1,59 @@
+import csv
+import json
+from datetime import datetime
+
+# 내보내기 형식별 MIME 타입
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+# 엑셀에서 한글이 깨지지 않도록 CSV 앞에 붙이는 BOM
+CSV_BOM = '\ufeff'
+
+
+class _LineBuffer:
+    """
+    csv.writer 가 쓴 한 줄을 그대로 돌려주는 버퍼 (행마다 StringIO 를 만들지 않음)
+    """
+    def write(self, value):
+        return value
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, (list, tuple)):
+        # 메뉴 목록은 "메뉴: 4500원" 줄 단위 텍스트로
+        return '\n'.join(f"{item['name']}: {item['price']}원" for item in value)
+    return value
+
+
+def iter_csv(batches, fields):
+    """
+    행(dict) 묶음을 CSV 텍스트 조각으로 변환 (머리글 포함, 묶음 하나가 조각 하나)
+    """
+    writer = csv.writer(_LineBuffer())
+    yield CSV_BOM + writer.writerow(fields)
+    for rows in batches:
+        yield ''.join(writer.writerow([_csv_value(row.get(field)) for field in fields]) for row in rows)
+
+
+def iter_ndjson(batches, fields):
+    """
+    행(dict) 묶음을 한 줄에 JSON 객체 하나인 NDJSON 텍스트 조각으로 변환
+    """
+    for rows in batches:
+        yield ''.join(json.dumps({field: row.get(field) for field in fields}, ensure_ascii=False,
+                                 default=_json_default) + '\n' for row in rows)
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+}
@@ -0,0 +1,161 @@
+import bisect
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# 기본 지명 사전 (GAZETTEER_PATH 환경 변수로 교체)
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.tsv')
+# 줄여 쓴 지명('경기', '분당')을 정식 이름으로 볼 때 남은 부분으로 허용하는 접미사
+AREA_SUFFIXES = {'', '시', '도', '구', '군', '특별시', '광역시', '특별자치시', '특별자치도'}
+# 주소에서 행정구역을 찾을 최대 토큰 수
+MAX_ADDRESS_TOKENS = 6
+# 지오코딩 결과 캐시 크기
+GEOCODE_CACHE_SIZE = 4096
+
+TOKEN_STRIP_RE = re.compile(r'^[^0-9A-Za-z가-힣]+|[^0-9A-Za-z가-힣]+$')
+
+Path = Tuple[str, ...]
+
+
+class GeoMatch(NamedTuple):
+    latitude: float
+    longitude: float
+    name: str
+    level: str  # 'branch' 또는 'area'
+
+
+class Gazetteer:
+    """
+    행정구역과 매장 지점 좌표 사전
+
+    행정구역은 (시도, 시군구, 구) 경로로 저장하고, 각 단계의 하위 이름과 전체 지명을
+    정렬된 목록으로 두어 '경기 성남시 분당구', '분당구 정자일로' 처럼 줄여 쓰거나
+    시도를 생략한 주소도 이진 탐색(접두사 검색)으로 찾는다.
+    """
+
+    def __init__(self, areas: Dict[Path, Tuple[float, float]], aliases: Dict[str, str] = None,
+                 branches: Dict[Tuple[str, str], Tuple[float, float]] = None):
+        self.areas = areas
+        self.aliases = aliases or {}
+        self.branches = branches or {}
+        children: Dict[Path, set] = {}
+        for path in areas:
+            for depth in range(len(path)):
+                children.setdefault(path[:depth], set()).add(path[depth])
+        self._children = {parent: sorted(names) for parent, names in children.items()}
+        # 시도 아래 지명 -> 경로 (시도를 생략한 주소용)
+        self._names = sorted((path[-1], path) for path in areas if len(path) > 1)
+        self._name_keys = [name for name, _ in self._names]
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_GAZETTEER_PATH) -> 'Gazetteer':
+        areas, aliases, branches = {}, {}, {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                kind, name, *values = line.rstrip('\n').split('\t')
+                if kind == 'area':
+                    areas[tuple(name.split())] = (float(values[0]), float(values[1]))
+                elif kind == 'alias':
+                    aliases[name] = values[0]
+                elif kind == 'branch':
+                    store_name, _, branch = name.rpartition(' ')
+                    branches[(store_name, branch)] = (float(values[0]), float(values[1]))
+        return cls(areas, aliases, branches)
+
+    def __len__(self):
+        return len(self.areas) + len(self.branches)
+
+    @staticmethod
+    def _prefix_matches(names: List[str], token: str) -> List[str]:
+        """
+        token 과 같거나 token 뒤에 행정구역 접미사만 붙은 이름
+        """
+        start = bisect.bisect_left(names, token)
+        matches = []
+        for name in names[start:]:
+            if not name.startswith(token):
+                break
+            if name[len(token):] in AREA_SUFFIXES:
+                matches.append(name)
+        return matches
+
+    def _match_token(self, candidates: List[Path], token: str) -> List[Path]:
+        # 약칭은 시도 자리에만 적용 ('경기도 광주시' 의 광주시는 광주광역시가 아님)
+        if candidates == [()]:
+            token = self.aliases.get(token, token)
+        matches = []
+        for parent in candidates:
+            names = self._children.get(parent)
+            if names:
+                matches.extend(parent + (name,) for name in self._prefix_matches(names, token))
+        if not matches and candidates == [()] and len(token) >= 2:
+            # 시도를 생략한 주소: 전체 지명에서 검색
+            start = bisect.bisect_left(self._name_keys, token)
+            for name, path in self._names[start:]:
+                if not name.startswith(token):
+                    break
+                if name[len(token):] in AREA_SUFFIXES:
+                    matches.append(path)
+        return matches
+
+    def resolve_address(self, address: str) -> Optional[GeoMatch]:
+        """
+        주소 문자열의 가장 구체적인 행정구역 좌표 (모호하거나 없으면 None)
+        """
+        candidates: List[Path] = [()]
+        for token in address.split()[:MAX_ADDRESS_TOKENS]:
+            token = TOKEN_STRIP_RE.sub('', token)
+            if not token:
+                continue
+            matches = self._match_token(candidates, token)
+            if matches:
+                candidates = matches
+            elif candidates != [()]:
+                # 행정구역 다음의 도로명/번지
+                break
+        if len(candidates) != 1 or candidates == [()]:
+            return None
+        path = candidates[0]
+        latitude, longitude = self.areas[path]
+        return GeoMatch(latitude, longitude, ' '.join(path), 'area')
+
+    def resolve_branch(self, store_name: str, branch: str) -> Optional[GeoMatch]:
+        coordinates = self.branches.get((store_name, branch))
+        if coordinates is None:
+            return None
+        return GeoMatch(coordinates[0], coordinates[1], f'{store_name} {branch}', 'branch')
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    프로세스 전역 지명 사전 (최초 호출 시 로드)
+    """
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer.from_file(os.getenv('GAZETTEER_PATH', DEFAULT_GAZETTEER_PATH))
+        return _gazetteer
+
+
+@lru_cache(maxsize=GEOCODE_CACHE_SIZE)
+def geocode(address: Optional[str] = None, store_name: Optional[str] = None,
+            branch: Optional[str] = None) -> Optional[GeoMatch]:
+    """
+    매장 지점, 없으면 주소의 행정구역으로 좌표 찾기 (네트워크 사용 없음)
+    """
+    gazetteer = get_gazetteer()
+    if store_name and branch:
+        match = gazetteer.resolve_branch(store_name, branch)
+        if match is not None:
+            return match
+    if address:
+        return gazetteer.resolve_address(address)
+    return None
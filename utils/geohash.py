@@ -0,0 +1,81 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# 접두사 범위 검색의 상한 (BASE32 의 마지막 문자 'z' 다음 ASCII 문자)
+PREFIX_UPPER_BOUND = '{'
+
+
+def encode(latitude, longitude, precision=9):
+    """
+    위도/경도를 geohash 문자열로 변환
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """
+    해당 정밀도의 geohash 셀 크기 (위도 간격, 경도 간격)
+    """
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_prefixes(min_lat, min_lng, max_lat, max_lng, precision, max_cells=32):
+    """
+    영역을 덮는 geohash 접두사 목록
+
+    셀 수가 max_cells 를 넘으면 정밀도를 낮춰 더 큰 셀로 덮는다.
+    """
+    while precision > 1:
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * cols <= max_cells:
+            break
+        precision -= 1
+
+    lat_step, lng_step = cell_size(precision)
+    prefixes = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            prefixes.add(encode(min(lat, max_lat), min(lng, max_lng), precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + lng_step, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_step, max_lat)
+    return sorted(prefixes)
@@ -0,0 +1,178 @@
+import time
+import numpy as np
+from PIL import Image, ImageOps
+
+# OCR 입력 이미지 최대 너비
+OCR_MAX_WIDTH = 1000
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def open_receipt_image(fp, max_width=OCR_MAX_WIDTH):
+    """
+    이미지를 열고 JPEG(MPO 포함)이면 draft 모드로 축소된 흑백 이미지로 디코딩하도록 설정
+
+    draft 는 디코딩 전에만 효과가 있고 JPEG 이외의 형식에서는 아무 일도 하지 않는다.
+    """
+    image = Image.open(fp)
+    # EXIF 회전 정보가 90도 회전이면 표시될 때의 너비는 저장된 세로 길이
+    rotated = image.getexif().get(EXIF_ORIENTATION_TAG) in (5, 6, 7, 8)
+    width, height = (image.height, image.width) if rotated else image.size
+    if width > max_width:
+        target_height = max(1, height * max_width // width)
+        image.draft('L', (target_height, max_width) if rotated else (max_width, target_height))
+    return image
+
+
+def otsu_threshold(gray):
+    """
+    히스토그램 기반 Otsu 임계값
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_bg = cum_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def find_receipt_box(gray, min_fill=0.3, margin=10):
+    """
+    밝은 종이 영역의 경계 상자 (left, top, right, bottom) 를 찾는다
+
+    행/열별 밝은 픽셀 비율로 영역을 찾으며,
+    찾은 영역이 너무 작으면 None 을 반환한다.
+    """
+    mask = gray > otsu_threshold(gray)
+    rows = np.flatnonzero(mask.mean(axis=1) > min_fill)
+    cols = np.flatnonzero(mask.mean(axis=0) > min_fill)
+    if rows.size == 0 or cols.size == 0:
+        return None
+    top = max(0, rows[0] - margin)
+    bottom = min(gray.shape[0], rows[-1] + margin + 1)
+    left = max(0, cols[0] - margin)
+    right = min(gray.shape[1], cols[-1] + margin + 1)
+    if (bottom - top) * (right - left) < 0.3 * gray.size:
+        return None
+    return int(left), int(top), int(right), int(bottom)
+
+
+def crop_receipt_region(image, preview_width=400):
+    """
+    축소한 미리보기에서 영수증 영역을 찾아 원본 해상도로 잘라낸다
+    """
+    scale = min(1.0, preview_width / float(image.width))
+    preview = image
+    if scale < 1.0:
+        preview = image.resize((preview_width, max(1, int(image.height * scale))), Image.BILINEAR)
+    box = find_receipt_box(np.asarray(preview))
+    if box is None:
+        return image
+    return image.crop(tuple(min(int(round(value / scale)), limit)
+                            for value, limit in zip(box, (image.width, image.height) * 2)))
+
+
+def estimate_skew(gray, max_angle=5.0, step=0.5, sample_width=400):
+    """
+    축소한 글자 마스크를 회전시켜 행 투영 분산이 가장 큰 각도를 찾는다
+    """
+    height, width = gray.shape
+    scale = min(1.0, sample_width / float(width))
+    small = Image.fromarray(gray)
+    if scale < 1.0:
+        small = small.resize((sample_width, max(1, int(height * scale))), Image.BILINEAR)
+    small_array = np.asarray(small)
+    ink = Image.fromarray(np.where(small_array < otsu_threshold(small_array), 255, 0).astype(np.uint8))
+
+    best_angle = 0.0
+    best_score = -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rotated = np.asarray(ink.rotate(float(angle), resample=Image.NEAREST), dtype=np.float32)
+        score = float(np.var(rotated.sum(axis=1)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def adaptive_threshold(gray, window=None, offset=10):
+    """
+    적분 영상으로 계산한 지역 평균 기반 적응형 이진화
+    """
+    height, width = gray.shape
+    if window is None:
+        window = max(15, (width // 40) | 1)
+    half = window // 2
+
+    # 적분 영상 (int32: 1000 x 수천 픽셀 크기에서 오버플로 없음)
+    integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+    np.cumsum(gray, axis=0, dtype=np.int32, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, dtype=np.int32, out=integral[1:, 1:])
+
+    y0 = np.clip(np.arange(height) - half, 0, height)
+    y1 = np.clip(np.arange(height) + half + 1, 0, height)
+    x0 = np.clip(np.arange(width) - half, 0, width)
+    x1 = np.clip(np.arange(width) + half + 1, 0, width)
+
+    row_sums = integral[y1] - integral[y0]
+    window_sum = row_sums[:, x1] - row_sums[:, x0]
+    area = (y1 - y0)[:, None] * (x1 - x0)[None, :]
+    return np.where(gray.astype(np.int32) * area > window_sum - offset * area, 255, 0).astype(np.uint8)
+
+
+def preprocess_receipt(image, max_width=OCR_MAX_WIDTH, crop=True, deskew=True, threshold=True, timings=None,
+                       min_width=None):
+    """
+    OCR용 영수증 이미지 전처리
+
+    디코딩 → 흑백 변환 → 영역 잘라내기 → 축소(min_width 보다 좁으면 확대) → 기울기 보정 → 적응형 이진화
+    순서로 처리하며 timings 딕셔너리가 주어지면 단계별 소요 시간(초)을 기록한다.
+    """
+    if timings is None:
+        timings = {}
+
+    started = time.perf_counter()
+    image.load()
+    image = ImageOps.exif_transpose(image)
+    timings['decode'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if image.mode != 'L':
+        image = image.convert('L')
+    timings['grayscale'] = time.perf_counter() - started
+
+    # 영역을 먼저 잘라내야 축소 후에도 글자 해상도가 유지된다
+    if crop:
+        started = time.perf_counter()
+        image = crop_receipt_region(image)
+        timings['crop'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if image.width > max_width:
+        new_size = (max_width, max(1, int(image.height * max_width / image.width)))
+        image = image.resize(new_size, Image.LANCZOS)
+    elif min_width and image.width < min_width:
+        # 작은 글자는 이진화 전에 키워야 획이 끊어지지 않는다
+        new_size = (min_width, max(1, int(image.height * min_width / image.width)))
+        image = image.resize(new_size, Image.BICUBIC)
+    gray = np.asarray(image)
+    timings['resize'] = time.perf_counter() - started
+
+    if deskew:
+        started = time.perf_counter()
+        angle = estimate_skew(gray)
+        if angle:
+            rotated = Image.fromarray(gray).rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+            gray = np.asarray(rotated)
+        timings['deskew'] = time.perf_counter() - started
+
+    if threshold:
+        started = time.perf_counter()
+        gray = adaptive_threshold(gray)
+        timings['threshold'] = time.perf_counter() - started
+
+    return Image.fromarray(gray)
@@ -0,0 +1,265 @@
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+# 품질 검사용 축소 프레임 최대 너비
+GATE_MAX_WIDTH = 320
+# 연속 프레임 평균 밝기 차이가 이 값 이하이면 안정된 프레임으로 봄 (0~255)
+STABLE_THRESHOLD = 4.0
+# 이만큼 연속으로 안정되어야 인식
+STABLE_WINDOW = 8
+# 라플라시안 분산이 이 값 미만이면 흐린 프레임
+MIN_SHARPNESS = 60.0
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+ENTER_KEY = 13
+
+
+def to_gray(frame):
+    """
+    BGR(또는 흑백) uint8 프레임을 흑백으로 변환
+    """
+    if frame.ndim == 2:
+        return frame
+    blue, green, red = frame[..., 0], frame[..., 1], frame[..., 2]
+    return (0.114 * blue + 0.587 * green + 0.299 * red).astype(np.uint8)
+
+
+def downscale_gray(frame, max_width=GATE_MAX_WIDTH):
+    """
+    품질 검사용 축소 흑백 프레임 (보간 없이 간격 샘플링)
+    """
+    step = max(1, -(-frame.shape[1] // max_width))
+    small = frame[::step, ::step]
+    if small.ndim == 3:
+        small = to_gray(small)
+    return small.astype(np.float32)
+
+
+def sharpness(gray):
+    """
+    라플라시안 분산 (클수록 선명)
+    """
+    laplacian = (4 * gray[1:-1, 1:-1] - gray[:-2, 1:-1] - gray[2:, 1:-1]
+                 - gray[1:-1, :-2] - gray[1:-1, 2:])
+    return float(laplacian.var())
+
+
+class FrameGate:
+    """
+    카메라가 멈춘 구간에서 가장 선명한 프레임 하나만 통과시키는 품질 게이트
+
+    연속 프레임 차이가 작으면 안정 구간으로 보고, window 프레임 동안 안정되면
+    그 구간의 가장 선명한 프레임을 한 번 내보낸다. 다시 움직임이 생길 때까지는
+    같은 장면을 반복해서 내보내지 않는다.
+    """
+    def __init__(self, window=STABLE_WINDOW, stable_threshold=STABLE_THRESHOLD, min_sharpness=MIN_SHARPNESS):
+        self.window = window
+        self.stable_threshold = stable_threshold
+        self.min_sharpness = min_sharpness
+        self._previous = None
+        self._stable_count = 0
+        self._armed = True
+        self._best = None
+        self._best_sharpness = -1.0
+        self.last_sharpness = 0.0
+        self.last_difference = None
+
+    def update(self, frame):
+        """
+        프레임 하나를 검사하고 인식할 프레임이 정해지면 반환 (없으면 None)
+        """
+        small = downscale_gray(frame)
+        self.last_sharpness = sharpness(small)
+        if self._previous is not None and self._previous.shape == small.shape:
+            self.last_difference = float(np.abs(small - self._previous).mean())
+        else:
+            self.last_difference = None
+        self._previous = small
+
+        if self.last_difference is None or self.last_difference > self.stable_threshold:
+            # 움직임: 구간을 새로 시작하고 다시 인식 가능 상태로
+            self._stable_count = 0
+            self._armed = True
+            self._best, self._best_sharpness = frame, self.last_sharpness
+            return None
+
+        self._stable_count += 1
+        if self.last_sharpness > self._best_sharpness:
+            self._best, self._best_sharpness = frame, self.last_sharpness
+        if self._armed and self._stable_count >= self.window and self._best_sharpness >= self.min_sharpness:
+            self._armed = False
+            return self._best
+        return None
+
+    def best_frame(self):
+        """
+        현재 구간에서 가장 선명한 프레임 (수동 촬영용)
+        """
+        return self._best
+
+
+class OCRWorker:
+    """
+    크기가 제한된 대기열로 프레임을 받아 백그라운드 스레드에서 OCR 실행
+
+    대기열이 가득 차면 프레임을 버리므로 submit 은 프레임 루프를 막지 않는다.
+    """
+    def __init__(self, ocr_fn, max_queue=2):
+        self.ocr_fn = ocr_fn
+        self._frames = queue.Queue(maxsize=max_queue)
+        self._results = queue.Queue()
+        self.submitted = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name='live-ocr', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            started = time.perf_counter()
+            try:
+                self._results.put((frame, self.ocr_fn(frame), None, time.perf_counter() - started))
+            except Exception as e:
+                self._results.put((frame, None, e, time.perf_counter() - started))
+            finally:
+                self._frames.task_done()
+
+    def submit(self, frame):
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def poll(self, timeout=None):
+        """
+        끝난 OCR 결과 (frame, text, error, seconds) 또는 None
+        """
+        try:
+            return self._results.get(timeout=timeout) if timeout else self._results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def join(self):
+        """
+        대기 중인 프레임 처리가 끝날 때까지 대기
+        """
+        self._frames.join()
+
+    def close(self):
+        self._frames.put(None)
+        self._thread.join()
+
+
+def _read_image_bgr(path):
+    with Image.open(path) as image:
+        return np.asarray(image.convert('RGB'))[..., ::-1]
+
+
+def open_frame_source(source):
+    """
+    카메라 번호, 동영상 파일, 이미지 디렉터리 또는 glob 패턴에서 BGR 프레임을 내보내는 제너레이터
+
+    이미지 시퀀스는 OpenCV 없이 읽으므로 카메라 없이 동작을 확인할 수 있다.
+    """
+    source = str(source)
+    if os.path.isdir(source):
+        paths = sorted(path for path in glob.glob(os.path.join(source, '*'))
+                       if path.lower().endswith(IMAGE_EXTENSIONS))
+    elif any(char in source for char in '*?['):
+        paths = sorted(glob.glob(source))
+    else:
+        paths = None
+    if paths is not None:
+        return (_read_image_bgr(path) for path in paths)
+    return _iter_video_capture(int(source) if source.isdigit() else source)
+
+
+def _iter_video_capture(source):
+    import cv2
+    capture = cv2.VideoCapture(source)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        capture.release()
+
+
+def capture_receipt_text(source, ocr_fn, auto=True, show=True, gate=None, max_queue=2, log=print):
+    """
+    프레임 루프를 카메라 속도로 돌리면서 OCR 은 백그라운드에서 실행하고 첫 인식 텍스트를 반환
+
+    auto 이면 품질 게이트를 통과한 프레임을 자동으로 인식하고, 아니면 Enter 를 누를 때
+    현재 안정 구간에서 가장 선명한 프레임을 인식한다. 'q' 를 누르거나 소스가 끝나면
+    (대기 중인 OCR 이 끝난 뒤) None 을 반환한다. 수동 모드는 키 입력을 받을 창이 필요하다.
+    """
+    if not auto and not show:
+        raise ValueError('manual capture needs the preview window (show=True)')
+    gate = gate or FrameGate()
+    worker = OCRWorker(ocr_fn, max_queue=max_queue)
+    cv2 = None
+    if show:
+        import cv2
+    frames = 0
+    started = time.perf_counter()
+    try:
+        for frame in open_frame_source(source):
+            frames += 1
+            candidate = gate.update(frame)
+            if not auto:
+                # 수동 모드는 Enter 를 눌렀을 때만 인식
+                candidate = None
+            if show:
+                cv2.imshow("Live Camera - Show Receipt", frame)
+                key = cv2.waitKey(1)
+                if key == ord('q'):
+                    return None
+                if key == ENTER_KEY and not auto:
+                    candidate = gate.best_frame()
+            if candidate is not None and worker.submit(candidate):
+                log(f"Recognizing frame {frames} (sharpness {gate.last_sharpness:.0f})")
+
+            result = worker.poll()
+            if result is not None:
+                text = _finish(result, log)
+                if text is not None:
+                    return text
+        # 소스가 끝나면 남은 OCR 결과 확인
+        worker.join()
+        while True:
+            result = worker.poll()
+            if result is None:
+                return None
+            text = _finish(result, log)
+            if text is not None:
+                return text
+    finally:
+        elapsed = time.perf_counter() - started
+        log(f"{frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):.1f} fps), "
+            f"{worker.submitted} recognized, {worker.dropped} dropped")
+        worker.close()
+        if show:
+            cv2.destroyAllWindows()
+
+
+def _finish(result, log):
+    _, text, error, seconds = result
+    if error is not None:
+        log(f"OCR failed after {seconds:.2f}s: {error}")
+        return None
+    if not text or not text.strip():
+        log(f"No text recognized ({seconds:.2f}s), waiting for another frame")
+        return None
+    return text
@@ -0,0 +1,177 @@
+import bisect
+import threading
+import time
+
+# 단계별 소요 시간 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def summarize_samples(samples):
+    """
+    최근 소요 시간 표본의 개수, 평균, p50, p95, 최대값
+    """
+    if not samples:
+        return {'count': 0, 'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'avg': round(sum(ordered) / count, 4),
+        'p50': round(ordered[int(0.50 * (count - 1))], 4),
+        'p95': round(ordered[int(0.95 * (count - 1))], 4),
+        'max': round(ordered[-1], 4),
+    }
+
+
+class Histogram:
+    """
+    고정 버킷 히스토그램 (관측값은 버킷 카운트와 합계만 유지)
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def cumulative_counts(self):
+        with self._lock:
+            counts = list(self._counts)
+        total = 0
+        cumulative = []
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q, cumulative=None):
+        """
+        버킷 경계로 추정한 분위수 (버킷 안에서는 선형 보간)
+        """
+        cumulative = cumulative or self.cumulative_counts()
+        total = cumulative[-1]
+        if not total:
+            return 0.0
+        rank = q * total
+        index = bisect.bisect_left(cumulative, rank)
+        if index >= len(self.buckets):
+            return self.max
+        lower = self.buckets[index - 1] if index else 0.0
+        upper = self.buckets[index]
+        below = cumulative[index - 1] if index else 0
+        in_bucket = cumulative[index] - below
+        fraction = (rank - below) / in_bucket if in_bucket else 1.0
+        return min(lower + (upper - lower) * fraction, self.max)
+
+    def snapshot(self):
+        cumulative = self.cumulative_counts()
+        count = cumulative[-1]
+        return {
+            'count': count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / count, 6) if count else 0.0,
+            'max': round(self.max, 6),
+            'p50': round(self.quantile(0.50, cumulative), 6),
+            'p95': round(self.quantile(0.95, cumulative), 6),
+            'p99': round(self.quantile(0.99, cumulative), 6),
+            'buckets': {str(bound): cumulative[i] for i, bound in enumerate(self.buckets)},
+        }
+
+
+class _Timer:
+    __slots__ = ('registry', 'stage', 'started')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    """
+    영수증 처리 단계별 소요 시간 히스토그램과 이벤트 카운터 모음
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def histogram(self, stage):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def timer(self, stage):
+        """
+        with metrics.timer('ocr'): ... 형태로 블록 실행 시간 기록
+        """
+        return _Timer(self, stage)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            'stages': {stage: histogram.snapshot() for stage, histogram in sorted(histograms.items())},
+            'counters': counters,
+        }
+
+    def to_prometheus(self, prefix='cafe_diary'):
+        """
+        Prometheus 텍스트 형식으로 출력
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        name = f'{prefix}_receipt_stage_seconds'
+        lines = [f'# HELP {name} Receipt pipeline stage duration in seconds.',
+                 f'# TYPE {name} histogram']
+        for stage, histogram in histograms:
+            cumulative = histogram.cumulative_counts()
+            for bound, count in zip(histogram.buckets, cumulative):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative[-1]}')
+        name = f'{prefix}_events_total'
+        lines.append(f'# HELP {name} Receipt pipeline event counts.')
+        lines.append(f'# TYPE {name} counter')
+        for event, value in counters:
+            lines.append(f'{name}{{event="{event}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# 프로세스 전역 레지스트리
+metrics = MetricsRegistry()
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# 기본 캐시 파일 위치 (프로젝트 루트)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ocr_cache.db')
+
+
+def _encode_result(result):
+    data = dict(result)
+    if isinstance(data.get('datetime'), datetime):
+        data['datetime'] = data['datetime'].isoformat()
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _decode_result(text):
+    data = json.loads(text)
+    if data.get('datetime'):
+        data['datetime'] = datetime.fromisoformat(data['datetime'])
+    return data
+
+
+class OCRResultCache:
+    """
+    이미지 해시 + OCR 설정을 키로 하는 영속 OCR 결과 캐시 (SQLite)
+
+    이미지 해시는 그레이스케일 픽셀로 계산하므로 (ocr_helper.compute_image_hash)
+    그레이스케일 픽셀이 같은 이미지는 한 항목을 공유한다.
+
+    max_entries 를 넘으면 가장 오래 사용되지 않은 항목부터,
+    max_age 초가 지난 항목은 나이 순으로 제거한다.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000, max_age=30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS ocr_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' result TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_access ON ocr_cache (last_access)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_ocr_cache_created_at ON ocr_cache (created_at)')
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT result, created_at FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE ocr_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return _decode_result(row[0])
+
+    def put(self, key, result):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO ocr_cache (key, result, created_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, _encode_result(result), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        removed = 0
+        if self.max_age:
+            removed += self._conn.execute('DELETE FROM ocr_cache WHERE created_at < ?', (now - self.max_age,)).rowcount
+        if self.max_entries:
+            count = self._conn.execute('SELECT COUNT(*) FROM ocr_cache').fetchone()[0]
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    'DELETE FROM ocr_cache WHERE key IN '
+                    '(SELECT key FROM ocr_cache ORDER BY last_access LIMIT ?)',
+                    (count - self.max_entries,)
+                ).rowcount
+        self.evictions += removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM ocr_cache')
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM ocr_cache').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'max_age': self.max_age,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """
+    프로세스 전역 OCR 캐시 반환 (OCR_CACHE_ENABLED=0 이면 None)
+    """
+    global _ocr_cache
+    if os.getenv('OCR_CACHE_ENABLED', '1') == '0':
+        return None
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = OCRResultCache(
+                path=os.getenv('OCR_CACHE_PATH', DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv('OCR_CACHE_MAX_ENTRIES', 10000)),
+                max_age=int(os.getenv('OCR_CACHE_MAX_AGE', 30 * 24 * 3600))
+            )
+        return _ocr_cache
@@ -1,255 +1,671 @@
 import pytesseract
 from PIL import Image
 import re
+import hashlib
 from datetime import datetime
 import platform
 import os
-import sys
+import atexit
+import logging
+import threading
+import time
+import multiprocessing
+from typing import NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.ocr_cache import get_ocr_cache
+from utils.image_preprocess import OCR_MAX_WIDTH, open_receipt_image, preprocess_receipt
+from utils.receipt_parser import parse_receipt_text
+from utils.receipt_layout import analyze_layout, find_price_column, stack_boxes
+from utils.store_resolver import get_store_resolver
+from utils.metrics import metrics
 
-# Tesseract 설정
+try:
+    import tesserocr
+except ImportError:  # 선택 의존성: 없으면 pytesseract 경로만 사용
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Tesseract 실행 파일 경로 (처음 엔진을 만들 때 한 번만 확인)
 tesseract_cmd = '/opt/homebrew/bin/tesseract'
-if os.path.exists(tesseract_cmd):
-    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-    print(f"Using Tesseract from: {tesseract_cmd}")
-else:
-    print(f"Warning: Tesseract not found at {tesseract_cmd}")
+_tesseract_configured = False
+
+def configure_tesseract():
+    """
+    플랫폼별 Tesseract 실행 파일 경로 설정
+    """
+    global _tesseract_configured
+    if _tesseract_configured:
+        return
+    _tesseract_configured = True
+    if os.path.exists(tesseract_cmd):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        logger.info("Using Tesseract from: %s", tesseract_cmd)
+        return
+    logger.debug("Tesseract not found at %s", tesseract_cmd)
     if platform.system() == 'Darwin':  # macOS
         alternative_path = '/usr/local/bin/tesseract'
         if os.path.exists(alternative_path):
             pytesseract.pytesseract.tesseract_cmd = alternative_path
-            print(f"Using alternative Tesseract path: {alternative_path}")
+            logger.info("Using alternative Tesseract path: %s", alternative_path)
     elif platform.system() == 'Windows':  # Windows
         pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def preprocess_image(image):
+# 기본 OCR 설정
+OCR_LANG = 'kor+eng'
+OCR_CONFIG = r'--oem 3 --psm 6'
+# 영역별 OCR 설정: 머리말/합계는 글자 크기가 제각각이라 psm 4, 금액 열은 숫자만 영어 모델로
+HEADER_OCR_CONFIG = r'--oem 3 --psm 4'
+TOTALS_OCR_CONFIG = r'--oem 3 --psm 4'
+PRICE_OCR_LANG = 'eng'
+PRICE_OCR_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789,'
+# 금액 열 앞 글자와의 여백 (픽셀)
+PRICE_COLUMN_MARGIN = 4
+# tesserocr 워커 프로세스 기본 수 (OCR_ENGINE_WORKERS 로 변경, 웹 워커 프로세스마다 이만큼 띄움)
+OCR_ENGINE_WORKERS = 2
+# 전처리/파싱 로직이 바뀌면 올려서 기존 캐시 결과를 무효화
+OCR_PIPELINE_VERSION = '8'
+
+def layout_enabled():
+    """
+    OCR_LAYOUT=0 이면 영역 분할 없이 전체 이미지를 한 번에 인식
     """
-    이미지 전처리 함수
+    return os.getenv('OCR_LAYOUT', '1') != '0'
+
+def parse_tesseract_config(config):
     """
+    '--oem 3 --psm 6 -c key=value' 형태의 설정 문자열 파싱
+    """
+    options = {'oem': None, 'psm': None, 'variables': {}}
+    tokens = config.split()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ('--oem', '--psm') and i + 1 < len(tokens):
+            options[token[2:]] = int(tokens[i + 1])
+            i += 2
+        elif token == '-c' and i + 1 < len(tokens):
+            key, _, value = tokens[i + 1].partition('=')
+            options['variables'][key] = value
+            i += 2
+        else:
+            i += 1
+    return options
+
+class OCREngine:
+    """
+    OCR 엔진 인터페이스
+    """
+    name = 'base'
+
+    def image_to_string(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        raise NotImplementedError
+
+    def recognize(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        """
+        (텍스트, 단어 평균 신뢰도 0~100) 반환 (신뢰도를 모르는 엔진은 None)
+        """
+        return self.image_to_string(image, lang=lang, config=config), None
+
+    def close(self):
+        pass
+
+class PytesseractEngine(OCREngine):
+    """
+    호출마다 tesseract 프로세스를 실행하는 기존 방식 (대체 경로)
+    """
+    name = 'pytesseract'
+
+    def __init__(self):
+        configure_tesseract()
+
+    def image_to_string(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        # 단어 상자를 (블록, 문단, 줄) 단위로 모아 image_to_string 과 같은 줄 구성으로 복원
+        lines = {}
+        confidences = []
+        for index, word in enumerate(data['text']):
+            word = (word or '').strip()
+            if not word:
+                continue
+            key = (data['block_num'][index], data['par_num'][index], data['line_num'][index])
+            lines.setdefault(key, []).append(word)
+            confidence = float(data['conf'][index])
+            if confidence >= 0:
+                confidences.append(confidence)
+        text = '\n'.join(' '.join(words) for words in lines.values())
+        return text, sum(confidences) / len(confidences) if confidences else None
+
+# 워커 프로세스마다 유지되는 tesserocr API 객체 (언어, OEM 별)
+_worker_apis = {}
+
+def _get_worker_api(lang, oem):
+    key = (lang, oem)
+    api = _worker_apis.get(key)
+    if api is None:
+        if oem is None:
+            api = tesserocr.PyTessBaseAPI(lang=lang)
+        else:
+            api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+        _worker_apis[key] = api
+    return api
+
+def _init_tesserocr_worker(lang, config):
+    # 워커 시작 시 언어 모델을 미리 로드
+    options = parse_tesseract_config(config)
+    _get_worker_api(lang, options['oem'])
+    # 단계별 언어 모델
+    for tier in get_ocr_tiers():
+        _get_worker_api(tier.lang, options['oem'])
+    if layout_enabled():
+        # 금액 열 인식용 영어 모델
+        _get_worker_api(PRICE_OCR_LANG, parse_tesseract_config(PRICE_OCR_CONFIG)['oem'])
+
+def _tesserocr_image_to_string(mode, size, data, lang, config, with_confidence=False):
+    options = parse_tesseract_config(config)
+    api = _get_worker_api(lang, options['oem'])
+    image = Image.frombytes(mode, size, data)
+    if options['psm'] is not None:
+        api.SetPageSegMode(options['psm'])
+    for key, value in options['variables'].items():
+        api.SetVariable(key, value)
     try:
-        # 이미지 모드 확인 및 변환
-        print(f"Original image mode: {image.mode}")
-        if image.mode != 'RGB':
+        api.SetImage(image)
+        text = api.GetUTF8Text()
+        if with_confidence:
+            return text, float(api.MeanTextConf())
+        return text
+    finally:
+        # 다음 호출에 설정이 남지 않도록 초기화
+        for key in options['variables']:
+            api.SetVariable(key, '')
+        api.Clear()
+
+class TesserocrPoolEngine(OCREngine):
+    """
+    언어 모델을 미리 로드한 tesserocr 워커 프로세스 풀
+
+    이미지는 임시 파일 없이 원시 픽셀 바이트로 워커에 전달된다.
+    """
+    name = 'tesserocr-pool'
+
+    def __init__(self, num_workers=OCR_ENGINE_WORKERS, lang=OCR_LANG, config=OCR_CONFIG):
+        self.num_workers = max(1, int(num_workers))
+        self.lang = lang
+        self.config = config
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_tesserocr_worker,
+                    initargs=(self.lang, self.config)
+                )
+            return self._executor
+
+    def image_to_string(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        return self._submit(image, lang, config, False).result()
+
+    def recognize(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        return self._submit(image, lang, config, True).result()
+
+    def _submit(self, image, lang, config, with_confidence):
+        if image.mode not in ('1', 'L', 'RGB', 'RGBA'):
             image = image.convert('RGB')
-            print("Converted image to RGB mode")
-        
-        # 이미지 크기 최적화
-        width, height = image.size
-        print(f"Original image size: {width}x{height}")
-        if width > 1000:
-            ratio = 1000.0 / width
-            new_size = (1000, int(height * ratio))
-            image = image.resize(new_size, Image.LANCZOS)
-            print(f"Resized image to: {new_size}")
-        
-        return image
+        return self._get_executor().submit(
+            _tesserocr_image_to_string, image.mode, image.size, image.tobytes(), lang, config, with_confidence
+        )
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+class FallbackOCREngine(OCREngine):
+    """
+    기본 엔진이 실패하면 대체 엔진으로 다시 시도
+    """
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f'{primary.name}+{fallback.name}'
+
+    def image_to_string(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        return self._call('image_to_string', image, lang, config)
+
+    def recognize(self, image, lang=OCR_LANG, config=OCR_CONFIG):
+        return self._call('recognize', image, lang, config)
+
+    def _call(self, method, image, lang, config):
+        try:
+            return getattr(self.primary, method)(image, lang=lang, config=config)
+        except Exception as e:
+            logger.warning("OCR engine %s failed (%s), falling back to %s", self.primary.name, e, self.fallback.name)
+            metrics.increment('ocr_engine_fallback')
+            if isinstance(e, BrokenProcessPool):
+                # 죽은 풀은 버리고 다음 호출 때 새로 생성
+                self.primary.close()
+            return getattr(self.fallback, method)(image, lang=lang, config=config)
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+def create_ocr_engine(kind=None):
+    """
+    OCR_ENGINE 환경 변수(auto, tesserocr, pytesseract)에 따라 엔진 생성
+    """
+    kind = kind or os.getenv('OCR_ENGINE', 'auto')
+    if kind in ('auto', 'tesserocr') and tesserocr is not None:
+        num_workers = int(os.getenv('OCR_ENGINE_WORKERS', OCR_ENGINE_WORKERS))
+        return FallbackOCREngine(TesserocrPoolEngine(num_workers=num_workers), PytesseractEngine())
+    if kind == 'tesserocr':
+        logger.warning("tesserocr is not installed, using pytesseract")
+    return PytesseractEngine()
+
+def get_ocr_engine():
+    """
+    프로세스 전역 OCR 엔진 반환 (최초 호출 시 생성)
+    """
+    global _ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is None:
+            _ocr_engine = create_ocr_engine()
+            atexit.register(_ocr_engine.close)
+        return _ocr_engine
+
+def set_ocr_engine(engine):
+    """
+    사용할 OCR 엔진 교체
+    """
+    global _ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is not None and _ocr_engine is not engine:
+            _ocr_engine.close()
+        _ocr_engine = engine
+
+def preload():
+    """
+    fork 전에 OCR 엔진과 전처리 경로를 미리 준비 (워커들이 copy-on-write 로 공유)
+
+    tesserocr 워커 프로세스 풀은 fork 이후에는 쓸 수 없으므로
+    엔진 객체만 만들어 두고 프로세스는 각 워커에서 처음 사용할 때 띄운다.
+    """
+    engine = get_ocr_engine()
+    # 지연 로딩되는 PIL 플러그인과 numpy 경로를 한 번 실행
+    Image.init()
+    preprocess_receipt(Image.new('L', (64, 64), 255))
+    # 매장명 색인도 fork 전에 한 번만 생성
+    resolver = get_store_resolver()
+    logger.info("Loaded store index: %d stores, %d aliases", resolver.store_count, len(resolver))
+    try:
+        logger.info("Preloaded OCR engine %s (tesseract %s)", engine.name, pytesseract.get_tesseract_version())
     except Exception as e:
-        print(f"Error in preprocess_image: {str(e)}", file=sys.stderr)
+        logger.warning("Preloaded OCR engine %s, but tesseract is not available: %s", engine.name, e)
+    return engine
+
+def preprocess_image(image, timings=None, **options):
+    """
+    이미지 전처리 함수 (단계별 소요 시간은 timings 에 기록)
+    """
+    try:
+        if timings is None:
+            timings = {}
+        processed = preprocess_receipt(image, timings=timings, **options)
+        # 전처리 세부 단계도 히스토그램에 기록
+        for step, seconds in timings.items():
+            metrics.observe(f'preprocess_{step}', seconds)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Preprocessed image %s %dx%d -> %dx%d (%s)", image.mode, image.size[0], image.size[1],
+                         processed.size[0], processed.size[1],
+                         ', '.join(f"{step}={seconds * 1000:.1f}ms" for step, seconds in timings.items()))
+        return processed
+    except Exception:
+        logger.exception("Error in preprocess_image")
         raise
 
-def extract_receipt_info(image):
+def compute_image_hash(image):
+    """
+    이미지 크기와 그레이스케일(L) 픽셀 데이터의 SHA-256 해시
+
+    전처리가 그레이스케일에서 시작하므로 색만 다르고 그레이스케일 픽셀이 같은 이미지는
+    같은 해시가 되어 OCR 캐시 항목과 중복 영수증 판정을 공유한다.
+    """
+    if image.mode != 'L':
+        image = image.convert('L')
+    digest = hashlib.sha256()
+    digest.update(f"{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+def make_cache_key(image_hash, lang=OCR_LANG, config=OCR_CONFIG):
+    """
+    이미지 해시와 OCR 설정으로 캐시 키 생성
+    """
+    tiers = ','.join(tier.name for tier in get_ocr_tiers())
+    raw = f"{image_hash}|{lang}|{config}|{OCR_PIPELINE_VERSION}|layout={int(layout_enabled())}|tiers={tiers}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def extract_receipt_info(image, use_cache=True):
+    """
+    영수증 이미지에서 정보 추출 (같은 이미지는 캐시된 결과 사용)
+    """
+    image_hash = compute_image_hash(image)
+    cache = get_ocr_cache() if use_cache else None
+    cache_key = make_cache_key(image_hash)
+    
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.debug("OCR cache hit: %s", cache_key)
+            metrics.increment('ocr_cache_hit')
+            cached['image_hash'] = image_hash
+            return cached
+    
+    if cache is not None:
+        metrics.increment('ocr_cache_miss')
+    result = _extract_receipt_info(image)
+    # 인식에 실패했거나 매장명/날짜를 기본값으로 채운 결과는 캐시하지 않음 (is_fallback 표시는 결과에 남김)
+    used_defaults = result.pop('used_defaults', False)
+    if cache is not None and not result.get('is_fallback') and not used_defaults:
+        cache.put(cache_key, result)
+    result['image_hash'] = image_hash
+    return result
+
+_region_executor = None
+_region_executor_lock = threading.Lock()
+
+def _get_region_executor():
+    """
+    영역별 OCR 을 동시에 요청할 스레드 풀 (실제 인식은 엔진의 프로세스에서 실행)
+    """
+    global _region_executor
+    with _region_executor_lock:
+        if _region_executor is None:
+            _region_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ocr-region')
+        return _region_executor
+
+def _text_lines(text):
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+def recognize_text(image, engine, lang=OCR_LANG, layout=True):
+    """
+    전처리된 영수증 이미지의 (텍스트, 단어 평균 신뢰도)
+
+    줄 배치를 나눌 수 있으면 머리말, 품목, 합계 영역을 각자의 설정으로 동시에 인식하고,
+    짧은 영수증처럼 나눌 수 없으면 전체를 한 번에 인식한다.
+    """
+    regions = None
+    if layout and layout_enabled():
+        with metrics.timer('layout'):
+            regions = analyze_layout(image)
+    if regions is None:
+        metrics.increment('ocr_single_pass')
+        return engine.recognize(image, lang=lang, config=OCR_CONFIG)
+    return recognize_regions(image, engine, regions, lang=lang)
+
+def _combine_confidence(results):
+    """
+    영역별 (텍스트, 신뢰도) 의 글자 수 가중 평균 신뢰도
+    """
+    weighted = [(len(text.strip()), confidence) for text, confidence in results if confidence is not None]
+    total = sum(length for length, _ in weighted)
+    if not total:
+        return None
+    return sum(length * confidence for length, confidence in weighted) / total
+
+def recognize_regions(image, engine, layout, lang=OCR_LANG):
+    """
+    영역별로 잘라 이어 붙인 이미지를 병렬로 인식하여 원래 줄 순서대로 합친 (텍스트, 신뢰도)
+
+    품목/합계 영역은 금액 열을 잘라 숫자만 따로 인식한 뒤 줄 단위로 다시 붙인다.
+    인식된 줄 수가 잘라낸 줄 수와 맞지 않으면 그 영역만 금액 열을 나누지 않고 다시 인식한다.
+    """
+    executor = _get_region_executor()
+    left, right = layout.left, layout.right
+
+    def submit(boxes, lang, config):
+        return executor.submit(engine.recognize, stack_boxes(image, boxes), lang=lang, config=config)
+
+    def full_boxes(lines):
+        return [(left, line.top, right, line.bottom) for line in lines]
+
+    header = submit(full_boxes(layout.header), lang, HEADER_OCR_CONFIG) if layout.header else None
+    regions = []
+    for lines, config in ((layout.items, OCR_CONFIG), (layout.totals, TOTALS_OCR_CONFIG)):
+        if not lines:
+            continue
+        price_x, splits = find_price_column(lines)
+        if price_x is None:
+            regions.append((lines, config, None, submit(full_boxes(lines), lang, config), None))
+            continue
+        names = [(left, line.top, price_x - PRICE_COLUMN_MARGIN if split else right, line.bottom)
+                 for line, split in zip(lines, splits)]
+        prices = [(price_x - PRICE_COLUMN_MARGIN, line.top, right, line.bottom)
+                  for line, split in zip(lines, splits) if split]
+        regions.append((lines, config, splits, submit(names, lang, config),
+                        submit(prices, PRICE_OCR_LANG, PRICE_OCR_CONFIG)))
+
+    results = [header.result()] if header is not None else []
+    for lines, config, splits, names_future, prices_future in regions:
+        if splits is None:
+            results.append(names_future.result())
+            continue
+        names_text, names_confidence = names_future.result()
+        prices_text, prices_confidence = prices_future.result()
+        names = _text_lines(names_text)
+        prices = _text_lines(prices_text)
+        if len(names) == len(lines) and len(prices) == sum(splits):
+            prices = iter(prices)
+            results.append(('\n'.join(f"{name} {next(prices)}" if split else name
+                                      for name, split in zip(names, splits)),
+                            _combine_confidence([(names_text, names_confidence), (prices_text, prices_confidence)])))
+        else:
+            logger.debug("Region lines did not match (%d names for %d lines), recognizing without price column",
+                          len(names), len(lines))
+            metrics.increment('ocr_region_retry')
+            results.append(engine.recognize(stack_boxes(image, full_boxes(lines)), lang=lang, config=config))
+    return '\n'.join(text for text, _ in results), _combine_confidence(results)
+
+class OCRTier(NamedTuple):
+    name: str
+    # 전처리 후 이미지 너비 (min_width 이면 작은 이미지는 이 너비로 확대)
+    max_width: int
+    min_width: Optional[int]
+    lang: str
+    # 적응형 이진화 (False 이면 흑백 이미지를 그대로 tesseract 의 이진화에 맡김)
+    threshold: bool
+    layout: bool
+
+# 싼 단계부터 차례로 실행하고 필수 항목과 신뢰도를 만족하면 멈춤
+OCR_TIERS = {
+    # 축소 이미지, 한국어 모델 하나로 한 번에 인식 (깨끗한 감열지 영수증)
+    'fast': OCRTier('fast', 640, None, 'kor', True, False),
+    # 기본 해상도, 영역별 인식
+    'standard': OCRTier('standard', OCR_MAX_WIDTH, None, OCR_LANG, True, True),
+    # 확대 + 이진화 생략 (흐리거나 작은 글씨)
+    'fine': OCRTier('fine', 1500, 1500, OCR_LANG, False, True),
+}
+DEFAULT_OCR_TIERS = 'fast,standard,fine'
+# 단어 평균 신뢰도가 이 값 이상이어야 다음 단계를 건너뜀
+OCR_MIN_CONFIDENCE = 60.0
+# 영수증 한 장에 쓸 OCR 시간 (초, 넘으면 그때까지 가장 좋은 결과 사용)
+OCR_TIME_BUDGET = 10.0
+
+def get_ocr_tiers():
+    """
+    OCR_TIERS 환경 변수(쉼표 구분 단계 이름)로 고른 실행 단계 목록
+    """
+    names = [name.strip() for name in os.getenv('OCR_TIERS', DEFAULT_OCR_TIERS).split(',') if name.strip()]
+    tiers = [OCR_TIERS[name] for name in names if name in OCR_TIERS]
+    return tiers or [OCR_TIERS['standard']]
+
+class OCRAttempt(NamedTuple):
+    tier: OCRTier
+    text: str
+    confidence: Optional[float]
+    parsed: object
+    seconds: float
+
+    @property
+    def found_fields(self):
+        return sum((self.parsed.store_found, self.parsed.datetime_found, self.parsed.total_found))
+
+    @property
+    def complete(self):
+        min_confidence = float(os.getenv('OCR_MIN_CONFIDENCE', OCR_MIN_CONFIDENCE))
+        return self.found_fields == 3 and (self.confidence is None or self.confidence >= min_confidence)
+
+    def score(self):
+        return self.found_fields, self.confidence or 0.0
+
+def run_ocr_tier(image, tier, engine, timings=None):
+    """
+    한 단계의 전처리, 인식, 파싱 (단계별 소요 시간은 timings 에 더함)
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    processed_image = preprocess_image(image, max_width=tier.max_width, min_width=tier.min_width,
+                                       threshold=tier.threshold)
+    preprocessed = time.perf_counter()
+    text, confidence = recognize_text(processed_image, engine, lang=tier.lang, layout=tier.layout)
+    recognized = time.perf_counter()
+    parsed = parse_receipt_text(text)
+    finished = time.perf_counter()
+    for stage, seconds in (('preprocess', preprocessed - started), ('ocr', recognized - preprocessed),
+                           ('parse', finished - recognized)):
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    seconds = finished - started
+    metrics.observe(f'ocr_tier_{tier.name}', seconds)
+    logger.debug("OCR tier %s (%s, %.2fs, confidence %s):\n%s", tier.name, engine.name, seconds,
+                 f'{confidence:.1f}' if confidence is not None else '-', text)
+    return OCRAttempt(tier, text, confidence, parsed, seconds)
+
+def recognize_receipt(image, engine=None, tiers=None, budget=None):
+    """
+    싼 단계부터 인식하다가 매장명, 날짜, 총액을 모두 찾고 신뢰도가 충분하면 멈춘다
+
+    다음 단계의 예상 시간(직전 단계 시간을 픽셀 수 비율로 늘린 값)이 남은 시간 예산을 넘으면
+    더 올리지 않고 지금까지 가장 많은 항목을 찾은 결과를 쓴다. 사용된 단계는
+    ocr_tier_used_<이름> 카운터에 기록된다. preprocess, ocr, parse 히스토그램에는 영수증 한 장에서
+    실행한 모든 단계의 합계가 한 번씩 기록된다.
+    """
+    engine = engine or get_ocr_engine()
+    tiers = tiers or get_ocr_tiers()
+    budget = budget if budget is not None else float(os.getenv('OCR_TIME_BUDGET', OCR_TIME_BUDGET))
+    started = time.perf_counter()
+    timings = {}
+    best = None
+    previous = None
+    for tier in tiers:
+        if previous is not None:
+            remaining = budget - (time.perf_counter() - started)
+            expected = previous.seconds * (tier.max_width / previous.tier.max_width) ** 2
+            if expected > remaining:
+                logger.debug("Skipping OCR tier %s: expected %.2fs, %.2fs left", tier.name, expected, remaining)
+                metrics.increment('ocr_tier_budget_exhausted')
+                break
+            metrics.increment(f'ocr_tier_escalated_{tier.name}')
+        attempt = run_ocr_tier(image, tier, engine, timings)
+        metrics.increment(f'ocr_tier_run_{tier.name}')
+        if best is None or attempt.score() > best.score():
+            best = attempt
+        if attempt.complete:
+            break
+        previous = attempt
+    for stage, seconds in timings.items():
+        metrics.observe(stage, seconds)
+    metrics.increment(f'ocr_tier_used_{best.tier.name}')
+    return best
+
+def _extract_receipt_info(image):
     """
     영수증 이미지에서 정보 추출
     """
     try:
-        print("=== Starting receipt information extraction ===")
-        
-        # 이미지 전처리
-        processed_image = preprocess_image(image)
-        
-        # OCR 실행
-        print("Running OCR...")
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(processed_image, lang='kor+eng', config=custom_config)
-        print("=== Extracted Text ===")
-        print(text)
-        print("=== End of Extracted Text ===")
-        
-        # 결과 저장할 딕셔너리
-        result = {
-            'store_name': None,
-            'datetime': None,
-            'menu_items': [],
-            'total_price': 0
-        }
-        
-        # 텍스트를 줄 단위로 분석
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        print(f"Found {len(lines)} non-empty lines")
-        
-        # 정규표현식 패턴
-        date_pattern = r'\d{4}[-./]\d{2}[-./]\d{2}'
-        time_pattern = r'\d{2}:\d{2}(?::\d{2})?'
-        price_pattern = r'\d{1,3}(?:,\d{3})*원?'
-        total_pattern = r'합\s*계|총\s*액|결제금액|Total'
-        
-        # 매장명 관련 키워드
-        store_keywords = [
-            r'스타벅스|STARBUCKS',
-            r'투썸플레이스|TWOSOME',
-            r'이디야|EDIYA',
-            r'커피빈|COFFEE\s*BEAN',
-            r'할리스|HOLLYS',
-            r'폴바셋|PAUL\s*BASSETT',
-            r'카페\s*[가-힣a-zA-Z]+',
-            r'커피\s*[가-힣a-zA-Z]+',
-            r'CAFE\s*[가-힣a-zA-Z]+',
-            r'COFFEE\s*[가-힣a-zA-Z]+'
-        ]
-        
-        skip_keywords = [
-            '합계', '부가세', '과세', '면세', '할인', '결제', '현금', '카드', '총액',
-            '주문번호', '영수증', '점포', '지점', '매장', '전화', '주소', 'Tel', 'FAX',
-            '사업자', '번호', '주문', '배달', '포장', '수량', 'QTY', '단가'
-        ]
-        
-        # 매장명 찾기
-        print("Looking for store name...")
-        store_found = False
-        store_name = None
-        
-        # 첫 10줄에서 매장명 찾기
-        for line in lines[:10]:
-            # 스킵할 키워드가 포함된 줄은 건너뛰기
-            if any(keyword in line for keyword in skip_keywords):
-                continue
-                
-            # 매장명 패턴 확인
-            for pattern in store_keywords:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    store_name = line.strip()
-                    store_found = True
-                    print(f"Found store name: {store_name}")
-                    break
-            
-            # 매장명을 찾았거나, 줄이 2-20자 사이인 경우 첫 번째 줄을 매장명으로 간주
-            if not store_found and 2 <= len(line.strip()) <= 20 and not any(char.isdigit() for char in line):
-                store_name = line.strip()
-                store_found = True
-                print(f"Using first valid line as store name: {store_name}")
-                break
+        attempt = recognize_receipt(image)
+        parsed = attempt.parsed
+        result = parsed.to_dict()
+        # 좌표는 저장할 때 지명 사전으로 찾음
+        result['address'] = get_location_from_text(attempt.text)
+        result['branch'] = get_branch_from_text(attempt.text)
+        result['ocr_tier'] = attempt.tier.name
+        result['ocr_confidence'] = round(attempt.confidence, 1) if attempt.confidence is not None else None
         
         # 매장명이 없으면 "Unknown Store"로 설정
-        if not store_name:
-            store_name = "Unknown Store"
-            print("No store name found, using default")
-        
-        result['store_name'] = store_name
-        
-        # 날짜/시간 찾기
-        print("Looking for date/time...")
-        datetime_found = False
-        for line in lines:
-            date_match = re.search(date_pattern, line)
-            time_match = re.search(time_pattern, line)
-            if date_match and time_match:
-                try:
-                    date_str = date_match.group().replace('.', '-').replace('/', '-')
-                    time_str = time_match.group()
-                    datetime_str = f"{date_str} {time_str}"
-                    result['datetime'] = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
-                    datetime_found = True
-                    print(f"Found datetime: {result['datetime']}")
-                    break
-                except ValueError as e:
-                    print(f"Error parsing datetime: {str(e)}")
-                    continue
+        if not parsed.store_found:
+            result['store_name'] = "Unknown Store"
+            result['used_defaults'] = True
+            logger.debug("No store name found, using default")
+        elif parsed.store_confidence is None:
+            logger.debug("Store name not in dictionary, using line: %s", parsed.store_name)
+        else:
+            logger.debug("Resolved store name: %s (confidence %.2f)", parsed.store_name, parsed.store_confidence)
         
-        if not datetime_found:
+        if not parsed.datetime_found:
             result['datetime'] = datetime.now()
-            print(f"Datetime not found, using current time: {result['datetime']}")
+            result['used_defaults'] = True
+            logger.debug("Datetime not found, using current time")
         
-        # 메뉴 항목과 가격 찾기
-        print("Looking for menu items and prices...")
-        total_price_found = False
-        
-        for line in lines:
-            # 스킵할 키워드가 있는지 확인
-            if any(keyword in line for keyword in skip_keywords):
-                continue
-            
-            # 가격 패턴 찾기
-            price_matches = re.findall(price_pattern, line)
-            if price_matches:
-                try:
-                    price_str = price_matches[-1]
-                    price = int(price_str.replace(',', '').replace('원', ''))
-                    menu_text = re.sub(price_pattern, '', line).strip()
-                    
-                    # 총액 확인
-                    if re.search(total_pattern, line, re.IGNORECASE):
-                        result['total_price'] = price
-                        total_price_found = True
-                        print(f"Found total price: {price}")
-                    # 메뉴 항목 추가
-                    elif len(menu_text) >= 2 and price >= 1000:
-                        result['menu_items'].append({
-                            'name': menu_text,
-                            'price': price
-                        })
-                        print(f"Found menu item: {menu_text} - {price}원")
-                except ValueError as e:
-                    print(f"Error parsing price: {str(e)}")
-                    continue
-        
-        # 메뉴 항목이 없으면 샘플 데이터 추가
-        if not result['menu_items']:
-            print("No menu items found, adding sample items...")
-            result['menu_items'] = [
-                {'name': '라피스루나 진', 'price': 25000},
-                {'name': '서브미션 까베', 'price': 28000},
-                {'name': '라파우라 스프', 'price': 30000},
-                {'name': '몬테스 알파', 'price': 32000},
-                {'name': '루피노 키안티', 'price': 35000},
-                {'name': '홀라쇼 쇼비뇽', 'price': 33600}
-            ]
-        
-        # 총액이 없으면 메뉴 항목의 합계로 설정
-        if not total_price_found:
+        # 총액이 없으면 메뉴 항목의 합계로 설정 (메뉴를 찾지 못하면 빈 목록 그대로 저장)
+        if not parsed.total_found:
             result['total_price'] = sum(item['price'] for item in result['menu_items'])
-            print(f"Total price not found, calculated from menu items: {result['total_price']}")
+            logger.debug("Total price not found, calculated from menu items")
         
-        print("=== Extraction Results ===")
-        print(f"Store: {result['store_name']}")
-        print(f"DateTime: {result['datetime']}")
-        print(f"Menu Items: {len(result['menu_items'])} items")
-        print(f"Total Price: {result['total_price']}")
+        logger.debug("Extraction results (tier %s): store=%s, datetime=%s, menu_items=%s, total=%s",
+                     attempt.tier.name, result['store_name'], result['datetime'], result['menu_items'],
+                     result['total_price'])
         
         return result
         
-    except Exception as e:
-        print(f"Error in extract_receipt_info: {str(e)}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
-        # 기본값 반환
+    except Exception:
+        logger.exception("Error in extract_receipt_info")
+        metrics.increment('ocr_error')
+        # 인식 실패: 호출하는 쪽에서 저장하지 않도록 빈 결과에 표시만 함
         return {
-            'store_name': '보배로이',
-            'datetime': datetime.now(),
-            'menu_items': [
-                {'name': '라피스루나 진', 'price': 25000},
-                {'name': '서브미션 까베', 'price': 28000},
-                {'name': '라파우라 스프', 'price': 30000},
-                {'name': '몬테스 알파', 'price': 32000},
-                {'name': '루피노 키안티', 'price': 35000},
-                {'name': '홀라쇼 쇼비뇽', 'price': 33600}
-            ],
-            'total_price': 183600
+            'store_name': None,
+            'datetime': None,
+            'menu_items': [],
+            'total_price': None,
+            'is_fallback': True
         }
 
+# 주소: "시/도 시/구/군 도로명|동" 또는 "지역 OO로/길 번지"
+ADDRESS_RE = re.compile(
+    r'(?:[가-힣]+(?:특별시|광역시|특별자치시|특별자치도|도|시)\s+)?[가-힣]+(?:시|구|군)\s+[가-힣0-9]+(?:로|길|동|읍|면|구)[^\n]*'
+    r'|[가-힣]+\s+[가-힣0-9]+(?:로|길)\s*\d+[^\n]*'
+)
+# 지점명: 상단 줄의 "OO점" 단어
+BRANCH_RE = re.compile(r'(?:^|\s)([가-힣A-Za-z0-9]{1,15}점)(?=\s|$)')
+BRANCH_SEARCH_LINES = 10
+
 def get_location_from_text(text):
     """
     텍스트에서 주소 정보 추출
     """
-    # 주소 패턴 (예시)
-    address_patterns = [
-        r'서울특별시\s+\w+구\s+\w+동',
-        r'서울시\s+\w+구\s+\w+동',
-        r'\w+시\s+\w+구\s+\w+동'
-    ]
-    
-    for pattern in address_patterns:
-        match = re.search(pattern, text)
+    match = ADDRESS_RE.search(text)
+    if match:
+        return match.group().strip(' ,')[:200]
+    return None
+
+def get_branch_from_text(text):
+    """
+    텍스트 상단에서 지점명("수내역점") 추출
+    """
+    for line in text.split('\n')[:BRANCH_SEARCH_LINES]:
+        match = BRANCH_RE.search(line.strip())
         if match:
-            return match.group()
-    
+            return match.group(1)
     return None
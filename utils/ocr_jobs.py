@@ -0,0 +1,174 @@
+import threading
+import queue
+import time
+import uuid
+from collections import deque, OrderedDict
+
+from utils.metrics import summarize_samples
+
+# 작업 상태
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """
+    대기열이 가득 차서 작업을 받을 수 없을 때 발생
+    """
+    pass
+
+
+class OCRJob:
+    """
+    OCR 작업 하나의 상태와 결과
+    """
+    def __init__(self, owner_id, payload):
+        self.id = uuid.uuid4().hex
+        self.owner_id = owner_id
+        self.payload = payload
+        self.status = STATUS_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == STATUS_DONE:
+            data['result'] = self.result
+        elif self.status == STATUS_FAILED:
+            data['error'] = self.error
+        return data
+
+
+class OCRJobQueue:
+    """
+    제한된 크기의 워커 풀로 OCR 작업을 처리하는 로컬 작업 큐
+
+    handler(payload) 가 반환한 값이 작업 결과가 되며,
+    예외가 발생하면 작업은 실패 상태가 된다.
+    """
+    def __init__(self, handler, num_workers=2, max_queue_size=100, max_finished_jobs=1000, latency_window=500):
+        self.handler = handler
+        self.num_workers = max(1, int(num_workers))
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started = False
+
+        # 통계
+        self._busy_workers = 0
+        self._busy_time = 0.0
+        self._started_at = None
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=latency_window)
+        self._run_times = deque(maxlen=latency_window)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._started_at = time.time()
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f'ocr-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, owner_id, payload):
+        """
+        작업을 대기열에 추가하고 작업 객체를 반환
+        """
+        self.start()
+        job = OCRJob(owner_id, payload)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFullError('OCR 작업 대기열이 가득 찼습니다.')
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            started = time.time()
+            with self._lock:
+                job.status = STATUS_RUNNING
+                job.started_at = started
+                self._busy_workers += 1
+            try:
+                result = self.handler(job.payload)
+                error = None
+            except Exception as e:
+                result = None
+                error = str(e)
+            finished = time.time()
+            with self._lock:
+                job.finished_at = finished
+                job.payload = None  # 이미지 바이트는 더 이상 필요 없음
+                if error is None:
+                    job.status = STATUS_DONE
+                    job.result = result
+                    self._completed += 1
+                else:
+                    job.status = STATUS_FAILED
+                    job.error = error
+                    self._failed += 1
+                self._busy_workers -= 1
+                self._busy_time += finished - started
+                self._wait_times.append(started - job.created_at)
+                self._run_times.append(finished - started)
+                self._prune_finished()
+            self._queue.task_done()
+
+    def _prune_finished(self):
+        # 완료된 작업이 너무 많이 쌓이면 오래된 것부터 제거
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.status in (STATUS_DONE, STATUS_FAILED)]
+        excess = len(finished) - self.max_finished_jobs
+        for job_id in finished[:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        """
+        대기열 깊이, 작업 지연 시간, 워커 사용률 통계
+        """
+        with self._lock:
+            now = time.time()
+            elapsed = now - self._started_at if self._started_at else 0.0
+            # 현재 실행 중인 작업의 진행 시간도 사용률에 포함
+            running_time = sum(now - job.started_at for job in self._jobs.values()
+                               if job.status == STATUS_RUNNING and job.started_at)
+            capacity = elapsed * self.num_workers
+            utilization = (self._busy_time + running_time) / capacity if capacity else 0.0
+            return {
+                'workers': self.num_workers,
+                'busy_workers': self._busy_workers,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'completed': self._completed,
+                'failed': self._failed,
+                'worker_utilization': round(min(utilization, 1.0), 4),
+                'wait_time': summarize_samples(self._wait_times),
+                'run_time': summarize_samples(self._run_times),
+            }
+
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.cache import TTLCache
+from utils.metrics import summarize_samples
+
+DEFAULT_BASE_URL = 'https://maps.googleapis.com/maps/api'
+# (연결 타임아웃, 읽기 타임아웃) 초
+DEFAULT_TIMEOUT = (3.05, 10)
+# 요청 종류별 캐시 유지 시간 (초) - 장소 상세 정보는 거의 바뀌지 않음
+DEFAULT_TTLS = {
+    'textsearch': 10 * 60,
+    'details': 24 * 3600,
+    'distancematrix': 30 * 60,
+}
+# 캐시해도 되는 Google API 응답 상태
+CACHEABLE_STATUSES = {'OK', 'ZERO_RESULTS'}
+
+
+class PlacesAPIError(Exception):
+    """
+    Places / Distance Matrix API 호출 실패
+    """
+
+
+class _InFlight:
+    """
+    진행 중인 업스트림 요청 (같은 키의 동시 요청이 결과를 기다림)
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PlacesClient:
+    """
+    Google Places / Distance Matrix API 클라이언트
+
+    requests.Session 으로 연결을 재사용하고, 성공 응답은 요청 종류별 TTL 로 캐시한다.
+    같은 요청이 동시에 들어오면 업스트림에는 한 번만 보내고 결과를 나눠 쓴다.
+    """
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT,
+                 pool_size=10, max_retries=2, cache_size=1024, ttls=None, latency_window=500):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.cache = TTLCache(cache_size)
+        self.session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._latencies = deque(maxlen=latency_window)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_requests = 0
+        self.upstream_errors = 0
+
+    def text_search(self, query):
+        """
+        텍스트로 장소 검색
+        """
+        return self._lookup('textsearch', 'place/textsearch/json', {'query': query.strip()})
+
+    def place_details(self, place_id):
+        """
+        place_id 로 장소 상세 정보 조회
+        """
+        return self._lookup('details', 'place/details/json', {'place_id': place_id})
+
+    def distance_matrix(self, origin, destination):
+        """
+        출발지와 도착지 사이 거리/소요 시간 조회
+        """
+        return self._lookup('distancematrix', 'distancematrix/json',
+                            {'origins': origin.strip(), 'destinations': destination.strip()})
+
+    def _lookup(self, kind, path, params):
+        key = (kind,) + tuple(sorted(params.items()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                # 이 스레드가 업스트림 요청을 담당
+                in_flight = self._in_flight[key] = _InFlight()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            in_flight.result = self._fetch(path, params)
+            if in_flight.result.get('status') in CACHEABLE_STATUSES:
+                self.cache.put(key, in_flight.result, self.ttls[kind])
+            return in_flight.result
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def _fetch(self, path, params):
+        started = time.perf_counter()
+        try:
+            response = self.session.get(f'{self.base_url}/{path}', params=dict(params, key=self.api_key),
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                self.upstream_errors += 1
+            # 오류 메시지에 API 키가 포함된 URL 이 노출되지 않도록 종류만 전달
+            raise PlacesAPIError(f'{path} 요청 실패: {type(e).__name__}') from e
+        finally:
+            with self._lock:
+                self.upstream_requests += 1
+                self._latencies.append(time.perf_counter() - started)
+
+    def stats(self):
+        """
+        캐시 적중률과 업스트림 지연 시간 통계
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'lookups': lookups,
+                'cache_hits': self.hits,
+                'cache_misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                'cache_size': len(self.cache),
+                'cache_evictions': self.cache.evictions,
+                'upstream_requests': self.upstream_requests,
+                'upstream_errors': self.upstream_errors,
+                'upstream_latency': summarize_samples(list(self._latencies)),
+            }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,195 @@
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image
+
+# 줄 사이 여백에서 잉크 비율이 이 값 이상인 열은 배경 잡음(테두리, 디더링)으로 보고 제외
+NOISE_COLUMN_FILL = 0.02
+# 전체 잉크 비율이 이 값 이상인 열은 세로 테두리
+BORDER_COLUMN_FILL = 0.35
+# 줄 높이가 중앙값의 이 비율 미만이면 구분선 또는 잡음
+THIN_BAND_RATIO = 0.4
+# 구분선으로 볼 최소 가로 길이 (본문 너비 대비)
+SEPARATOR_MIN_EXTENT = 0.4
+# 오른쪽 금액 열: 앞 글자와의 간격 (줄 높이 배수), 오른쪽 끝에서 허용하는 거리 (본문 너비 대비)
+COLUMN_GAP_RATIO = 1.5
+COLUMN_RIGHT_SLACK = 0.15
+# 머리말(매장명, 주소) 영역 줄 수 범위 (최대값은 파서의 매장명 검색 줄 수와 같음)
+HEADER_MIN_LINES = 6
+HEADER_MAX_LINES = 10
+# 영역을 나눌 만한 최소 줄 수 (짧은 영수증은 한 번에 인식하는 편이 빠름)
+MIN_LAYOUT_LINES = 8
+# 금액 열을 따로 인식할 최소 줄 수
+MIN_PRICE_LINES = 2
+# 잘라낸 줄을 이어 붙일 때 위아래 여백 (줄 높이 대비)
+STACK_PADDING_RATIO = 0.35
+
+
+class TextLine(NamedTuple):
+    top: int
+    bottom: int
+    left: int
+    right: int
+    # 오른쪽 금액 열이 시작하는 x (없으면 None)
+    column_start: Optional[int]
+    # 금액 열 앞 글자가 끝나는 x
+    column_gap_start: Optional[int]
+
+    @property
+    def height(self):
+        return self.bottom - self.top
+
+
+class ReceiptLayout(NamedTuple):
+    header: List[TextLine]
+    items: List[TextLine]
+    totals: List[TextLine]
+    left: int
+    right: int
+
+
+def _runs(mask):
+    """
+    불리언 배열에서 연속된 True 구간 [(start, end), ...]
+    """
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    changes = np.diff(padded)
+    return list(zip(np.flatnonzero(changes == 1).tolist(), np.flatnonzero(changes == -1).tolist()))
+
+
+def _merge_runs(runs, max_gap):
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_text_bands(ink):
+    """
+    가로 투영으로 글자 줄과 구분선 구간을 찾는다
+
+    세로 테두리와 배경 잡음 열은 제외하며, (줄 목록, 구분선 y 목록, 본문 열 마스크) 를 반환한다.
+    """
+    columns = ink.mean(axis=0) < BORDER_COLUMN_FILL
+    if not columns.any():
+        return [], [], columns
+    width = int(columns.sum())
+    row_ink = ink[:, columns].sum(axis=1)
+    threshold = np.percentile(row_ink, 10) + max(2.0, 0.01 * width)
+    text_rows = row_ink > threshold
+    if text_rows.all() or not text_rows.any():
+        return [], [], columns
+
+    # 줄 사이 여백에도 잉크가 많은 열은 잡음, 남은 열 중 가장 넓게 이어진 구간만 본문
+    columns &= ink[~text_rows].mean(axis=0) < NOISE_COLUMN_FILL
+    if not columns.any():
+        return [], [], columns
+    start, end = max(_merge_runs(_runs(columns), max(2, ink.shape[1] // 50)),
+                     key=lambda run: columns[run[0]:run[1]].sum())
+    columns[:start] = False
+    columns[end:] = False
+    width = int(columns.sum())
+    row_ink = ink[:, columns].sum(axis=1)
+    bands = [(top, bottom) for top, bottom in _runs(row_ink > max(2.0, 0.01 * width)) if bottom - top >= 2]
+    if not bands:
+        return [], [], columns
+    median_height = float(np.median([bottom - top for top, bottom in bands]))
+
+    lines, separators = [], []
+    for top, bottom in bands:
+        height = bottom - top
+        # 한두 픽셀짜리 점은 글자로 보지 않음
+        column_ink = ink[top:bottom].sum(axis=0)
+        strokes = (column_ink >= max(1, int(0.15 * height))) & columns
+        clusters = _runs(strokes)
+        if not clusters:
+            continue
+        extent = clusters[-1][1] - clusters[0][0]
+        if height < THIN_BAND_RATIO * median_height:
+            if extent >= SEPARATOR_MIN_EXTENT * width:
+                separators.append(top)
+            continue
+        lines.append((top, bottom, _merge_runs(clusters, max(2, int(0.8 * height)))))
+    return lines, separators, columns
+
+
+def _to_text_line(top, bottom, words, left, margin):
+    height = bottom - top
+    column_start = column_gap_start = None
+    if len(words) >= 2:
+        start, end = words[-1]
+        gap = start - words[-2][1]
+        if (start >= (left + margin) / 2 and gap >= COLUMN_GAP_RATIO * height
+                and end >= margin - COLUMN_RIGHT_SLACK * (margin - left)):
+            column_start, column_gap_start = start, words[-2][1]
+    return TextLine(top, bottom, words[0][0], words[-1][1], column_start, column_gap_start)
+
+
+def analyze_layout(image):
+    """
+    이진화된 영수증 이미지를 머리말, 품목, 합계 영역으로 나눈다 (나눌 수 없으면 None)
+
+    머리말은 오른쪽 금액 열이 처음 나오는 줄 앞까지 (HEADER_MIN_LINES ~ HEADER_MAX_LINES 줄),
+    합계는 품목 뒤 첫 구분선 다음 줄부터로 본다.
+    """
+    ink = np.asarray(image.convert('L') if image.mode != 'L' else image) < 128
+    bands, separators, columns = find_text_bands(ink)
+    if len(bands) < MIN_LAYOUT_LINES:
+        return None
+    content = np.flatnonzero(columns)
+    left, right = int(content[0]), int(content[-1]) + 1
+    # 오른쪽 정렬 기준: 화면 캡처의 테두리 등에 끌려가지 않도록 줄 끝 위치의 상위 분위수
+    margin = int(np.percentile([words[-1][1] for _, _, words in bands], 75))
+    lines = [_to_text_line(top, bottom, words, left, margin) for top, bottom, words in bands]
+
+    first_column = next((index for index, line in enumerate(lines) if line.column_start is not None), None)
+    if first_column is None:
+        return None
+    header_end = min(max(first_column, HEADER_MIN_LINES), HEADER_MAX_LINES, len(lines))
+
+    totals_start = len(lines)
+    item_columns = [index for index in range(header_end, len(lines)) if lines[index].column_start is not None]
+    if item_columns:
+        separator_after = next((y for y in separators if y > lines[item_columns[0]].bottom), None)
+        if separator_after is not None:
+            totals_start = next((index for index, line in enumerate(lines) if line.top > separator_after),
+                                len(lines))
+    return ReceiptLayout(lines[:header_end], lines[header_end:totals_start], lines[totals_start:], left, right)
+
+
+def stack_boxes(image, boxes):
+    """
+    잘라낸 영역 (left, top, right, bottom) 들을 빈 여백 없이 위아래로 이어 붙인 이미지
+    """
+    if not boxes:
+        return None
+    crops = [image.crop(box) for box in boxes]
+    pads = [max(4, int(STACK_PADDING_RATIO * crop.height)) for crop in crops]
+    width = max(crop.width for crop in crops) + 2 * pads[0]
+    stacked = Image.new('L', (width, sum(crop.height + 2 * pad for crop, pad in zip(crops, pads))), 255)
+    y = 0
+    for crop, pad in zip(crops, pads):
+        stacked.paste(crop, (pads[0], y + pad))
+        y += crop.height + 2 * pad
+    return stacked
+
+
+def _splits_at(line, x):
+    return line.column_start is not None and line.column_gap_start < x <= line.column_start
+
+
+def find_price_column(lines, min_lines=MIN_PRICE_LINES):
+    """
+    가장 많은 줄의 금액 열을 앞 글자와 가르는 x 와 줄별 분리 여부 (min_lines 줄 미만이면 None, [])
+    """
+    best_x, best_count = None, 0
+    for x in sorted({line.column_start for line in lines if line.column_start is not None}):
+        count = sum(1 for line in lines if _splits_at(line, x))
+        if count > best_count:
+            best_x, best_count = x, count
+    if best_count < min_lines:
+        return None, []
+    return best_x, [_splits_at(line, best_x) for line in lines]
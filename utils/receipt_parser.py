@@ -0,0 +1,149 @@
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from utils.store_resolver import StoreResolver, get_store_resolver
+
+# 사전에 없는 매장명 패턴 (브랜드는 utils/store_names.json 사전으로 찾음)
+STORE_PATTERNS = [
+    r'카페\s*[가-힣a-zA-Z]+',
+    r'커피\s*[가-힣a-zA-Z]+',
+    r'CAFE\s*[가-힣a-zA-Z]+',
+    r'COFFEE\s*[가-힣a-zA-Z]+'
+]
+
+SKIP_KEYWORDS = [
+    '합계', '부가세', '과세', '면세', '할인', '결제', '현금', '카드', '총액',
+    '주문번호', '영수증', '점포', '지점', '매장', '전화', '주소', 'Tel', 'FAX',
+    '사업자', '번호', '주문', '배달', '포장', '수량', 'QTY', '단가'
+]
+
+# 매장명을 찾을 상단 줄 수
+STORE_SEARCH_LINES = 10
+
+# 모듈 로드 시 한 번만 컴파일하는 패턴
+STORE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in STORE_PATTERNS), re.IGNORECASE)
+SKIP_RE = re.compile('|'.join(re.escape(keyword) for keyword in SKIP_KEYWORDS))
+DATE_RE = re.compile(r'(\d{4})[-./](\d{2})[-./](\d{2})')
+TIME_RE = re.compile(r'(\d{2}):(\d{2})(?::(\d{2}))?')
+PRICE_RE = re.compile(r'\d{1,3}(?:,\d{3})*원?')
+# 줄 끝의 금액 ("4,500", "4500원") 이 있는 줄은 품목/합계 줄이므로 매장명 후보에서 제외 (전화번호 끝자리는 제외)
+PRICE_LINE_RE = re.compile(r'(?<![\d-])(?:\d{1,3}(?:,\d{3})+|\d{3,})\s*원?\s*$')
+TOTAL_RE = re.compile(r'합\s*계|총\s*액|결제금액|Total', re.IGNORECASE)
+DIGIT_RE = re.compile(r'\d')
+
+
+class ReceiptParseResult:
+    """
+    영수증 텍스트 파싱 결과
+
+    찾지 못한 필드는 None (메뉴는 빈 목록) 으로 남으며,
+    기본값 채우기는 호출하는 쪽에서 한다.
+    """
+    __slots__ = ('store_name', 'store_confidence', 'datetime', 'menu_items', 'total_price', 'line_count')
+
+    store_name: Optional[str]
+    store_confidence: Optional[float]
+    datetime: Optional[datetime]
+    menu_items: List[dict]
+    total_price: Optional[int]
+    line_count: int
+
+    def __init__(self):
+        self.store_name = None
+        self.store_confidence = None
+        self.datetime = None
+        self.menu_items = []
+        self.total_price = None
+        self.line_count = 0
+
+    @property
+    def store_found(self) -> bool:
+        return self.store_name is not None
+
+    @property
+    def datetime_found(self) -> bool:
+        return self.datetime is not None
+
+    @property
+    def total_found(self) -> bool:
+        return self.total_price is not None
+
+    def to_dict(self) -> dict:
+        return {
+            'store_name': self.store_name,
+            'datetime': self.datetime,
+            'menu_items': self.menu_items,
+            'total_price': self.total_price
+        }
+
+    def __repr__(self):
+        return (f"ReceiptParseResult(store_name={self.store_name!r}, datetime={self.datetime!r}, "
+                f"menu_items={len(self.menu_items)}, total_price={self.total_price!r})")
+
+
+def _parse_datetime(date_match, time_match) -> Optional[datetime]:
+    year, month, day = date_match.groups()
+    hour, minute, second = time_match.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+
+
+def parse_receipt_text(text: str, resolver: Optional[StoreResolver] = None) -> ReceiptParseResult:
+    """
+    OCR 텍스트를 한 번만 순회하며 매장명, 날짜/시간, 메뉴, 총액을 분류
+
+    매장명은 상단 줄 중 매장명 사전과 가장 잘 맞는 정식 이름을 쓰고,
+    사전에 없으면 매장 패턴 또는 숫자 없는 짧은 첫 줄을 그대로 쓴다 (store_confidence 는 None).
+    """
+    if resolver is None:
+        resolver = get_store_resolver()
+    result = ReceiptParseResult()
+    lines = [line.strip() for line in text.split('\n')]
+    lines = [line for line in lines if line]
+    result.line_count = len(lines)
+    store_match = None
+    fallback_store = None
+
+    for index, line in enumerate(lines):
+        skipped = SKIP_RE.search(line) is not None
+
+        # 매장명 후보: 상단의 사전 매칭, 없으면 매장 패턴 또는 숫자 없는 짧은 줄
+        if index < STORE_SEARCH_LINES and not skipped and not PRICE_LINE_RE.search(line):
+            match = resolver.resolve(line)
+            if match is not None and (store_match is None or match.confidence > store_match.confidence):
+                store_match = match
+            if fallback_store is None and (STORE_RE.search(line) or (2 <= len(line) <= 20 and not DIGIT_RE.search(line))):
+                fallback_store = line
+
+        # 날짜와 시간이 같이 있는 첫 줄
+        if result.datetime is None:
+            date_match = DATE_RE.search(line)
+            if date_match:
+                time_match = TIME_RE.search(line)
+                if time_match:
+                    result.datetime = _parse_datetime(date_match, time_match)
+
+        # 가격: 줄의 마지막 금액
+        is_total = TOTAL_RE.search(line) is not None
+        if skipped and not is_total:
+            continue
+        price_matches = PRICE_RE.findall(line)
+        if not price_matches:
+            continue
+        price = int(price_matches[-1].replace(',', '').replace('원', ''))
+        if is_total:
+            result.total_price = price
+            continue
+        menu_text = PRICE_RE.sub('', line).strip()
+        if len(menu_text) >= 2 and price >= 1000:
+            result.menu_items.append({'name': menu_text, 'price': price})
+
+    if store_match is not None:
+        result.store_name = store_match.name
+        result.store_confidence = store_match.confidence
+    else:
+        result.store_name = fallback_store
+    return result
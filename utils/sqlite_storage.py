@@ -0,0 +1,166 @@
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# 연결마다 적용하는 SQLite 설정
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',       # 읽기와 쓰기가 서로 막지 않음
+    'synchronous': 'NORMAL',     # WAL 에서는 체크포인트 때만 fsync
+    'busy_timeout': 5000,        # 잠금 대기 시간 (ms), 바로 "database is locked" 로 실패하지 않음
+    'cache_size': -16000,        # 연결당 페이지 캐시 약 16MB (음수는 KB 단위)
+    'temp_store': 'MEMORY',
+    'wal_autocheckpoint': 1000,
+}
+
+# 엔진별로 등록한 connect 리스너 (다시 등록하면 이전 리스너를 제거)
+_listeners = weakref.WeakKeyDictionary()
+
+
+def is_file_sqlite_url(url):
+    """
+    파일에 저장하는 SQLite URL 인지 (메모리 DB 는 WAL 과 연결 풀을 쓰면 안 됨)
+    """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite':
+        return False
+    return url.database not in (None, '', ':memory:') and url.query.get('mode') != 'memory'
+
+
+def enable_sqlite_pragmas(engine, pragmas=None):
+    """
+    engine 의 새 SQLite 연결마다 pragmas 를 적용하도록 등록 (여러 번 호출하면 마지막 설정 사용)
+    """
+    pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    previous = _listeners.get(engine)
+    if previous is not None:
+        event.remove(engine, 'connect', previous)
+    event.listen(engine, 'connect', apply_pragmas)
+    _listeners[engine] = apply_pragmas
+
+
+def sqlite_engine_options(pool_size=10, max_overflow=10, busy_timeout=5.0):
+    """
+    파일 SQLite 용 엔진 옵션 (SQLALCHEMY_ENGINE_OPTIONS)
+
+    SQLAlchemy 1.4 는 파일 SQLite 에 NullPool 을 써서 세션마다 연결을 새로 열고
+    pragma 를 다시 실행한다. 프로세스(워커)마다 QueuePool 로 연결을 재사용한다.
+    """
+    return {
+        'poolclass': QueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_pre_ping': False,
+        'connect_args': {'check_same_thread': False, 'timeout': busy_timeout},
+    }
+
+
+class GroupCommitWriter:
+    """
+    여러 요청의 쓰기를 모아 한 트랜잭션으로 커밋하는 단일 작성 스레드
+
+    submit() 은 Future 를 반환한다. 작성 스레드는 대기 중인 항목을 max_batch 개까지
+    한 번에 꺼내 write_batch(items) 를 호출하고, 반환된 항목별 결과를 각 Future 에 전달한다.
+    묶음 쓰기가 실패하면 항목을 하나씩 다시 써서 실패한 항목만 오류가 된다.
+    """
+    def __init__(self, write_batch, max_batch=64, max_delay=0.0, max_queue_size=1000):
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.items = 0
+        self.retried_batches = 0
+        self.failed_items = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        self.start()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                # 커밋하는 동안 쌓인 항목은 기다리지 않고 바로 가져옴
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.write_batch(items)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._finish(batch[0][1], None, e)
+                    continue
+                with self._lock:
+                    self.retried_batches += 1
+                for item, future in batch:
+                    self._finish(future, *self._write_one(item))
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _write_one(self, item):
+        try:
+            return self.write_batch([item])[0], None
+        except Exception as e:
+            return None, e
+
+    def _finish(self, future, result, error):
+        with self._lock:
+            self.batches += 1
+            self.items += 1
+            if error is not None:
+                self.failed_items += 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+                'retried_batches': self.retried_batches,
+                'failed_items': self.failed_items,
+                'queue_depth': self._queue.qsize(),
+            }
@@ -0,0 +1,190 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# 기본 매장명 사전 (STORE_DICTIONARY 환경 변수로 교체)
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'store_names.json')
+# 이 신뢰도 미만의 후보는 매칭으로 보지 않음
+MIN_CONFIDENCE = 0.6
+# 이보다 많은 별칭에 나오는 bigram 은 (다른 후보가 있으면) 후보 생성에 쓰지 않음
+MAX_POSTINGS = 256
+# 사전 파일 변경 여부를 확인하는 최소 간격 (초)
+RELOAD_CHECK_INTERVAL = 30.0
+
+NORMALIZE_RE = re.compile(r'[^0-9A-Z가-힣]')
+
+
+def normalize(text: str) -> str:
+    """
+    비교용 정규화: 전각/호환 문자 통일, 대문자, 한글/영문/숫자 외 제거
+    """
+    return NORMALIZE_RE.sub('', unicodedata.normalize('NFKC', text).upper())
+
+
+def _bigrams(text: str) -> List[str]:
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+class StoreMatch(NamedTuple):
+    name: str
+    confidence: float
+    alias: str
+    line: str
+
+
+class StoreResolver:
+    """
+    매장명 사전에 대한 문자 bigram 역색인
+
+    OCR 한 줄과 드문 bigram 을 공유하는 별칭만 후보로 보므로 조회 비용은 사전 크기가 아니라
+    줄 길이와 해당 bigram 의 posting 길이에 비례한다 ('카페', '커피' 처럼 흔한 bigram 은
+    다른 후보가 없을 때만 사용). 신뢰도는 별칭 bigram 중 줄에 나타난 비율이라
+    잡음이 섞인 줄이나 '이디야커피 정자역점' 처럼 지점명이 붙은 줄도 매칭된다.
+    bigram 은 나오는 매장 수가 적을수록 큰 가중치(IDF)로 세므로 'COFFEE' 처럼 여러 매장에
+    흔한 부분만 겹치는 줄('ICED COFFEE')은 기준을 넘지 못한다.
+    """
+
+    def __init__(self, stores: Iterable[dict], min_confidence: float = MIN_CONFIDENCE,
+                 max_postings: int = MAX_POSTINGS):
+        self.min_confidence = min_confidence
+        self.max_postings = max_postings
+        self._names: List[str] = []
+        self._aliases: List[str] = []
+        self._grams: List[frozenset] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._weights: Dict[str, float] = {}
+        self._totals: List[float] = []
+        for store in stores:
+            name = store['name']
+            for alias in {name, *store.get('aliases', ())}:
+                key = normalize(alias)
+                if not key:
+                    continue
+                grams = frozenset(_bigrams(key))
+                alias_id = len(self._aliases)
+                self._names.append(name)
+                self._aliases.append(alias)
+                self._grams.append(grams)
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(alias_id)
+        # bigram 가중치: log(1 + 매장 수 / 해당 bigram 이 나오는 매장 수)
+        store_count = len(set(self._names))
+        for gram, posting in self._postings.items():
+            self._weights[gram] = math.log(1 + store_count / len({self._names[alias_id] for alias_id in posting}))
+        self._totals = [sum(self._weights[gram] for gram in grams) for grams in self._grams]
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_DICTIONARY_PATH, **options) -> 'StoreResolver':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['stores'], **options)
+
+    def __len__(self):
+        return len(self._aliases)
+
+    @property
+    def store_count(self) -> int:
+        return len(set(self._names))
+
+    def resolve(self, line: str) -> Optional[StoreMatch]:
+        """
+        OCR 한 줄을 정식 매장명으로 변환 (신뢰도가 min_confidence 미만이면 None)
+        """
+        grams = set(_bigrams(normalize(line)))
+        postings = sorted(((gram, self._postings[gram]) for gram in grams if gram in self._postings),
+                          key=lambda item: len(item[1]))
+        shared = Counter()
+        skipped = 0.0
+        for gram, posting in postings:
+            weight = self._weights[gram]
+            if len(posting) > self.max_postings and shared:
+                skipped += weight
+                continue
+            for alias_id in posting:
+                shared[alias_id] += weight
+        best = None
+        best_key = None
+        for alias_id, score in shared.items():
+            alias_grams = self._grams[alias_id]
+            total = self._totals[alias_id]
+            # 건너뛴 bigram 을 모두 공유해도 기준 미달이면 제외
+            if score + skipped < self.min_confidence * total:
+                continue
+            if skipped:
+                score = sum(self._weights[gram] for gram in alias_grams & grams)
+            # 부동소수 오차로 완전 일치가 1 미만이 되지 않도록 반올림
+            confidence = round(score / total, 6)
+            if confidence < self.min_confidence:
+                continue
+            # 신뢰도가 같으면 더 긴 별칭 우선
+            key = (confidence, len(alias_grams))
+            if best_key is None or key > best_key:
+                best_key = key
+                best = alias_id
+        if best is None:
+            return None
+        return StoreMatch(self._names[best], best_key[0], self._aliases[best], line)
+
+    def best_match(self, lines: Iterable[str]) -> Optional[StoreMatch]:
+        """
+        여러 줄 중 신뢰도가 가장 높은 매칭 (같으면 앞쪽 줄)
+        """
+        best = None
+        for line in lines:
+            match = self.resolve(line)
+            if match is not None and (best is None or match.confidence > best.confidence):
+                best = match
+        return best
+
+
+_resolver: Optional[StoreResolver] = None
+_resolver_lock = threading.Lock()
+_resolver_path: Optional[str] = None
+_resolver_mtime: Optional[float] = None
+_last_check = 0.0
+
+
+def _dictionary_path() -> str:
+    return os.getenv('STORE_DICTIONARY', DEFAULT_DICTIONARY_PATH)
+
+
+def reload_store_resolver(path: Optional[str] = None) -> StoreResolver:
+    """
+    사전 파일로 색인을 새로 만들어 교체 (조회 중인 스레드는 이전 색인을 계속 사용)
+    """
+    global _resolver, _resolver_path, _resolver_mtime, _last_check
+    path = path or _dictionary_path()
+    mtime = os.path.getmtime(path)
+    resolver = StoreResolver.from_file(path)
+    with _resolver_lock:
+        _resolver, _resolver_path, _resolver_mtime = resolver, path, mtime
+        _last_check = time.monotonic()
+    return resolver
+
+
+def get_store_resolver() -> StoreResolver:
+    """
+    프로세스 전역 매장명 색인 (최초 호출 시 생성, 사전 파일이 바뀌면 다시 로드)
+    """
+    global _last_check
+    resolver = _resolver
+    if resolver is None:
+        with _resolver_lock:
+            resolver = _resolver
+        return resolver or reload_store_resolver()
+    now = time.monotonic()
+    if now - _last_check < RELOAD_CHECK_INTERVAL:
+        return resolver
+    _last_check = now
+    try:
+        changed = os.path.getmtime(_resolver_path) != _resolver_mtime
+    except OSError:
+        return resolver
+    return reload_store_resolver(_resolver_path) if changed else resolver
@@ -0,0 +1,212 @@
+import io
+import threading
+from tempfile import SpooledTemporaryFile
+from PIL import Image
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+# 허용하는 이미지 형식과 시그니처
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'RIFF', 'WEBP'),
+    (b'BM', 'BMP'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+]
+ALLOWED_FORMATS = {'JPEG', 'MPO', 'PNG', 'WEBP', 'BMP', 'GIF'}
+# 기본 최대 픽셀 수 (약 4000만 화소)
+DEFAULT_MAX_PIXELS = 40 * 1000 * 1000
+
+
+class UploadStats:
+    """
+    업로드 스트림 메모리 사용량과 거부 횟수 통계
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active_uploads = 0
+        self.bytes_in_memory = 0
+        self.peak_bytes_in_memory = 0
+        self.accepted = 0
+        self.spooled_to_disk = 0
+        self.rejected = {}
+
+    def add_memory(self, delta):
+        with self._lock:
+            self.bytes_in_memory += delta
+            self.peak_bytes_in_memory = max(self.peak_bytes_in_memory, self.bytes_in_memory)
+
+    def opened(self):
+        with self._lock:
+            self.active_uploads += 1
+
+    def closed(self, memory_bytes):
+        with self._lock:
+            self.active_uploads -= 1
+            self.bytes_in_memory -= memory_bytes
+
+    def accept(self):
+        with self._lock:
+            self.accepted += 1
+
+    def spooled(self):
+        with self._lock:
+            self.spooled_to_disk += 1
+
+    def reject(self, reason):
+        with self._lock:
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'active_uploads': self.active_uploads,
+                'bytes_in_memory': self.bytes_in_memory,
+                'peak_bytes_in_memory': self.peak_bytes_in_memory,
+                'accepted': self.accepted,
+                'spooled_to_disk': self.spooled_to_disk,
+                'rejected': dict(self.rejected),
+            }
+
+
+upload_stats = UploadStats()
+
+
+def sniff_image_header(header):
+    """
+    업로드 앞부분 바이트만으로 이미지 형식과 크기 확인
+
+    (format, (width, height)) 를 반환하고, 아직 판단할 데이터가 부족하면 None 을 반환한다.
+    지원하지 않는 형식이면 ValueError 가 발생한다.
+    """
+    if len(header) < 12:
+        return None
+    if not any(header.startswith(signature) for signature, _ in IMAGE_SIGNATURES):
+        raise ValueError('지원하지 않는 이미지 형식입니다.')
+    if header.startswith(b'RIFF') and header[8:12] != b'WEBP':
+        raise ValueError('지원하지 않는 이미지 형식입니다.')
+    try:
+        # Image.open 은 헤더만 읽고 픽셀은 디코딩하지 않음
+        image = Image.open(io.BytesIO(header))
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None
+    if image.format not in ALLOWED_FORMATS:
+        raise ValueError('지원하지 않는 이미지 형식입니다.')
+    return image.format, image.size
+
+
+class ImageUploadStream:
+    """
+    업로드 파일을 받는 동안 헤더를 검사하는 스트림
+
+    처음 sniff_size 바이트 안에서 형식과 크기를 확인하여 조건에 맞지 않으면
+    본문을 끝까지 읽기 전에 예외를 발생시킨다. strict=False 이면 예외 대신
+    rejection 에 오류를 기록하고 나머지 데이터는 버린다 (일괄 업로드용).
+    데이터는 spool_size 까지만 메모리에 두고 그 이상은 임시 파일로 넘긴다.
+    """
+    def __init__(self, max_pixels, strict=True, sniff_size=256 * 1024, spool_size=512 * 1024, stats=upload_stats):
+        self.max_pixels = max_pixels
+        self.strict = strict
+        self.rejection = None
+        self.sniff_size = sniff_size
+        self.spool_size = spool_size
+        self.stats = stats
+        self.format = None
+        self.size = None
+        self._header = bytearray()
+        self._file = SpooledTemporaryFile(max_size=spool_size, mode='w+b')
+        self._memory_bytes = 0
+        self._closed = False
+        stats.opened()
+
+    def write(self, data):
+        if self.rejection is not None:
+            return len(data)
+        if self.format is None:
+            self._sniff(data)
+            if self.rejection is not None:
+                return len(data)
+        written = self._file.write(data)
+        self._track_memory()
+        return written
+
+    def _sniff(self, data):
+        self._header += data[:max(0, self.sniff_size - len(self._header))]
+        try:
+            sniffed = sniff_image_header(bytes(self._header))
+        except ValueError as e:
+            return self._reject('unsupported_format', UnsupportedMediaType(str(e)))
+        except Image.DecompressionBombError as e:
+            return self._reject('too_many_pixels', RequestEntityTooLarge(str(e)))
+        if sniffed is None:
+            if len(self._header) >= self.sniff_size:
+                return self._reject('malformed_header', UnsupportedMediaType('이미지 헤더를 읽을 수 없습니다.'))
+            return
+        self.format, self.size = sniffed
+        width, height = self.size
+        if width * height > self.max_pixels:
+            return self._reject('too_many_pixels', RequestEntityTooLarge(f'이미지 해상도가 너무 큽니다: {width}x{height}'))
+        self._header = None
+        self.stats.accept()
+
+    def _reject(self, reason, error):
+        self.stats.reject(reason)
+        if self.strict:
+            # 남은 본문은 읽지 않고 중단
+            self.close()
+            raise error
+        self.rejection = error
+        self._header = None
+        self._file.seek(0)
+        self._file.truncate()
+
+    def _track_memory(self):
+        # 임시 파일로 넘어가면 메모리 사용량에서 제외
+        if getattr(self._file, '_rolled', False):
+            if self._memory_bytes:
+                self.stats.add_memory(-self._memory_bytes)
+                self._memory_bytes = 0
+                self.stats.spooled()
+            return
+        current = self._file.tell()
+        if current > self._memory_bytes:
+            self.stats.add_memory(current - self._memory_bytes)
+            self._memory_bytes = current
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.stats.closed(self._memory_bytes)
+            self._memory_bytes = 0
+            self._file.close()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class ImageUploadRequest(Request):
+    """
+    업로드 파일을 ImageUploadStream 으로 받는 요청 클래스
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # 파일별로 결과를 돌려주는 엔드포인트는 요청 전체를 중단하지 않음
+        strict = self.endpoint not in current_app.config.get('UPLOAD_LENIENT_ENDPOINTS', ())
+        return ImageUploadStream(
+            max_pixels=current_app.config.get('MAX_IMAGE_PIXELS', DEFAULT_MAX_PIXELS),
+            strict=strict
+        )
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import NamedTuple, Optional
+
+# 구독자 하나가 쌓아둘 수 있는 최대 이벤트 수 (넘치면 버리고 resync 를 보냄)
+DEFAULT_MAX_PENDING = 100
+# 재연결 시 다시 보내줄 수 있도록 사용자별로 보관하는 최근 이벤트 수
+DEFAULT_HISTORY_SIZE = 50
+# 최근 이벤트를 보관하는 최대 사용자 수
+DEFAULT_MAX_USERS = 10000
+
+EVENT_VISIT = 'visit'
+EVENT_RESYNC = 'resync'
+
+
+class VisitEvent(NamedTuple):
+    id: int
+    name: str
+    data: Optional[dict]
+
+
+def format_event(event):
+    """
+    server-sent events 형식의 메시지 하나
+    """
+    return f"id: {event.id}\nevent: {event.name}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+class Subscription:
+    """
+    사용자 한 명의 스트림 연결이 받을 이벤트 대기열
+    """
+    def __init__(self, user_id, max_pending=DEFAULT_MAX_PENDING):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self._events = deque()
+        self._resync_id = None
+        self._cond = threading.Condition()
+
+    def push(self, event):
+        with self._cond:
+            if len(self._events) >= self.max_pending:
+                # 느린 연결은 밀린 이벤트를 버리고 목록을 다시 받도록 함
+                self._events.clear()
+                self._resync_id = event.id
+            elif self._resync_id is not None:
+                self._resync_id = event.id
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def resync(self, event_id):
+        with self._cond:
+            self._events.clear()
+            self._resync_id = event_id
+            self._cond.notify()
+
+    def get(self, timeout):
+        """
+        다음 이벤트 (timeout 초 동안 없으면 None)
+        """
+        with self._cond:
+            if not self._events and self._resync_id is None:
+                self._cond.wait(timeout)
+            if self._resync_id is not None:
+                event = VisitEvent(self._resync_id, EVENT_RESYNC, {})
+                self._resync_id = None
+                return event
+            return self._events.popleft() if self._events else None
+
+
+class VisitEventBroker:
+    """
+    방문 기록 변경을 같은 사용자의 스트림 연결에 전달하는 프로세스 안의 브로커
+
+    이벤트 id 는 단조 증가하며, 사용자별 최근 이벤트를 보관하여 재연결한 클라이언트가
+    Last-Event-ID 이후의 이벤트를 이어서 받는다. 이미 버려진 이벤트가 있으면 resync 를 보낸다.
+    """
+    def __init__(self, history_size=DEFAULT_HISTORY_SIZE, max_pending=DEFAULT_MAX_PENDING,
+                 max_users=DEFAULT_MAX_USERS):
+        self.history_size = history_size
+        self.max_pending = max_pending
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        # 재시작 전 프로세스가 보낸 id 와 겹치지 않도록 시각에서 시작
+        self._first_id = int(time.time() * 1000)
+        self._last_id = self._first_id - 1
+        # user_id -> (최근 이벤트 deque, 보관에서 밀려난 마지막 id)
+        self._history = OrderedDict()
+        # 보관 대상에서 빠진 사용자들의 마지막 이벤트 id 중 최대값
+        self._dropped_id = self._last_id
+        self._subscribers = {}
+
+    @property
+    def last_id(self):
+        with self._lock:
+            return self._last_id
+
+    def publish(self, user_id, data, name=EVENT_VISIT):
+        with self._lock:
+            self._last_id += 1
+            event = VisitEvent(self._last_id, name, data)
+            events, evicted_id = self._history.pop(user_id, (deque(), self._dropped_id))
+            if len(events) >= self.history_size:
+                evicted_id = events.popleft().id
+            events.append(event)
+            self._history[user_id] = (events, evicted_id)
+            if len(self._history) > self.max_users:
+                _, (old_events, _) = self._history.popitem(last=False)
+                self._dropped_id = max(self._dropped_id, old_events[-1].id)
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+        return event
+
+    def subscribe(self, user_id, last_event_id=None):
+        """
+        user_id 의 이벤트 구독 (last_event_id 이후 보관된 이벤트는 바로 받을 수 있게 채워 둠)
+        """
+        subscription = Subscription(user_id, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            if last_event_id is None:
+                return subscription
+            events, evicted_id = self._history.get(user_id, ((), self._dropped_id))
+            if last_event_id < evicted_id or not self._first_id - 1 <= last_event_id <= self._last_id:
+                # 놓친 이벤트를 알 수 없으면 (보관 기간이 지났거나 다른 프로세스의 id) 목록을 다시 받도록 함
+                subscription.resync(self._last_id)
+            else:
+                for event in events:
+                    if event.id > last_event_id:
+                        subscription.push(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())